@@ -1,12 +1,14 @@
+import hmac
 from fastapi import Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.database import get_db
 from app.services.auth_service import AuthService
 from app.models.user import User
 
 async def get_current_user(
     authorization: str = Header(...), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     if not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -16,4 +18,16 @@ async def get_current_user(
         )
     
     token = authorization.split("Bearer ")[1]
-    return AuthService.get_current_user(db, token)
\ No newline at end of file
+    return await AuthService.get_current_user(db, token)
+
+async def require_internal_token(authorization: str | None = Header(None)):
+    # Chưa cấu hình token thì coi như không có route (không lộ stats nội bộ ra ngoài)
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = authorization[7:] if authorization and authorization.startswith("Bearer ") else ""
+    if not hmac.compare_digest(token.encode(), settings.INTERNAL_API_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal API token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
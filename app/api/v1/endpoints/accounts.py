@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.schemas import AccountCreate, AccountUpdate, AccountResponse
 from app.services.auth_service import AuthService
 from app.core.database import get_db
+from app.core.account_feed import account_feed, sse_event
+from app.core.config import settings
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.core.serialization import ORJSONResponse, dump_rows, dumps, ndjson_response, wants_ndjson
+from app.crud.account import ACCOUNT_LIST_COLUMNS
 from app.models.user import User  # Import từ user.py
 from app.api.v1.dependencies import get_current_user
 from typing import List
+from pydantic import TypeAdapter
 from app.core.logger import setup_logger
 
 # Setup logger
@@ -13,39 +20,85 @@ logger = setup_logger(__name__)
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
+_accounts_adapter = TypeAdapter(List[AccountResponse])
+
 @router.post("", response_model=AccountResponse, status_code=status.HTTP_201_CREATED)
-async def create_account(account_in: AccountCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    logger.info(f"Received request to create account for user_id={current_user.user_id}, data={account_in.dict()}")
+async def create_account(account_in: AccountCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     account_data = account_in.dict()
-    account = AuthService.create_account(db, current_user.user_id, account_data)
-    logger.info(f"Created account: {account.__dict__}")
+    logger.debug("Received request to create account for user_id=%s, data=%s", current_user.user_id, account_data)
+    account = await AuthService.create_account(db, current_user.user_id, account_data)
+    logger.info("Created account_id=%s for user_id=%s", account.account_id, current_user.user_id)
     return account
 
 @router.get("", response_model=List[AccountResponse])
-async def get_accounts(is_active: bool | None = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    logger.info(f"Received request to get accounts for user_id={current_user.user_id}, is_active={is_active}")
-    accounts = AuthService.get_accounts(db, current_user.user_id, is_active)
-    logger.info(f"Returning {len(accounts)} accounts")
+async def get_accounts(
+    request: Request,
+    response: Response,
+    is_active: bool | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.debug("Received request to get accounts for user_id=%s, is_active=%s", current_user.user_id, is_active)
+    if wants_ndjson(request):
+        # Accept: application/x-ndjson - stream toàn bộ danh sách, bỏ qua cursor/limit
+        return ndjson_response(_accounts_adapter, AuthService.stream_accounts(db, current_user.user_id, is_active))
+    # Kiểm tra version rẻ trước, không load/serialize account khi client đã có bản mới nhất
+    etag = await AuthService.get_accounts_etag(db, current_user.user_id, is_active, cursor, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    columns = ACCOUNT_LIST_COLUMNS if settings.FAST_LIST_SERIALIZATION else None
+    accounts, next_cursor = await AuthService.get_accounts(db, current_user.user_id, is_active, cursor, limit, columns)
+    # Giữ body là mảng như trước; cursor trang tiếp theo trả qua header
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    logger.debug("Returning %d accounts", len(accounts))
+    if settings.FAST_LIST_SERIALIZATION:
+        # Validate cả trang một lần rồi encode bằng orjson; trả Response trực tiếp nên phải chép header
+        return ORJSONResponse(dump_rows(_accounts_adapter, accounts), headers=response.headers)
     return accounts
 
+@router.get("/stream")
+async def stream_account_changes(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # Server-Sent Events: "snapshot" (danh sách account hiện tại) rồi "account" mỗi khi account/số dư thay đổi
+    subscriber, accounts = await AuthService.open_account_stream(db, current_user.user_id)
+    snapshot = sse_event("snapshot", dumps(dump_rows(_accounts_adapter, accounts)))
+    return StreamingResponse(
+        account_feed.events(current_user.user_id, subscriber, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/{account_id}", response_model=AccountResponse)
-async def get_account(account_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    logger.info(f"Received request to get account_id={account_id} for user_id={current_user.user_id}")
-    account = AuthService.get_account(db, account_id, current_user.user_id)
-    logger.info(f"Returning account: {account.__dict__}")
+async def get_account(
+    account_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.debug("Received request to get account_id=%s for user_id=%s", account_id, current_user.user_id)
+    etag = await AuthService.get_account_etag(db, account_id, current_user.user_id)
+    if etag is not None:
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    account = await AuthService.get_account(db, account_id, current_user.user_id)
     return account
 
 @router.put("/{account_id}", response_model=AccountResponse)
-async def update_account(account_id: int, account_in: AccountUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    logger.info(f"Received request to update account_id={account_id} for user_id={current_user.user_id}, data={account_in.dict()}")
+async def update_account(account_id: int, account_in: AccountUpdate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     update_data = account_in.dict(exclude_unset=True)
-    account = AuthService.update_account(db, account_id, current_user.user_id, update_data)
-    logger.info(f"Updated account: {account.__dict__}")
+    logger.debug("Received request to update account_id=%s for user_id=%s, data=%s", account_id, current_user.user_id, update_data)
+    account = await AuthService.update_account(db, account_id, current_user.user_id, update_data)
+    logger.info("Updated account_id=%s for user_id=%s", account_id, current_user.user_id)
     return account
 
 @router.delete("/{account_id}", status_code=status.HTTP_200_OK)
-async def delete_account(account_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    logger.info(f"Received request to delete account_id={account_id} for user_id={current_user.user_id}")
-    AuthService.delete_account(db, account_id, current_user.user_id)
-    logger.info(f"Account_id={account_id} deactivated successfully")
+async def delete_account(account_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    logger.debug("Received request to delete account_id=%s for user_id=%s", account_id, current_user.user_id)
+    await AuthService.delete_account(db, account_id, current_user.user_id)
+    logger.info("Account_id=%s deactivated successfully", account_id)
     return {"message": "Account deactivated successfully"}
\ No newline at end of file
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.schemas import UserCreate, UserResponse, Token, LoginRequest, ChangePassword
 from app.services.auth_service import AuthService
 from app.core.database import get_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
 from app.models.user import User
 from app.api.v1.dependencies import get_current_user
 from app.core.logger import setup_logger
@@ -13,52 +14,58 @@ logger = setup_logger(__name__)
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    user = AuthService.register(db, user_in)
+async def signup(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
+    user = await AuthService.register(db, user_in)
     return user
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
-    return AuthService.login(db, login_data.email, login_data.password)
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    return await AuthService.login(db, login_data.email, login_data.password)
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout():
     return {"message": "Successfully logged out"}
 
 @router.get("/user", response_model=UserResponse)
-async def get_user(current_user: User = Depends(get_current_user)):
+async def get_user(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    # User lấy từ user_cache nên 304 không tốn query nào
+    etag = make_etag("user", current_user.user_id, current_user.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return current_user
 
 @router.get("/activate", response_model=UserResponse)
-async def activate(token: str, db: Session = Depends(get_db)):
+async def activate(token: str, db: AsyncSession = Depends(get_db)):
     logger.info("Received activation request")
-    user = AuthService.activate_user(db, token)
-    logger.info(f"Activation successful for user_id={user.user_id}")
+    user = await AuthService.activate_user(db, token)
+    logger.info("Activation successful for user_id=%s", user.user_id)
     return user
 
 @router.post("/reset-password/request")
-async def request_reset_password(email: str, db: Session = Depends(get_db)):
-    logger.info(f"Received reset password request for email={email}")
-    result = AuthService.request_reset_password(db, email)
-    logger.info(f"Reset password email sent for email={email}")
+async def request_reset_password(email: str, db: AsyncSession = Depends(get_db)):
+    # Không ghi email vào log: endpoint không cần đăng nhập, ai cũng gửi được email bất kỳ
+    logger.info("Received reset password request")
+    result = await AuthService.request_reset_password(db, email)
+    logger.info("Reset password request processed")
     return result
 
 @router.post("/reset-password", response_model=UserResponse)
-async def reset_password(token: str, new_password: str, db: Session = Depends(get_db)):
+async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_db)):
     logger.info("Received reset password request")
-    user = AuthService.reset_password(db, token, new_password)
-    logger.info(f"Password reset successful for user_id={user.user_id}")
+    user = await AuthService.reset_password(db, token, new_password)
+    logger.info("Password reset successful for user_id=%s", user.user_id)
     return user
 
 @router.post("/change-password", response_model=UserResponse)
 async def change_password(
     change_data: ChangePassword,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    logger.info(f"Received change password request for user_id={current_user.user_id}")
-    user = AuthService.change_password(
+    logger.info("Received change password request for user_id=%s", current_user.user_id)
+    user = await AuthService.change_password(
         db, current_user, change_data.old_password, change_data.new_password
     )
-    logger.info(f"Password changed successfully for user_id={user.user_id}")
+    logger.info("Password changed successfully for user_id=%s", user.user_id)
     return user
\ No newline at end of file
@@ -0,0 +1,36 @@
+from typing import List, Literal
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.schemas import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.services.category_service import CategoryService
+from app.core.database import get_db
+from app.models.user import User
+from app.api.v1.dependencies import get_current_user
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+router = APIRouter(prefix="/categories", tags=["Categories"])
+
+@router.get("", response_model=List[CategoryResponse])
+async def get_categories(
+    category_type: Literal["expense", "income"] | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await CategoryService.get_categories(db, current_user.user_id, category_type)
+
+@router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
+async def create_category(category_in: CategoryCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await CategoryService.create_category(db, current_user.user_id, category_in.dict())
+
+@router.put("/{category_id}", response_model=CategoryResponse)
+async def update_category(category_id: int, category_in: CategoryUpdate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await CategoryService.update_category(db, category_id, current_user.user_id, category_in.dict(exclude_unset=True))
+
+@router.delete("/{category_id}", status_code=status.HTTP_200_OK)
+async def delete_category(category_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    await CategoryService.delete_category(db, category_id, current_user.user_id)
+    logger.info("Category_id=%s deleted", category_id)
+    return {"message": "Category deleted successfully"}
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from app.api.v1.dependencies import require_internal_token
+from app.core.account_feed import account_feed
+from app.core.category_cache import category_cache
+from app.core.database import get_pool_stats
+from app.core.rate_limit import rate_limiter
+from app.core.security import token_cache
+from app.core.user_cache import user_cache
+
+router = APIRouter(
+    prefix="/internal", tags=["Internal"], include_in_schema=False, dependencies=[Depends(require_internal_token)]
+)
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    return get_pool_stats()
+
+@router.get("/user-cache")
+async def user_cache_stats():
+    return user_cache.stats()
+
+@router.get("/token-cache")
+async def token_cache_stats():
+    return token_cache.stats()
+
+
+@router.get("/category-cache")
+async def category_cache_stats():
+    return category_cache.stats()
+
+@router.get("/rate-limit")
+async def rate_limit_stats():
+    return rate_limiter.stats()
+
+@router.get("/account-stream")
+async def account_stream_stats():
+    return account_feed.stats()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.api.v1.dependencies import require_internal_token
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"], include_in_schema=False, dependencies=[Depends(require_internal_token)])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Định dạng text của Prometheus
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.schemas import UserUpdate, UserResponse
 from app.crud.user import user as user_crud
 from app.core.database import get_db
@@ -12,6 +12,6 @@ router = APIRouter(prefix="/profile", tags=["Profile"])
 async def update_profile(
     user_in: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    return user_crud.update(db, db_obj=current_user, obj_in=user_in)
\ No newline at end of file
+    return await user_crud.update(db, db_obj=current_user, obj_in=user_in)
\ No newline at end of file
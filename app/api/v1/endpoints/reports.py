@@ -0,0 +1,64 @@
+from datetime import date
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.schemas import (
+    ReportSummaryResponse, CategorySpendingResponse, BudgetStatusResponse, NetWorthResponse, DateOrDateTime
+)
+from app.services.report_service import ReportService
+from app.core.database import get_db
+from app.models.user import User
+from app.api.v1.dependencies import get_current_user
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+@router.get("/summary", response_model=ReportSummaryResponse)
+async def get_summary(
+    start_date: DateOrDateTime,
+    end_date: DateOrDateTime,
+    account_id: int | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received summary report request for user_id=%s", current_user.user_id)
+    return await ReportService.summary(db, current_user.user_id, start_date, end_date, account_id)
+
+@router.get("/spending-by-category", response_model=List[CategorySpendingResponse])
+async def get_spending_by_category(
+    start_date: DateOrDateTime,
+    end_date: DateOrDateTime,
+    account_id: int | None = None,
+    include_subcategories: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received spending-by-category report request for user_id=%s", current_user.user_id)
+    return await ReportService.spending_by_category(
+        db, current_user.user_id, start_date, end_date, account_id, include_subcategories
+    )
+
+@router.get("/budget-status", response_model=List[BudgetStatusResponse])
+async def get_budget_status(
+    month: int | None = Query(None, ge=1, le=12),
+    year: int | None = Query(None, ge=1970),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received budget status request for user_id=%s", current_user.user_id)
+    return await ReportService.budget_status(db, current_user.user_id, month, year, start_date, end_date)
+
+@router.get("/net-worth", response_model=NetWorthResponse)
+async def get_net_worth(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received net worth request for user_id=%s", current_user.user_id)
+    return await ReportService.net_worth(db, current_user, start_date, end_date)
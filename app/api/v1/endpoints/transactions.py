@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import List, Literal
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.schemas import (
+    TransactionCreate, TransactionCreateResponse, TransactionUpdate, TransactionResponse, TransactionListResponse,
+    TransactionImportResponse,
+)
+from app.services.transaction_service import TransactionService
+from app.services.import_service import ImportService
+from app.services.export_service import ExportService
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.serialization import ORJSONResponse, dump_rows, ndjson_response, wants_ndjson
+from app.crud.transaction import TRANSACTION_LIST_COLUMNS
+from app.models.user import User
+from app.models.category import CategoryType
+from app.api.v1.dependencies import get_current_user
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+router = APIRouter(prefix="/transactions", tags=["Transactions"])
+
+_transactions_adapter = TypeAdapter(List[TransactionResponse])
+
+def _list_response(transactions, limit: int, next_cursor: str | None):
+    if settings.FAST_LIST_SERIALIZATION:
+        return ORJSONResponse({"items": dump_rows(_transactions_adapter, transactions), "limit": limit, "next_cursor": next_cursor})
+    return {"items": transactions, "limit": limit, "next_cursor": next_cursor}
+
+@router.post("", response_model=TransactionCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_transaction(transaction_in: TransactionCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    logger.info("Received request to create transaction for user_id=%s", current_user.user_id)
+    transaction, budget_alerts = await TransactionService.create_transaction(db, current_user.user_id, transaction_in.dict())
+    return TransactionCreateResponse(**TransactionResponse.model_validate(transaction).model_dump(), budget_alerts=budget_alerts)
+
+@router.post("/import", response_model=TransactionImportResponse)
+async def import_transactions(
+    request: Request,
+    format: Literal["csv", "ofx"] = "csv",
+    account_id: int | None = None,
+    income_category: str | None = None,
+    expense_category: str | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Body là file CSV/OFX thô, đọc theo từng chunk thay vì nạp toàn bộ vào bộ nhớ
+    logger.info("Received request to import %s transactions for user_id=%s", format, current_user.user_id)
+    result = await ImportService.import_transactions(
+        db, current_user.user_id, request.stream(),
+        file_format=format, account_id=account_id,
+        income_category=income_category, expense_category=expense_category,
+    )
+    logger.info("Import finished: imported=%s, failed=%s", result["imported"], result["failed"])
+    return result
+
+@router.get("", response_model=TransactionListResponse)
+async def get_transactions(
+    request: Request,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    account_id: int | None = None,
+    category_id: int | None = None,
+    type: Literal["income", "expense"] | None = None,
+    tag_id: int | None = None,
+    sort_by: Literal["transaction_date", "amount", "created_at"] = "transaction_date",
+    order: Literal["asc", "desc"] = "desc",
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received request to get transactions for user_id=%s", current_user.user_id)
+    filters = dict(
+        start_date=start_date, end_date=end_date, account_id=account_id, category_id=category_id,
+        transaction_type=CategoryType(type) if type else None, tag_id=tag_id,
+    )
+    if wants_ndjson(request):
+        # Accept: application/x-ndjson - stream mọi giao dịch khớp filter theo thứ tự sort, bỏ qua cursor/limit
+        return ndjson_response(
+            _transactions_adapter,
+            TransactionService.stream_transactions(db, current_user.user_id, sort_by=sort_by, order=order, **filters),
+        )
+    transactions, next_cursor = await TransactionService.get_transactions(
+        db, current_user.user_id, **filters, sort_by=sort_by, order=order, cursor=cursor, limit=limit,
+        columns=TRANSACTION_LIST_COLUMNS if settings.FAST_LIST_SERIALIZATION else None,
+    )
+    return _list_response(transactions, limit, next_cursor)
+
+# Khai báo trước /{transaction_id} để "export"/"search" không bị hiểu là transaction_id
+@router.get("/export")
+async def export_transactions(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    account_id: int | None = None,
+    category_id: int | None = None,
+    type: Literal["income", "expense"] | None = None,
+    tag_id: int | None = None,
+    sort_by: Literal["transaction_date", "amount", "created_at"] = "transaction_date",
+    order: Literal["asc", "desc"] = "desc",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received request to export transactions for user_id=%s, format=%s", current_user.user_id, format)
+    media_type, extension, chunks = ExportService.stream_transactions(
+        db, current_user.user_id, format,
+        start_date=start_date, end_date=end_date, account_id=account_id, category_id=category_id,
+        transaction_type=CategoryType(type) if type else None, tag_id=tag_id, sort_by=sort_by, order=order,
+    )
+    return StreamingResponse(chunks, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="transactions.{extension}"',
+    })
+
+@router.get("/search", response_model=TransactionListResponse)
+async def search_transactions(
+    q: str = Query(..., min_length=2, max_length=200),
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    account_id: int | None = None,
+    category_id: int | None = None,
+    type: Literal["income", "expense"] | None = None,
+    tag_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info("Received request to search transactions for user_id=%s", current_user.user_id)
+    transactions, next_cursor = await TransactionService.search_transactions(
+        db, current_user.user_id, q,
+        start_date=start_date, end_date=end_date, account_id=account_id, category_id=category_id,
+        transaction_type=CategoryType(type) if type else None, tag_id=tag_id,
+        cursor=cursor, limit=limit, columns=TRANSACTION_LIST_COLUMNS if settings.FAST_LIST_SERIALIZATION else None,
+    )
+    return _list_response(transactions, limit, next_cursor)
+
+@router.get("/{transaction_id}", response_model=TransactionResponse)
+async def get_transaction(transaction_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    logger.info("Received request to get transaction_id=%s for user_id=%s", transaction_id, current_user.user_id)
+    return await TransactionService.get_transaction(db, transaction_id, current_user.user_id)
+
+@router.put("/{transaction_id}", response_model=TransactionResponse)
+async def update_transaction(transaction_id: int, transaction_in: TransactionUpdate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    logger.info("Received request to update transaction_id=%s for user_id=%s", transaction_id, current_user.user_id)
+    update_data = transaction_in.dict(exclude_unset=True)
+    return await TransactionService.update_transaction(db, transaction_id, current_user.user_id, update_data)
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_200_OK)
+async def delete_transaction(transaction_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    logger.info("Received request to delete transaction_id=%s for user_id=%s", transaction_id, current_user.user_id)
+    await TransactionService.delete_transaction(db, transaction_id, current_user.user_id)
+    logger.info("Transaction_id=%s deleted successfully", transaction_id)
+    return {"message": "Transaction deleted successfully"}
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Literal, Optional
-from datetime import datetime
+from pydantic import BaseModel, BeforeValidator, EmailStr, Field
+from typing import Annotated, List, Literal, Optional
+from datetime import date, datetime
+from decimal import Decimal
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -43,7 +44,7 @@ class ChangePassword(BaseModel):
 class AccountCreate(BaseModel):
     account_name: str
     account_type: Literal["cash", "bank_account", "credit_card", "e_wallet", "investment", "other"]
-    initial_balance: float
+    initial_balance: Decimal
     currency: str
 
 class AccountUpdate(BaseModel):
@@ -64,4 +65,145 @@ class AccountResponse(BaseModel):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Category Schemas
+class CategoryCreate(BaseModel):
+    category_name: str = Field(..., min_length=1, max_length=100)
+    category_type: Literal["expense", "income"]
+    parent_category_id: int | None = None
+    icon: str | None = Field(None, max_length=50)
+
+class CategoryUpdate(BaseModel):
+    category_name: str | None = Field(None, min_length=1, max_length=100)
+    parent_category_id: int | None = None
+    icon: str | None = Field(None, max_length=50)
+
+class CategoryResponse(BaseModel):
+    category_id: int
+    user_id: int | None = None
+    category_name: str
+    category_type: str
+    parent_category_id: int | None = None
+    icon: str | None = None
+    is_custom: bool
+
+    class Config:
+        from_attributes = True
+
+# Transaction Schemas
+class TransactionCreate(BaseModel):
+    account_id: int
+    category_id: int
+    amount: Decimal = Field(..., ge=0, max_digits=18, decimal_places=2)
+    transaction_date: Optional[datetime] = None
+    description: Optional[str] = None
+    location: Optional[str] = Field(None, max_length=255)
+
+class TransactionUpdate(BaseModel):
+    account_id: int | None = None
+    category_id: int | None = None
+    amount: Decimal | None = Field(None, ge=0, max_digits=18, decimal_places=2)
+    transaction_date: datetime | None = None
+    description: str | None = None
+    location: str | None = Field(None, max_length=255)
+
+class TransactionResponse(BaseModel):
+    transaction_id: int
+    user_id: int
+    account_id: int
+    category_id: int
+    amount: float
+    transaction_type: str
+    transaction_date: datetime
+    description: Optional[str] = None
+    location: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class BudgetAlert(BaseModel):
+    budget_id: int
+    category_id: int
+    budget_amount: float
+    spent_amount: float
+    threshold: Optional[float] = None  # ngưỡng (tỉ lệ của budget) vừa vượt qua bởi giao dịch này
+    exceeded: bool
+
+class TransactionCreateResponse(TransactionResponse):
+    budget_alerts: List[BudgetAlert] = []
+
+class TransactionListResponse(BaseModel):
+    items: List[TransactionResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+
+class TransactionImportRow(BaseModel):
+    transaction_date: datetime
+    amount: Decimal = Field(..., max_digits=18, decimal_places=2)
+    category: str = Field(..., min_length=1)
+    account: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = Field(None, max_length=255)
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+
+# Report Schemas
+def _parse_date_or_datetime(value):
+    # "YYYY-MM-DD" là trọn ngày; chuỗi có giờ là thời điểm chính xác (kể cả 00:00)
+    if isinstance(value, str):
+        return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+    return value
+
+DateOrDateTime = Annotated[date | datetime, BeforeValidator(_parse_date_or_datetime)]
+
+class ReportSummaryResponse(BaseModel):
+    total_income: float
+    total_expense: float
+    net_flow: float
+
+class CategorySpendingResponse(BaseModel):
+    category_id: int
+    category_name: Optional[str] = None
+    total_amount: float
+    percentage: float
+
+class NetWorthAccount(BaseModel):
+    account_id: int
+    account_name: str
+    currency: str
+    balance: float
+    converted_balance: float
+
+class NetWorthPoint(BaseModel):
+    day: date
+    net_worth: float
+    net_flow: float
+
+class NetWorthResponse(BaseModel):
+    currency: str
+    as_of: date
+    total: float
+    accounts: List[NetWorthAccount]
+    series: List[NetWorthPoint]
+
+class BudgetStatusResponse(BaseModel):
+    budget_id: int
+    category_id: int
+    category_name: Optional[str] = None
+    start_date: date
+    end_date: date
+    budget_amount: float
+    actual_spending: float
+    remaining_amount: float
+    percentage_used: float
+    is_exceeded: bool
@@ -0,0 +1,191 @@
+import asyncio
+from collections import defaultdict
+from contextlib import suppress
+from typing import AsyncIterator
+import orjson
+from app.core.config import settings
+from app.crud.account import ACCOUNT_CHANGES_CHANNEL
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+KEEPALIVE_EVENT = b": keepalive\n\n"
+# Sau khi mất kết nối LISTEN có thể đã lỡ thông báo - client nên tải lại danh sách account
+RESYNC_EVENT = b"event: resync\ndata: {}\n\n"
+
+class TooManySubscribers(Exception):
+    pass
+
+class Subscriber:
+    """Pending SSE chunks for one connection; lighter than asyncio.Queue (no deques) with thousands idle."""
+
+    __slots__ = ("pending", "waiter")
+
+    def __init__(self):
+        self.pending: list[bytes] = []
+        self.waiter: asyncio.Future | None = None
+
+    def wake(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def next_chunk(self) -> bytes:
+        while not self.pending:
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        # Gom các event đang chờ thành một lần gửi
+        chunk = b"".join(self.pending)
+        self.pending.clear()
+        return chunk
+
+def sse_event(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+class AccountFeed:
+    """One LISTEN connection per worker, fanning NOTIFY payloads out to per-user subscribers.
+
+    The listener starts with the first subscriber and reconnects with backoff; a single keepalive task
+    writes SSE comments to every subscriber so idle connections need no timer of their own.
+    """
+
+    def __init__(self, max_subscribers: int, queue_size: int, keepalive_seconds: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self._subscribers: dict[int, set[Subscriber]] = defaultdict(set)
+        self._count = 0
+        self._tasks: list[asyncio.Task] = []
+        self.connected = False
+        self.notifications = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        if self._count >= self.max_subscribers:
+            raise TooManySubscribers()
+        self._ensure_started()
+        subscriber = Subscriber()
+        self._subscribers[user_id].add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, user_id: int, subscriber: Subscriber):
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        self._count -= 1
+        if not subscribers:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id: int, message: bytes):
+        for subscriber in self._subscribers.get(user_id, ()):
+            self._put(subscriber, message)
+
+    def _put(self, subscriber: Subscriber, message: bytes):
+        if len(subscriber.pending) >= self.queue_size:
+            # Client đọc chậm: bỏ event cũ nhất, event sau vẫn mang số dư mới nhất của account
+            del subscriber.pending[0]
+            self.dropped += 1
+        subscriber.pending.append(message)
+        subscriber.wake()
+
+    def _broadcast(self, message: bytes):
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                if message is KEEPALIVE_EVENT and subscriber.pending:
+                    continue
+                self._put(subscriber, message)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self.notifications += 1
+        try:
+            user_id = orjson.loads(payload)["user_id"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Ignoring malformed %s payload: %s", channel, payload[:200])
+            return
+        # Encode một lần, dùng chung bytes cho mọi kết nối của user
+        self.publish(user_id, sse_event("account", payload.encode()))
+
+    def _ensure_started(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen_forever()), asyncio.create_task(self._keepalive_forever())]
+
+    async def _listen_forever(self):
+        import asyncpg
+
+        dsn = settings.ACCOUNT_STREAM_DATABASE_URL or settings.DATABASE_URL
+        delay = 1
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(ACCOUNT_CHANGES_CHANNEL, self._on_notify)
+                self.connected = True
+                logger.info("Account feed listening on channel %s", ACCOUNT_CHANGES_CHANNEL)
+                if connected_before:
+                    self.reconnects += 1
+                    self._broadcast(RESYNC_EVENT)
+                connected_before = True
+                delay = 1
+                while not lost.is_set():
+                    # Kết nối LISTEN chỉ nhận, không gửi - ping định kỳ để phát hiện TCP đã chết
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(lost.wait(), timeout=self.keepalive_seconds * 4)
+                    if not lost.is_set():
+                        await connection.fetchval("SELECT 1")
+                logger.warning("Account feed connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Account feed listener failed: %s", e)
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _keepalive_forever(self):
+        while True:
+            await asyncio.sleep(self.keepalive_seconds)
+            self._broadcast(KEEPALIVE_EVENT)
+
+    async def events(self, user_id: int, subscriber: Subscriber, first: bytes) -> AsyncIterator[bytes]:
+        """SSE body for one subscriber; unsubscribes when the client disconnects."""
+        try:
+            yield first
+            while True:
+                yield await subscriber.next_chunk()
+        finally:
+            self.unsubscribe(user_id, subscriber)
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        with suppress(asyncio.CancelledError):
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.ACCOUNT_STREAM_ENABLED,
+            "listening": bool(self._tasks),
+            "connected": self.connected,
+            "subscribers": self._count,
+            "users": len(self._subscribers),
+            "notifications": self.notifications,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        }
+
+account_feed = AccountFeed(
+    settings.ACCOUNT_STREAM_MAX_SUBSCRIBERS, settings.ACCOUNT_STREAM_QUEUE_SIZE, settings.ACCOUNT_STREAM_KEEPALIVE_SECONDS
+)
@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.models.category import Category, CategoryType
+
+# Setup logger
+logger = setup_logger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class CategoryNode:
+    category_id: int
+    user_id: int | None
+    category_name: str
+    category_type: CategoryType
+    parent_category_id: int | None
+    icon: str | None
+    is_custom: bool
+
+class CategoryTree:
+    """Immutable snapshot of the categories visible to one user (system + own), with precomputed hierarchy."""
+
+    def __init__(self, nodes: list[CategoryNode], version: tuple[int, int]):
+        self.version = version
+        self.nodes: dict[int, CategoryNode] = {node.category_id: node for node in nodes}
+        self.types: dict[int, CategoryType] = {node.category_id: node.category_type for node in nodes}
+        self.children: dict[int, list[int]] = {category_id: [] for category_id in self.nodes}
+        for node in nodes:
+            if node.parent_category_id in self.nodes:
+                self.children[node.parent_category_id].append(node.category_id)
+
+        # ancestors: cha, ông... (không gồm chính nó); dừng khi gặp vòng lặp hoặc cha không truy cập được
+        self.ancestors: dict[int, tuple[int, ...]] = {}
+        for category_id, node in self.nodes.items():
+            chain = []
+            parent_id = node.parent_category_id
+            while parent_id in self.nodes and parent_id != category_id and parent_id not in chain:
+                chain.append(parent_id)
+                parent_id = self.nodes[parent_id].parent_category_id
+            self.ancestors[category_id] = tuple(chain)
+
+        # descendants: gồm chính nó, dùng trực tiếp cho điều kiện category_id IN (...) khi rollup
+        descendants: dict[int, set[int]] = {category_id: {category_id} for category_id in self.nodes}
+        for category_id, chain in self.ancestors.items():
+            for ancestor_id in chain:
+                descendants[ancestor_id].add(category_id)
+        self.descendants: dict[int, frozenset[int]] = {k: frozenset(v) for k, v in descendants.items()}
+        self.roots: dict[int, int] = {
+            category_id: (chain[-1] if chain else category_id) for category_id, chain in self.ancestors.items()
+        }
+
+    def get(self, category_id: int) -> CategoryNode | None:
+        return self.nodes.get(category_id)
+
+    def type_of(self, category_id: int) -> CategoryType | None:
+        return self.types.get(category_id)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+class CategoryTreeCache:
+    """Per-process LRU of CategoryTree per user, validated against (system, user) version counters.
+
+    Category writes in this process bump the versions, so stale trees are rebuilt on next access;
+    the TTL bounds staleness for writes made by other worker processes. Callers that find a category
+    missing from the tree reload it with fresh=True before rejecting the request.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._system_version = 0
+        self._user_versions: dict[int, int] = {}
+        self._trees: OrderedDict[int, tuple[float, CategoryTree]] = OrderedDict()
+        self._lock = Lock()
+
+    def _version(self, user_id: int) -> tuple[int, int]:
+        return self._system_version, self._user_versions.get(user_id, 0)
+
+    async def get(self, db: AsyncSession, user_id: int, fresh: bool = False) -> CategoryTree:
+        with self._lock:
+            version = self._version(user_id)
+            entry = self._trees.get(user_id) if self.enabled and not fresh else None
+            if entry is not None and entry[0] > time.monotonic() and entry[1].version == version:
+                self._trees.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Một truy vấn lấy toàn bộ danh mục hệ thống + của user, dựng cây ngoài lock
+        result = await db.execute(
+            select(
+                Category.category_id, Category.user_id, Category.category_name, Category.category_type,
+                Category.parent_category_id, Category.icon, Category.is_custom,
+            ).filter(or_(Category.user_id.is_(None), Category.user_id == user_id))
+        )
+        tree = CategoryTree([CategoryNode(*row) for row in result.all()], version)
+        logger.debug("Built category tree for user_id=%s: %d categories", user_id, len(tree))
+
+        if self.enabled:
+            with self._lock:
+                # Không lưu nếu đã bị invalidate trong lúc đang query
+                if self._version(user_id) == version:
+                    self._trees[user_id] = (time.monotonic() + self.ttl_seconds, tree)
+                    self._trees.move_to_end(user_id)
+                    while len(self._trees) > self.max_size:
+                        self._trees.popitem(last=False)
+        return tree
+
+    def invalidate(self, user_id: int | None):
+        """Invalidate after a category write; user_id None means a system category changed."""
+        with self._lock:
+            if user_id is None:
+                self._system_version += 1
+                self._trees.clear()
+            else:
+                self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+                self._trees.pop(user_id, None)
+        logger.debug("Invalidated category tree for user_id=%s", user_id if user_id is not None else "ALL")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "cached_users": len(self._trees),
+            "system_version": self._system_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+category_cache = CategoryTreeCache(
+    settings.CATEGORY_CACHE_TTL_SECONDS, settings.CATEGORY_CACHE_MAX_SIZE, enabled=settings.CATEGORY_CACHE_ENABLED
+)
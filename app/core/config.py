@@ -12,6 +12,103 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Cache token đã xác minh, hết hạn theo exp của chính token
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing (bcrypt chạy trong thread pool riêng, không chặn event loop)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64  # số job chờ tối đa, vượt quá trả về 503
+
+    # Rate limit /auth/login, /auth/signup, /auth/reset-password/request: token bucket theo IP và theo email
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" hoặc "redis" (dùng chung giữa nhiều worker)
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 100000  # số bucket tối đa giữ trong bộ nhớ mỗi process (LRU)
+    RATE_LIMIT_IP_BURST: int = 20
+    RATE_LIMIT_IP_PER_MINUTE: float = 10
+    RATE_LIMIT_EMAIL_BURST: int = 5
+    RATE_LIMIT_EMAIL_PER_MINUTE: float = 1
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0  # số reverse proxy phía trước app; > 0 thì lấy IP client từ X-Forwarded-For
+
+    # Database connection pool settings
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # giây chờ lấy connection trước khi báo lỗi
+    DB_POOL_RECYCLE: int = 1800  # giây, -1 để tắt
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = không giới hạn
+    # Chạy sau PgBouncer (transaction pooling): dùng NullPool, tắt prepared statements
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Cache user đã xác thực (giảm SELECT users mỗi request)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_BACKEND: str = "memory"  # "memory" hoặc "redis" (dùng chung giữa nhiều worker)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Cache cây danh mục theo user (hệ thống + riêng)
+    CATEGORY_CACHE_ENABLED: bool = True
+    CATEGORY_CACHE_TTL_SECONDS: int = 300
+    CATEGORY_CACHE_MAX_SIZE: int = 10000
+
+    # Múi giờ xác định "ngày" của bảng rollup báo cáo (đổi giá trị cần chạy rebuild_rollups)
+    REPORT_TIMEZONE: str = "UTC"
+
+    # Cảnh báo budget khi ghi giao dịch: tỉ lệ chi tiêu/budget, cách nhau bởi dấu phẩy
+    BUDGET_ALERT_THRESHOLDS: str = "0.8,1.0"
+
+    # Tỷ giá cho báo cáo net worth: rate = giá trị 1 đơn vị ngoại tệ quy ra FX_BASE_CURRENCY
+    FX_BASE_CURRENCY: str = "USD"
+    FX_RATES_FILE: str = ""  # CSV date,currency,rate; để trống thì đọc bảng exchange_rates
+    FX_CACHE_TTL_SECONDS: int = 3600
+
+    # Scheduler sinh giao dịch lặp lại (chạy trong app hoặc qua run_recurring.py)
+    RECURRING_SCHEDULER_ENABLED: bool = False
+    RECURRING_INTERVAL_SECONDS: int = 60
+    RECURRING_BATCH_SIZE: int = 500
+    RECURRING_MAX_CATCHUP: int = 366  # số lần lặp tối đa sinh cho một định nghĩa trong một lượt
+
+    # Idempotency-Key cho POST/PUT/PATCH/DELETE: response lần đầu lưu ở bảng idempotency_keys, retry được trả lại từ đó
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60  # key "processing" quá hạn này (process chết giữa chừng) được nhận lại
+    IDEMPOTENCY_WAIT_SECONDS: float = 10  # request trùng chờ request đầu tối đa bao lâu trước khi trả 409
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 1048576  # response lớn hơn không lưu (retry sẽ chạy lại endpoint)
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS: int = 3600
+
+    # Import giao dịch hàng loạt
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+    # Export giao dịch (stream từ server-side cursor, mỗi batch một row group parquet)
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Serialize danh sách: select cột + TypeAdapter + orjson thay cho ORM + response_model
+    FAST_LIST_SERIALIZATION: bool = True
+    LIST_STREAM_BATCH_SIZE: int = 1000  # số dòng mỗi lần fetch khi stream NDJSON
+
+    # Stream thay đổi account qua SSE (GET /accounts/stream): NOTIFY từ đường ghi, mỗi worker một kết nối LISTEN
+    ACCOUNT_STREAM_ENABLED: bool = True
+    ACCOUNT_STREAM_DATABASE_URL: str = ""  # để trống dùng DATABASE_URL; sau PgBouncer (transaction pooling) phải trỏ thẳng tới Postgres
+    ACCOUNT_STREAM_MAX_SUBSCRIBERS: int = 10000  # số kết nối SSE tối đa mỗi worker, vượt quá trả về 503
+    ACCOUNT_STREAM_QUEUE_SIZE: int = 32  # event chờ gửi tối đa mỗi kết nối; đầy thì bỏ event cũ nhất
+    ACCOUNT_STREAM_KEEPALIVE_SECONDS: int = 15
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # level riêng theo logger, ví dụ "app.crud=DEBUG,app.services.email_service=WARNING"
+    LOG_FORMAT: str = "text"  # text | json
+    LOG_DEBUG_SAMPLE_RATES: str = ""  # tỉ lệ ghi log DEBUG theo prefix route, ví dụ "/accounts=0.1,/transactions=0.01"
+
+    # Metrics / instrumentation
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = True
+    METRICS_N_PLUS_ONE_THRESHOLD: int = 0  # > 0: log cảnh báo khi một request chạy nhiều query hơn ngưỡng
+    # Bearer token cho /metrics và /internal/*; để trống thì các route này trả 404
+    INTERNAL_API_TOKEN: str = ""
 
     # Email settings
     MAIL_USERNAME: str = "your-email-username"
@@ -20,6 +117,19 @@ class Settings(BaseSettings):
     MAIL_PORT: int = 587
     MAIL_SERVER: str = "smtp.example.com"
     MAIL_FROM_NAME: str = "Your App Name"
+    MAIL_STARTTLS: bool = True
+    MAIL_SSL_TLS: bool = False
+    MAIL_TIMEOUT_SECONDS: int = 30
+
+    # Hàng đợi email (outbox)
+    EMAIL_WORKER_ENABLED: bool = True
+    EMAIL_WORKERS: int = 2  # mỗi worker giữ một kết nối SMTP
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_POLL_INTERVAL_SECONDS: int = 5
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_SEND_TIMEOUT_SECONDS: int = 120  # dòng "sending" quá hạn này được worker khác nhận lại
 
     # Frontend URL for activation/reset links
     FRONTEND_URL: str = "http://localhost:3000"
@@ -28,6 +138,10 @@ class Settings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,25 @@
+import hashlib
+from fastapi import Request, Response, status
+
+def make_etag(*parts) -> str:
+    """Weak ETag from version parts (ids, updated_at, query params...)."""
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # So sánh weak: bỏ tiền tố W/ ở cả hai phía
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    # Client phải revalidate mỗi lần, nhưng được phép dùng lại body khi nhận 304
+    response.headers["Cache-Control"] = "private, no-cache"
@@ -0,0 +1,140 @@
+import asyncio
+import csv
+import time
+from datetime import date
+from threading import Lock
+from typing import Iterable
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.models.exchange_rate import ExchangeRate
+
+# Setup logger
+logger = setup_logger(__name__)
+
+class UnknownCurrency(ValueError):
+    pass
+
+def to_epoch_days(days) -> np.ndarray:
+    """date / datetime64 / list of those -> int64 days since 1970-01-01."""
+    return np.asarray(days, dtype="datetime64[D]").astype(np.int64)
+
+def _currency_keys(codes: np.ndarray) -> np.ndarray:
+    # Mã 3 ký tự -> một số int64 (mỗi ký tự 21 bit) để tra bằng searchsorted thay vì so sánh chuỗi
+    chars = np.ascontiguousarray(codes, dtype="U3").view(np.uint32).reshape(codes.shape + (3,)).astype(np.int64)
+    return (chars[..., 0] << 42) | (chars[..., 1] << 21) | chars[..., 2]
+
+def _fill_forward(matrix: np.ndarray) -> np.ndarray:
+    # Lấy chỉ số dòng gần nhất có giá trị cho từng cột rồi gather một lần, không lặp theo ngày
+    rows = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return matrix[rows, np.arange(matrix.shape[1])]
+
+class FxRates:
+    """Dense day x currency matrix of rates (value of 1 unit in FX_BASE_CURRENCY).
+
+    Missing days (weekends, holidays) carry the previous rate forward; days before a currency's first
+    rate use that first rate, days after the last loaded day use the last one.
+    """
+
+    def __init__(self, records: Iterable[tuple[date, str, float]], base_currency: str):
+        records = list(records)
+        self.base_currency = base_currency
+        currencies = sorted({currency for _, currency, _ in records} | {base_currency})
+        self.currencies: dict[str, int] = {currency: i for i, currency in enumerate(currencies)}
+        keys = _currency_keys(np.array(currencies, dtype="U3"))
+        self._key_order = np.argsort(keys)
+        self._sorted_keys = keys[self._key_order]
+        if records:
+            days = to_epoch_days([day for day, _, _ in records])
+            self.start_day = int(days.min())
+            n_days = int(days.max()) - self.start_day + 1
+        else:
+            days = np.empty(0, dtype=np.int64)
+            self.start_day = int(to_epoch_days(date.today()))
+            n_days = 1
+        matrix = np.full((n_days, len(currencies)), np.nan)
+        matrix[days - self.start_day, [self.currencies[currency] for _, currency, _ in records]] = [rate for _, _, rate in records]
+        matrix[:, self.currencies[base_currency]] = 1.0
+        matrix = _fill_forward(matrix)
+        self.matrix = _fill_forward(matrix[::-1])[::-1]
+        self.rate_count = len(records)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def currency_indices(self, codes) -> np.ndarray:
+        codes = np.asarray(codes, dtype="U3")
+        keys = _currency_keys(codes)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self._sorted_keys) - 1)
+        found = self._sorted_keys[positions] == keys
+        if not found.all():
+            missing = sorted(set(codes[~found].tolist()))
+            raise UnknownCurrency(f"No exchange rates for currency: {', '.join(missing)}")
+        return self._key_order[positions]
+
+    def day_indices(self, epoch_days: np.ndarray) -> np.ndarray:
+        return np.clip(np.asarray(epoch_days, dtype=np.int64) - self.start_day, 0, len(self) - 1)
+
+    def factors(self, epoch_days, from_currencies, to_currency: str) -> np.ndarray:
+        """Multipliers converting amounts in from_currencies on epoch_days into to_currency."""
+        from_currencies = np.asarray(from_currencies, dtype="U3")
+        if (from_currencies == to_currency).all():
+            return np.ones(np.broadcast(np.asarray(epoch_days), from_currencies).shape)
+        day_index = self.day_indices(epoch_days)
+        to_index = self.currency_indices([to_currency])[0]
+        return self.matrix[day_index, self.currency_indices(from_currencies)] / self.matrix[day_index, to_index]
+
+    def convert(self, amounts, epoch_days, from_currencies, to_currency: str) -> np.ndarray:
+        return np.asarray(amounts, dtype=np.float64) * self.factors(epoch_days, from_currencies, to_currency)
+
+def load_rates_file(path: str) -> list[tuple[date, str, float]]:
+    """CSV with header date,currency,rate (rate = value of 1 unit in FX_BASE_CURRENCY)."""
+    with open(path, newline="") as f:
+        return [(date.fromisoformat(row["date"]), row["currency"].strip().upper(), float(row["rate"])) for row in csv.DictReader(f)]
+
+class FxRateCache:
+    """Process-wide FxRates snapshot, reloaded from FX_RATES_FILE or the exchange_rates table after the TTL."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._rates: FxRates | None = None
+        self._expires_at = 0.0
+        self._lock = Lock()
+        # Chỉ một coroutine nạp lại khi hết TTL, các coroutine khác chờ rồi dùng snapshot vừa nạp
+        self._reload_lock = asyncio.Lock()
+
+    def _current(self) -> FxRates | None:
+        with self._lock:
+            if self._rates is not None and self._expires_at > time.monotonic():
+                return self._rates
+        return None
+
+    async def get(self, db: AsyncSession) -> FxRates:
+        rates = self._current()
+        if rates is not None:
+            return rates
+        async with self._reload_lock:
+            rates = self._current()
+            if rates is not None:
+                return rates
+            if settings.FX_RATES_FILE:
+                # Đọc file + parse CSV và dựng ma trận trong thread, không chặn event loop
+                records = await asyncio.to_thread(load_rates_file, settings.FX_RATES_FILE)
+            else:
+                result = await db.execute(select(ExchangeRate.rate_date, ExchangeRate.currency, ExchangeRate.rate))
+                records = [(rate_date, currency, float(rate)) for rate_date, currency, rate in result.all()]
+            rates = await asyncio.to_thread(FxRates, records, settings.FX_BASE_CURRENCY)
+            logger.info("Loaded %d exchange rates: %d days x %d currencies", rates.rate_count, len(rates), len(rates.currencies))
+            with self._lock:
+                self._rates = rates
+                self._expires_at = time.monotonic() + self.ttl_seconds
+        return rates
+
+    def invalidate(self):
+        with self._lock:
+            self._rates = None
+
+fx_cache = FxRateCache(settings.FX_CACHE_TTL_SECONDS)
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import time
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.security import decode_access_token
+from app.crud.idempotency import (
+    claim_idempotency_key, complete_idempotency_key, get_idempotency_key, purge_expired_idempotency_keys,
+    release_idempotency_key,
+)
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+# Header không lưu lại khi replay (gắn theo từng response)
+_SKIPPED_HEADERS = {b"server-timing", b"date"}
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def _user_id(scope) -> int | None:
+    # Key thuộc về từng user; token sai để endpoint tự trả 401 như bình thường
+    authorization = _header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    token_data = decode_access_token(authorization[7:].strip())
+    return token_data["user_id"] if token_data else None
+
+def request_fingerprint(scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope["query_string"], body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+def _error(status_code: int, detail: str, headers: dict | None = None) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware for the Idempotency-Key header on write requests.
+
+    The first request with a key runs the endpoint and its response is stored in idempotency_keys;
+    retries with the same key and request are answered from the table without running the endpoint,
+    and duplicates arriving while the first is still running wait for its result.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS or not settings.IDEMPOTENCY_ENABLED:
+            return await self.app(scope, receive, send)
+        key = _header(scope, b"idempotency-key")
+        if key is None:
+            return await self.app(scope, receive, send)
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await _error(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")(scope, receive, send)
+        user_id = _user_id(scope)
+        if user_id is None:
+            return await self.app(scope, receive, send)
+
+        # Đọc hết body để tính fingerprint, sau đó phát lại cho endpoint
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        request_hash = request_fingerprint(scope, body)
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.01
+        while True:
+            async with AsyncSessionLocal() as db:
+                if await claim_idempotency_key(db, user_id, key, request_hash):
+                    break
+                record = await get_idempotency_key(db, user_id, key)
+            # record None: request đầu vừa lỗi và xóa key - thử nhận lại, vẫn qua deadline và backoff bên dưới
+            if record is not None and record.request_hash != request_hash:
+                logger.warning(
+                    "Idempotency-Key reused with a different request: user_id=%s, path=%s", user_id, scope["path"]
+                )
+                return await _error(422, "Idempotency-Key was already used with a different request")(scope, receive, send)
+            if record is not None and record.status == "completed":
+                logger.info("Replaying stored response for idempotency key: user_id=%s, path=%s", user_id, scope["path"])
+                return await self._replay(record, send)
+            if time.monotonic() >= deadline:
+                return await _error(
+                    409, "A request with this Idempotency-Key is still being processed", {"Retry-After": "1"}
+                )(scope, receive, send)
+            # Request đầu đang chạy (có thể ở worker khác) - chờ với backoff rồi đọc lại
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+        await self._execute(scope, body, receive, send, user_id, key, request_hash)
+
+    async def _execute(self, scope, body: bytes, receive, send, user_id: int, key: str, request_hash: str):
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        headers = []
+        response_chunks = []
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, headers, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", []) if name.lower() not in _SKIPPED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+                if response_size <= settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                    response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except BaseException:
+            await self._release(user_id, key, request_hash)
+            raise
+        if status_code >= 500 or response_size > settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+            await self._release(user_id, key, request_hash)
+            return
+        async with AsyncSessionLocal() as db:
+            await complete_idempotency_key(db, user_id, key, request_hash, status_code, headers, b"".join(response_chunks))
+
+    @staticmethod
+    async def _release(user_id: int, key: str, request_hash: str):
+        try:
+            async with AsyncSessionLocal() as db:
+                await release_idempotency_key(db, user_id, key, request_hash)
+        except Exception as e:
+            # Không xóa được thì key hết hạn khóa sau IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+            logger.error("Failed to release idempotency key for user_id=%s: %s", user_id, e)
+
+    @staticmethod
+    async def _replay(record, send):
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.response_headers or []]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": record.response_status, "headers": headers})
+        await send({"type": "http.response.body", "body": record.response_body or b""})
+
+async def purge_expired_keys_forever(interval: int | None = None):
+    interval = interval or settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await purge_expired_idempotency_keys(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Idempotency key cleanup failed: %s", e)
+        await asyncio.sleep(interval)
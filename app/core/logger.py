@@ -1,16 +1,109 @@
+import atexit
+import contextvars
+import json
 import logging
+import queue
+import random
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from app.core.config import settings
 
-def setup_logger(name: str) -> logging.Logger:
-    logger = logging.getLogger(name)
-    if not logger.handlers:  # Tránh thêm handler nhiều lần
-        logger.setLevel(logging.DEBUG)
+APP_LOGGER = "app"
+
+# Debug log của request hiện tại có được ghi hay không (lấy mẫu theo route)
+_debug_sampled = contextvars.ContextVar("debug_sampled", default=True)
+
+def _parse_mapping(value: str) -> dict[str, str]:
+    # "app.crud=DEBUG,app.services.email_service=WARNING" -> {"app.crud": "DEBUG", ...}
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): val.strip() for key, val in pairs}
+
+LOG_LEVELS = {name: level.upper() for name, level in _parse_mapping(settings.LOG_LEVELS).items()}
+DEBUG_SAMPLE_RATES = sorted(
+    ((prefix, float(rate)) for prefix, rate in _parse_mapping(settings.LOG_DEBUG_SAMPLE_RATES).items()),
+    key=lambda item: len(item[0]), reverse=True,  # prefix dài nhất khớp trước
+)
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class DebugSamplingFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or _debug_sampled.get()
+
+class _AppQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Chỉ ghép msg % args ở thread gọi (args có thể là object ORM); format đầy đủ và ghi stdout ở thread listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _configure() -> QueueListener:
+    if settings.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-    return logger
\ No newline at end of file
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = _AppQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter())
+    app_logger = logging.getLogger(APP_LOGGER)
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.addHandler(queue_handler)
+    app_logger.propagate = False
+    return listener
+
+_listener = _configure()
+
+def setup_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    # Level theo cấu hình riêng của module (hoặc package cha gần nhất); mặc định kế thừa LOG_LEVEL của "app"
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        level = LOG_LEVELS.get(".".join(parts[:i]))
+        if level:
+            logger.setLevel(level)
+            break
+    return logger
+
+def sample_debug(path: str) -> bool:
+    """Decide whether DEBUG records are emitted for the current request path."""
+    rate = next((rate for prefix, rate in DEBUG_SAMPLE_RATES if path.startswith(prefix)), 1.0)
+    return rate >= 1.0 or random.random() < rate
+
+class DebugSamplingMiddleware:
+    """Pure ASGI middleware applying LOG_DEBUG_SAMPLE_RATES per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DEBUG_SAMPLE_RATES:
+            return await self.app(scope, receive, send)
+        token = _debug_sampled.set(sample_debug(scope["path"]))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _debug_sampled.reset(token)
@@ -0,0 +1,164 @@
+import contextvars
+import time
+from collections import Counter
+from threading import Lock
+from sqlalchemy import event
+from app.core import database
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = Lock()
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            label_str = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            prefix = label_str + "," if label_str else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            suffix = f"{{{label_str}}}" if label_str else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return lines
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status"), LATENCY_BUCKETS
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("route",), QUERY_COUNT_BUCKETS
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Total database time per request", ("route",), LATENCY_BUCKETS
+)
+bcrypt_duration = Histogram("bcrypt_duration_seconds", "bcrypt hash/verify time", ("operation",), LATENCY_BUCKETS)
+jwt_decode_duration = Histogram("jwt_decode_duration_seconds", "JWT signature verification time", (), LATENCY_BUCKETS)
+
+class RequestTimings:
+    __slots__ = ("db_queries", "db_time", "bcrypt_time", "jwt_time", "statements")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.bcrypt_time = 0.0
+        self.jwt_time = 0.0
+        self.statements = Counter() if settings.METRICS_N_PLUS_ONE_THRESHOLD > 0 else None
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join((
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f"bcrypt;dur={self.bcrypt_time * 1000:.1f}",
+            f"jwt;dur={self.jwt_time * 1000:.1f}",
+            f"app;dur={total * 1000:.1f}",
+        ))
+
+# Số liệu của request hiện tại; None khi chạy ngoài request (worker, script)
+_current = contextvars.ContextVar("request_timings", default=None)
+
+def record_bcrypt(operation: str, seconds: float):
+    bcrypt_duration.observe(seconds, operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.bcrypt_time += seconds
+
+def record_jwt_decode(seconds: float):
+    jwt_decode_duration.observe(seconds)
+    timings = _current.get()
+    if timings is not None:
+        timings.jwt_time += seconds
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    timings = _current.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_time += elapsed
+        if timings.statements is not None:
+            timings.statements[statement] += 1
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in (request_duration, request_db_queries, request_db_duration, bcrypt_duration, jwt_decode_duration):
+        lines.extend(histogram.render())
+    for key, value in database.get_pool_stats().items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"db_pool_{key} {value}")
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency histogram per route template, DB/bcrypt/JWT time and Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.METRICS_SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timings.server_timing(time.perf_counter() - start).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+            # Dùng template của route (/accounts/{account_id}) để số series không phụ thuộc vào id
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_duration.observe(elapsed, scope["method"], route_path, str(status_code))
+            request_db_queries.observe(timings.db_queries, route_path)
+            request_db_duration.observe(timings.db_time, route_path)
+            threshold = settings.METRICS_N_PLUS_ONE_THRESHOLD
+            if threshold > 0 and timings.db_queries > threshold:
+                statement, repeats = timings.statements.most_common(1)[0]
+                logger.warning(
+                    "Possible N+1: %s %s issued %d queries (%.1f ms); most repeated (%dx): %s",
+                    scope["method"], route_path, timings.db_queries, timings.db_time * 1000, repeats, " ".join(statement.split())[:300],
+                )
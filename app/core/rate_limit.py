@@ -0,0 +1,230 @@
+import math
+import time
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import parse_qs
+import orjson
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+# path (POST) -> nơi lấy email cho bucket theo email: body JSON hoặc query string
+RATE_LIMITED_PATHS = {
+    "/auth/login": "json",
+    "/auth/signup": "json",
+    "/auth/reset-password/request": "query",
+}
+MAX_INSPECTED_BODY = 16 * 1024  # body lớn hơn không parse để lấy email, chỉ áp dụng bucket theo IP
+
+class RateLimitBackend:
+    """Token bucket storage: take() consumes one token and returns seconds to wait (0 = allowed)."""
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets in LRU order; buckets that have refilled completely are dropped."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()  # key -> (tokens, updated_at, full_at)
+        self._lock = Lock()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._buckets.pop(key, None)
+            if entry is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, entry[0] + (now - entry[1]) * refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+            # Bucket đã đầy lại tương đương bucket mới - bỏ đi từ đầu LRU, rồi cắt theo max_keys
+            while self._buckets:
+                oldest = next(iter(self._buckets.values()))
+                if oldest[2] > now and len(self._buckets) <= self.max_keys:
+                    break
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+# Refill + consume nguyên tử trên Redis, thời gian lấy từ server Redis để các worker dùng chung một đồng hồ
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Shared buckets so every worker enforces the same limits (requires `redis`)."""
+
+    def __init__(self, url: str, prefix: str = "rate_limit:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        return float(await self._take(keys=[f"{self.prefix}{key}"], args=[capacity, refill_per_second]))
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.allowed = 0
+        self.rejected = {"ip": 0, "email": 0}
+        self.backend_errors = 0
+
+    async def check(self, ip: str, email: str | None) -> float:
+        """Seconds the client must wait, or 0 when both the IP and the email bucket allow the request."""
+        limits = [("ip", ip, settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_IP_PER_MINUTE)]
+        if email:
+            limits.append(("email", email, settings.RATE_LIMIT_EMAIL_BURST, settings.RATE_LIMIT_EMAIL_PER_MINUTE))
+        for kind, value, burst, per_minute in limits:
+            try:
+                retry_after = await self.backend.take(f"{kind}:{value}", burst, per_minute / 60)
+            except Exception as e:
+                # Backend dùng chung lỗi thì cho qua, không để rate limit làm sập đăng nhập
+                self.backend_errors += 1
+                logger.warning("Rate limit backend error, allowing request: %s", e)
+                return 0.0
+            if retry_after > 0:
+                self.rejected[kind] += 1
+                return retry_after
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "keys": len(self.backend) if isinstance(self.backend, InMemoryRateLimitBackend) else None,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "backend_errors": self.backend_errors,
+        }
+
+def client_ip(scope) -> str:
+    # Sau RATE_LIMIT_TRUSTED_PROXIES proxy: IP client là phần tử thứ N tính từ cuối X-Forwarded-For
+    hops = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if hops > 0:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                forwarded = [part.strip() for part in value.decode("latin-1").split(",") if part.strip()]
+                if forwarded:
+                    return forwarded[max(len(forwarded) - hops, 0)]
+                break
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+def _email_from_body(body: bytes) -> str | None:
+    if len(body) > MAX_INSPECTED_BODY:
+        return None
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return None
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+def _email_from_query(query_string: bytes) -> str | None:
+    values = parse_qs(query_string.decode("latin-1")).get("email")
+    return values[0].strip().lower() if values and values[0].strip() else None
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware: token buckets per client IP and per email on the auth endpoints.
+
+    Rejected requests get 429 before routing, so no DB session is opened and bcrypt never runs.
+    """
+
+    def __init__(self, app, limiter: "RateLimiter | None" = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        source = RATE_LIMITED_PATHS.get(scope["path"])
+        if source is None:
+            return await self.app(scope, receive, send)
+
+        email = None
+        if source == "query":
+            email = _email_from_query(scope["query_string"])
+        else:
+            # Đọc trước body để lấy email, sau đó phát lại nguyên vẹn cho endpoint
+            chunks = []
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    return
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    break
+            body = b"".join(chunks)
+            email = _email_from_body(body)
+            replayed = False
+
+            async def replay():
+                nonlocal replayed
+                if not replayed:
+                    replayed = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                return await receive()
+
+            receive = replay
+
+        ip = client_ip(scope)
+        retry_after = await self.limiter.check(ip, email)
+        if retry_after > 0:
+            logger.warning("Rate limited %s from ip=%s, email=%s, retry_after=%.1fs", scope["path"], ip, email, retry_after)
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please retry later"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+def _build_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+rate_limiter = RateLimiter(_build_backend(), enabled=settings.RATE_LIMIT_ENABLED)
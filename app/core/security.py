@@ -1,10 +1,47 @@
+import asyncio
+import hashlib
+import time
 import jwt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from threading import BoundedSemaphore, Lock
+from typing import Callable
 from passlib.context import CryptContext
+from app.core import metrics
 from app.core.config import settings
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max rounds = BCRYPT_ROUNDS để needs_update() báo các hash có cost khác cấu hình
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+class PasswordHashQueueFull(Exception):
+    """Raised when the bcrypt worker pool already has PASSWORD_HASH_QUEUE_LIMIT jobs waiting."""
+
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT)
+
+def _timed(func, *args):
+    # Đo thời gian chạy bcrypt trong worker thread (không tính thời gian chờ hàng đợi)
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+async def _run_hash_job(func, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashQueueFull()
+    try:
+        result, elapsed = await asyncio.get_running_loop().run_in_executor(_hash_executor, _timed, func, *args)
+    finally:
+        _hash_slots.release()
+    metrics.record_bcrypt(func.__name__, elapsed)
+    return result
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +49,98 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password; the second item is a fresh hash when the stored one uses an outdated cost."""
+    return await _run_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+# Verified token cache
+class VerifiedTokenCache:
+    """Bounded LRU of verified JWT payloads keyed by token digest; entries expire at the token's `exp`."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, digest: str) -> dict | None:
+        with self._lock:
+            payload = self._data.get(digest)
+            if payload is None or payload["exp"] <= time.time():
+                if payload is not None:
+                    del self._data[digest]
+                self.misses += 1
+                return None
+            self._data.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def set(self, digest: str, payload: dict):
+        if "exp" not in payload:
+            return  # Không cache token không có hạn
+        with self._lock:
+            self._data[digest] = payload
+            self._data.move_to_end(digest)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def discard(self, digest: str):
+        with self._lock:
+            self._data.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_MAX_SIZE)
+
+# Hook cho danh sách token bị thu hồi (blacklist): nhận (digest, payload), trả về True nếu token đã bị thu hồi
+_revocation_check: Callable[[str, dict], bool] | None = None
+
+def set_revocation_check(check: Callable[[str, dict], bool] | None):
+    global _revocation_check
+    _revocation_check = check
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def revoke_cached_token(token: str):
+    """Drop a token from the verified cache so the next decode re-checks it."""
+    token_cache.discard(token_digest(token))
+
+def _decode_token(token: str) -> dict | None:
+    digest = token_digest(token)
+    payload = token_cache.get(digest) if settings.TOKEN_CACHE_ENABLED else None
+    if payload is None:
+        start = time.perf_counter()
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except jwt.PyJWTError:
+            return None
+        finally:
+            metrics.record_jwt_decode(time.perf_counter() - start)
+        if settings.TOKEN_CACHE_ENABLED:
+            token_cache.set(digest, payload)
+    if _revocation_check is not None and _revocation_check(digest, payload):
+        return None
+    return payload
+
 # JWT Token for authentication
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
@@ -24,11 +153,10 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict | None:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return {"user_id": int(payload.get("sub"))}
-    except jwt.PyJWTError:
+    payload = _decode_token(token)
+    if payload is None:
         return None
+    return {"user_id": int(payload.get("sub"))}
 
 # Activation Token
 def create_activation_token(user_id: int, expires_delta: timedelta = timedelta(hours=24)) -> str:
@@ -39,13 +167,10 @@ def create_activation_token(user_id: int, expires_delta: timedelta = timedelta(h
     return encoded_jwt
 
 def decode_activation_token(token: str) -> dict | None:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        if payload.get("type") != "activation":
-            return None
-        return {"user_id": int(payload.get("sub"))}
-    except jwt.PyJWTError:
+    payload = _decode_token(token)
+    if payload is None or payload.get("type") != "activation":
         return None
+    return {"user_id": int(payload.get("sub"))}
 
 # Reset Password Token
 def create_reset_password_token(user_id: int, expires_delta: timedelta = timedelta(hours=1)) -> str:
@@ -56,10 +181,7 @@ def create_reset_password_token(user_id: int, expires_delta: timedelta = timedel
     return encoded_jwt
 
 def decode_reset_password_token(token: str) -> dict | None:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        if payload.get("type") != "reset_password":
-            return None
-        return {"user_id": int(payload.get("sub"))}
-    except jwt.PyJWTError:
-        return None
\ No newline at end of file
+    payload = _decode_token(token)
+    if payload is None or payload.get("type") != "reset_password":
+        return None
+    return {"user_id": int(payload.get("sub"))}
\ No newline at end of file
@@ -0,0 +1,31 @@
+from typing import AsyncIterator, Mapping, Sequence
+import orjson
+from fastapi import Request
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# OPT_UTC_Z: datetime UTC ghi "Z" giống pydantic, client không thấy khác biệt giữa hai đường serialize
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def dump_rows(adapter: TypeAdapter, rows: Sequence) -> list:
+    """Validate a whole page (Row tuples or ORM objects) in one call and return orjson-ready values."""
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+async def ndjson_lines(adapter: TypeAdapter, partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        # Mỗi partition một chunk: bộ nhớ chỉ giữ batch đang gửi
+        yield b"".join(orjson.dumps(item, option=_ORJSON_OPTIONS) + b"\n" for item in dump_rows(adapter, rows))
+
+def ndjson_response(adapter: TypeAdapter, partitions: AsyncIterator[Sequence], headers: Mapping[str, str] | None = None) -> StreamingResponse:
+    return StreamingResponse(ndjson_lines(adapter, partitions), media_type=NDJSON_MEDIA_TYPE, headers=headers)
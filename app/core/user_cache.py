@@ -0,0 +1,156 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.models.user import User
+
+# Setup logger
+logger = setup_logger(__name__)
+
+_DATETIME_FIELDS = ("created_at", "updated_at")
+# Không đưa hash mật khẩu vào cache (nhất là Redis dùng chung); đường kiểm tra mật khẩu đọc thẳng từ DB
+_UNCACHED_FIELDS = ("password_hash",)
+
+class UserCacheBackend:
+    """Storage interface for cached user rows (plain dicts keyed by user_id)."""
+
+    async def get(self, user_id: int) -> dict | None:
+        raise NotImplementedError
+
+    async def set(self, user_id: int, data: dict) -> None:
+        raise NotImplementedError
+
+    async def delete(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+class InMemoryUserCacheBackend(UserCacheBackend):
+    """Per-process TTL + LRU cache."""
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._lock = Lock()
+
+    async def get(self, user_id: int) -> dict | None:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                del self._data[user_id]
+                return None
+            self._data.move_to_end(user_id)
+            return data
+
+    async def set(self, user_id: int, data: dict) -> None:
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl_seconds, data)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    async def delete(self, user_id: int) -> None:
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+class RedisUserCacheBackend(UserCacheBackend):
+    """Shared backend so invalidations are seen by every worker (requires `redis`)."""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "user_cache:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, user_id: int) -> dict | None:
+        raw = await self.client.get(f"{self.prefix}{user_id}")
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, user_id: int, data: dict) -> None:
+        await self.client.set(f"{self.prefix}{user_id}", json.dumps(data), ex=self.ttl_seconds)
+
+    async def delete(self, user_id: int) -> None:
+        await self.client.delete(f"{self.prefix}{user_id}")
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(key)
+
+class UserCache:
+    def __init__(self, backend: UserCacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, db: AsyncSession, user_id: int) -> User | None:
+        """Return the cached user attached to `db` without a SELECT, or None on miss."""
+        if not self.enabled:
+            return None
+        data = await self.backend.get(user_id)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        user = User(**_deserialize(data))
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    async def set(self, user: User) -> None:
+        if self.enabled:
+            await self.backend.set(user.user_id, _serialize(user))
+
+    async def invalidate(self, user_id: int) -> None:
+        if self.enabled:
+            self.invalidations += 1
+            await self.backend.delete(user_id)
+            logger.debug("Invalidated cached user_id=%s", user_id)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def _serialize(user: User) -> dict:
+    data = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs if attr.key not in _UNCACHED_FIELDS}
+    for field in _DATETIME_FIELDS:
+        if data.get(field) is not None:
+            data[field] = data[field].isoformat()
+    return data
+
+def _deserialize(data: dict) -> dict:
+    data = dict(data)
+    for field in _DATETIME_FIELDS:
+        if data.get(field) is not None:
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+def _build_backend() -> UserCacheBackend:
+    if settings.USER_CACHE_BACKEND == "redis":
+        return RedisUserCacheBackend(settings.USER_CACHE_REDIS_URL, settings.USER_CACHE_TTL_SECONDS)
+    return InMemoryUserCacheBackend(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_SIZE)
+
+user_cache = UserCache(_build_backend(), enabled=settings.USER_CACHE_ENABLED)
@@ -1,74 +1,165 @@
-from sqlalchemy.orm import Session
+from decimal import Decimal
+from itertools import chain
+from typing import Iterable
+from sqlalchemy import Text, bindparam, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.account import Account
+from app.crud.base import keyset_paginate
+from app.core.config import settings
 from app.core.logger import setup_logger
 
 # Setup logger
 logger = setup_logger(__name__)
 
-def check_account_name_exists(db: Session, user_id: int, account_name: str) -> bool:
-    logger.debug(f"Checking if account_name={account_name} exists for user_id={user_id}")
-    exists = db.query(Account).filter(
-        Account.user_id == user_id,
-        Account.account_name == account_name,
-        Account.is_active == True
-    ).first() is not None
-    logger.debug(f"Account_name={account_name} exists for user_id={user_id}: {exists}")
-    return exists
+def _duplicate_name_error(account_name: str) -> ValueError:
+    return ValueError(f"Account name '{account_name}' already exists for this user")
 
-def create_account(db: Session, user_id: int, account_data: dict):
-    logger.debug(f"Creating account with user_id={user_id}, data={account_data}")
-    
-    # Kiểm tra trùng account_name
-    if check_account_name_exists(db, user_id, account_data["account_name"]):
-        logger.error(f"Account name {account_data['account_name']} already exists for user_id={user_id}")
-        raise ValueError(f"Account name '{account_data['account_name']}' already exists for this user")
-
-    account_fields = {
-        "user_id": user_id,
-        "account_name": account_data["account_name"],
-        "account_type": account_data["account_type"],
-        "initial_balance": account_data["initial_balance"],
-        "current_balance": account_data["initial_balance"],
-        "currency": account_data["currency"],
-        "is_active": True
-    }
-    logger.debug(f"Prepared account fields: {account_fields}")
-    db_account = Account(**account_fields)
-    db.add(db_account)
-    db.commit()
-    db.refresh(db_account)
-    logger.debug(f"Account created: {db_account.__dict__}")
+async def create_account(db: AsyncSession, user_id: int, account_data: dict):
+    logger.debug("Creating account with user_id=%s, data=%s", user_id, account_data)
+    # Một round-trip INSERT ... ON CONFLICT DO NOTHING RETURNING trên unique index (user_id, account_name) WHERE is_active;
+    # không SELECT kiểm tra trước và không refresh sau khi commit
+    stmt = pg_insert(Account).values(
+        user_id=user_id,
+        account_name=account_data["account_name"],
+        account_type=account_data["account_type"],
+        initial_balance=account_data["initial_balance"],
+        current_balance=account_data["initial_balance"],
+        currency=account_data["currency"],
+        is_active=True,
+    ).on_conflict_do_nothing(
+        index_elements=[Account.user_id, Account.account_name],
+        index_where=Account.is_active,
+    ).returning(Account)
+    db_account = (await db.scalars(stmt)).first()
+    if db_account is None:
+        await db.rollback()
+        logger.error("Account name %s already exists for user_id=%s", account_data["account_name"], user_id)
+        raise _duplicate_name_error(account_data["account_name"])
+    await notify_account_changes(db, [db_account.account_id])
+    await db.commit()
+    logger.debug("Account created: account_id=%s", db_account.account_id)
     return db_account
 
-def get_accounts_by_user(db: Session, user_id: int, is_active: bool | None = None):
-    logger.debug(f"Querying accounts for user_id={user_id}, is_active={is_active}")
-    query = db.query(Account).filter(Account.user_id == user_id)
+async def get_accounts_by_user(db: AsyncSession, user_id: int, is_active: bool | None = None):
+    logger.debug("Querying accounts for user_id=%s, is_active=%s", user_id, is_active)
+    query = select(Account).filter(Account.user_id == user_id)
     if is_active is not None:
         query = query.filter(Account.is_active == is_active)
-    accounts = query.all()
-    logger.debug(f"Found {len(accounts)} accounts")
+    result = await db.execute(query)
+    accounts = result.scalars().all()
+    logger.debug("Found %d accounts", len(accounts))
     return accounts
 
-def get_account_by_id(db: Session, account_id: int, user_id: int):
-    logger.debug(f"Querying account_id={account_id} for user_id={user_id}")
-    account = db.query(Account).filter(Account.account_id == account_id, Account.user_id == user_id).first()
-    logger.debug(f"Account found: {account.__dict__ if account else None}")
+# Các cột AccountResponse cần - đường list nhanh chỉ select những cột này thay vì load ORM instance
+ACCOUNT_LIST_COLUMNS = (
+    Account.account_id, Account.user_id, Account.account_name, Account.account_type, Account.initial_balance,
+    Account.current_balance, Account.currency, Account.is_active, Account.created_at, Account.updated_at,
+)
+
+async def get_accounts_page(
+    db: AsyncSession,
+    user_id: int,
+    is_active: bool | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+    columns: tuple | None = None,
+):
+    logger.debug("Querying accounts page for user_id=%s, is_active=%s, limit=%s", user_id, is_active, limit)
+    query = (select(*columns) if columns else select(Account)).filter(Account.user_id == user_id)
+    if is_active is not None:
+        query = query.filter(Account.is_active == is_active)
+    accounts, next_cursor = await keyset_paginate(
+        db, query, sort_column=Account.created_at, id_column=Account.account_id, cursor=cursor, limit=limit,
+        rows=columns is not None,
+    )
+    logger.debug("Found %d accounts", len(accounts))
+    return accounts, next_cursor
+
+async def stream_account_rows(db: AsyncSession, user_id: int, is_active: bool | None = None, *, columns: tuple = ACCOUNT_LIST_COLUMNS, batch_size: int = 1000):
+    """Yield batches of Row tuples from a server-side cursor, in list order."""
+    query = select(*columns).filter(Account.user_id == user_id)
+    if is_active is not None:
+        query = query.filter(Account.is_active == is_active)
+    query = query.order_by(Account.created_at, Account.account_id).execution_options(yield_per=batch_size)
+    result = await db.stream(query)
+    async for partition in result.partitions():
+        yield partition
+
+async def get_accounts_version(db: AsyncSession, user_id: int, is_active: bool | None = None):
+    # Thêm/sửa/xóa mềm đều đổi count hoặc max(updated_at) - đủ để làm ETag mà không load các row
+    query = select(func.count(Account.account_id), func.max(Account.updated_at)).filter(Account.user_id == user_id)
+    if is_active is not None:
+        query = query.filter(Account.is_active == is_active)
+    return tuple((await db.execute(query)).one())
+
+async def get_account_version(db: AsyncSession, account_id: int, user_id: int):
+    result = await db.execute(
+        select(Account.updated_at).filter(Account.account_id == account_id, Account.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_account_by_id(db: AsyncSession, account_id: int, user_id: int):
+    logger.debug("Querying account_id=%s for user_id=%s", account_id, user_id)
+    result = await db.execute(select(Account).filter(Account.account_id == account_id, Account.user_id == user_id))
+    account = result.scalars().first()
+    logger.debug("Account found for account_id=%s: %s", account_id, account is not None)
     return account
 
-def update_account(db: Session, account: Account, update_data: dict):
-    logger.debug(f"Updating account_id={account.account_id} with data={update_data}")
+async def update_account(db: AsyncSession, account: Account, update_data: dict):
+    logger.debug("Updating account_id=%s with data=%s", account.account_id, update_data)
     for key, value in update_data.items():
         if value is not None:
             setattr(account, key, value)
-    db.commit()
-    db.refresh(account)
-    logger.debug(f"Account updated: {account.__dict__}")
+    account_name, user_id = account.account_name, account.user_id  # rollback sẽ expire object
+    try:
+        await db.flush()
+        await notify_account_changes(db, [account.account_id])
+        await db.commit()
+    except IntegrityError:
+        # Đổi tên/kích hoạt lại trùng với một account active khác (uq_accounts_user_active_name)
+        await db.rollback()
+        logger.error("Account name %s already exists for user_id=%s", account_name, user_id)
+        raise _duplicate_name_error(account_name)
+    await db.refresh(account)
+    logger.debug("Account updated: account_id=%s", account.account_id)
     return account
 
-def delete_account(db: Session, account: Account):
-    logger.debug(f"Deactivating account_id={account.account_id}")
+async def delete_account(db: AsyncSession, account: Account):
+    logger.debug("Deactivating account_id=%s", account.account_id)
     account.is_active = False
-    db.commit()
-    db.refresh(account)
-    logger.debug(f"Account deactivated: {account.__dict__}")
-    return account
\ No newline at end of file
+    await db.flush()
+    await notify_account_changes(db, [account.account_id])
+    await db.commit()
+    await db.refresh(account)
+    logger.debug("Account deactivated: account_id=%s", account.account_id)
+    return account
+
+async def apply_balance_deltas(db: AsyncSession, deltas: list[tuple[int, Decimal]]):
+    # Cập nhật nguyên tử trong DB, không đọc-sửa-ghi để tránh mất cập nhật khi ghi đồng thời.
+    # Một executemany cho mọi account, chạy theo thứ tự caller truyền vào (thứ tự khóa dòng).
+    # Không commit - caller commit cùng transaction với thao tác ghi giao dịch.
+    logger.debug("Applying balance deltas to %d accounts", len(deltas))
+    if not deltas:
+        return
+    accounts = Account.__table__
+    await db.execute(
+        update(accounts)
+        .where(accounts.c.account_id == bindparam("b_account_id"))
+        .values(current_balance=accounts.c.current_balance + bindparam("b_delta")),
+        [{"b_account_id": account_id, "b_delta": delta} for account_id, delta in deltas],
+    )
+
+ACCOUNT_CHANGES_CHANNEL = "account_changes"
+
+async def notify_account_changes(db: AsyncSession, account_ids: Iterable[int]):
+    # pg_notify trong transaction hiện tại: Postgres chỉ gửi khi commit, rollback thì không có thông báo nào.
+    # Payload (các cột của AccountResponse) dựng bằng json_build_object từ dòng đã cập nhật, một câu cho mọi account
+    account_ids = list(account_ids)
+    if not settings.ACCOUNT_STREAM_ENABLED or not account_ids:
+        return
+    payload = func.json_build_object(*chain.from_iterable((literal(column.key), column) for column in ACCOUNT_LIST_COLUMNS))
+    await db.execute(
+        select(func.pg_notify(ACCOUNT_CHANGES_CHANNEL, cast(payload, Text))).where(Account.account_id.in_(account_ids))
+    )
@@ -1,40 +1,135 @@
-from typing import TypeVar, Generic, Type, Optional, List
-from sqlalchemy.orm import Session
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, TypeVar, Generic, Type, Optional, List, Sequence
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+class InvalidCursor(ValueError):
+    pass
+
+# Cursor phân trang: base64url(JSON) của (sort_key, id) - client coi là chuỗi opaque
+def encode_cursor(sort_name: str, sort_value: Any, id_value: int) -> str:
+    if isinstance(sort_value, datetime):
+        value_type, sort_value = "dt", sort_value.isoformat()
+    elif isinstance(sort_value, date):
+        value_type, sort_value = "d", sort_value.isoformat()
+    elif isinstance(sort_value, Decimal):
+        value_type, sort_value = "dec", str(sort_value)
+    else:
+        value_type = "raw"
+    payload = json.dumps({"s": sort_name, "t": value_type, "k": sort_value, "i": id_value}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_name: str) -> tuple[Any, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if data["s"] != sort_name:
+            raise InvalidCursor("Cursor was issued for a different sort order")
+        value = data["k"]
+        if data["t"] == "dt":
+            value = datetime.fromisoformat(value)
+        elif data["t"] == "d":
+            value = date.fromisoformat(value)
+        elif data["t"] == "dec":
+            value = Decimal(value)
+        return value, int(data["i"])
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+async def keyset_paginate(
+    db: AsyncSession,
+    query: Select,
+    *,
+    sort_column,
+    id_column,
+    cursor: str | None = None,
+    limit: int = 100,
+    descending: bool = False,
+    rows: bool = False,
+) -> tuple[Sequence, str | None]:
+    """Return one page of `query` ordered by (sort_column, id_column) and the cursor of the next page.
+
+    With rows=True the query selects plain columns and the page holds Row tuples instead of ORM entities.
+
+    The (sort_key, id) tuple comparison keeps ordering stable for duplicate sort keys and lets
+    Postgres seek on a composite index instead of scanning OFFSET rows.
+    """
+    sort_name = sort_column.key
+    if cursor:
+        sort_value, id_value = decode_cursor(cursor, sort_name)
+        key = tuple_(sort_column, id_column)
+        query = query.filter(key < tuple_(sort_value, id_value) if descending else key > tuple_(sort_value, id_value))
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    result = await db.execute(query.limit(limit + 1))
+    items = result.all() if rows else result.scalars().all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(sort_name, getattr(last, sort_name), getattr(last, id_column.key))
+    return items, next_cursor
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
-    def get(self, db: Session, id: int) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.user_id == id).first()
+    async def get(self, db: AsyncSession, id: int) -> Optional[ModelType]:
+        result = await db.execute(select(self.model).filter(self.model.user_id == id))
+        return result.scalars().first()
+
+    async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return result.scalars().all()
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        filters: Sequence = (),
+        sort_column=None,
+        cursor: str | None = None,
+        limit: int = 100,
+        descending: bool = False,
+    ) -> tuple[List[ModelType], str | None]:
+        # Keyset pagination; mặc định sắp theo khóa chính
+        id_column = self.model.__mapper__.primary_key[0]
+        return await keyset_paginate(
+            db, select(self.model).filter(*filters),
+            sort_column=sort_column if sort_column is not None else id_column,
+            id_column=id_column, cursor=cursor, limit=limit, descending=descending,
+        )
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = obj_in.dict(exclude_unset=True)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def update(self, db: Session, *, db_obj: ModelType, obj_in: UpdateSchemaType) -> ModelType:
+    async def update(self, db: AsyncSession, *, db_obj: ModelType, obj_in: UpdateSchemaType) -> ModelType:
         obj_data = obj_in.dict(exclude_unset=True)
         for key, value in obj_data.items():
             setattr(db_obj, key, value)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
-        db.commit()
-        return obj
\ No newline at end of file
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
+        return obj
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Mapping, Sequence
+from sqlalchemy import BigInteger, Date, and_, column, func, or_, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.budget import Budget
+from app.models.category import Category, CategoryType
+from app.models.report import TransactionDailyRollup
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+Rollup = TransactionDailyRollup
+
+async def sum_budget_spending(
+    db: AsyncSession, user_id: int, budgets: Sequence[Budget], descendants: Mapping[int, frozenset[int]]
+) -> dict[int, Decimal]:
+    """Expense per budget over its own period, including subcategories, in one grouped query."""
+    # Mở rộng mỗi budget thành các cặp (budget, danh mục con cháu) - VALUES CTE join với rollup
+    pairs = [
+        (budget.budget_id, category_id, budget.start_date, budget.end_date)
+        for budget in budgets
+        for category_id in descendants.get(budget.category_id, (budget.category_id,))
+    ]
+    if not pairs:
+        return {}
+    expansion = values(
+        column("budget_id", BigInteger), column("category_id", BigInteger),
+        column("start_date", Date), column("end_date", Date),
+        name="budget_categories",
+    ).data(pairs).cte()
+    query = (
+        select(expansion.c.budget_id, func.sum(Rollup.total_amount))
+        .select_from(expansion)
+        .join(Rollup, and_(
+            Rollup.user_id == user_id,
+            Rollup.category_id == expansion.c.category_id,
+            Rollup.transaction_type == CategoryType.expense,
+            Rollup.rollup_date >= expansion.c.start_date,
+            Rollup.rollup_date <= expansion.c.end_date,
+        ))
+        .group_by(expansion.c.budget_id)
+    )
+    return {budget_id: amount or Decimal("0") for budget_id, amount in (await db.execute(query)).all()}
+
+async def budget_coverage(db: AsyncSession, roots: set[tuple[int, int]]) -> dict[tuple[int, int], frozenset[int]]:
+    """Categories covered by a budget on each (user_id, category_id): the category and its subcategories.
+
+    Đọc cây từ DB trong transaction hiện tại (recursive CTE), không dùng cây cache theo process - cây cache có thể
+    cũ nếu danh mục vừa đổi cha ở worker khác, và spent_amount là giá trị cộng dồn vĩnh viễn.
+    """
+    if not roots:
+        return {}
+    seeds = values(column("user_id", BigInteger), column("category_id", BigInteger), name="budget_roots").data(list(roots))
+    covered = select(
+        seeds.c.user_id, seeds.c.category_id.label("root_id"), seeds.c.category_id
+    ).cte("covered", recursive=True)
+    # UNION (không phải UNION ALL) loại dòng trùng nên dừng được cả khi cây có vòng
+    covered = covered.union(
+        select(covered.c.user_id, covered.c.root_id, Category.category_id)
+        .join(Category, Category.parent_category_id == covered.c.category_id)
+        .where(or_(Category.user_id.is_(None), Category.user_id == covered.c.user_id))
+    )
+    coverage = defaultdict(set)
+    result = await db.execute(select(covered.c.user_id, covered.c.root_id, covered.c.category_id))
+    for user_id, root_id, category_id in result.all():
+        coverage[(user_id, root_id)].add(category_id)
+    return {key: frozenset(category_ids) for key, category_ids in coverage.items()}
+
+async def apply_budget_deltas(db: AsyncSession, rollup_deltas: dict[tuple, list]) -> list[dict]:
+    """Add expense deltas to spent_amount of every budget covering them; returns the touched budgets.
+
+    Không commit - chạy trong cùng transaction với thao tác ghi giao dịch (như apply_rollup_deltas).
+    """
+    expenses = defaultdict(list)
+    for (user_id, day, _, category_id, transaction_type), (amount, _) in rollup_deltas.items():
+        if transaction_type == CategoryType.expense.value and amount:
+            expenses[user_id].append((day, category_id, amount))
+    changes = []
+    if not expenses:
+        return changes
+    # Một query cho mọi user trong batch (import/recurring chạm nhiều user), không query theo từng user
+    days = [day for items in expenses.values() for day, _, _ in items]
+    result = await db.execute(
+        select(Budget.user_id, Budget.budget_id, Budget.category_id, Budget.start_date, Budget.end_date)
+        .filter(Budget.user_id.in_(expenses), Budget.start_date <= max(days), Budget.end_date >= min(days))
+        .order_by(Budget.user_id, Budget.budget_id)  # Khóa dòng budget theo cùng thứ tự giữa các request
+    )
+    budgets_by_user = defaultdict(list)
+    for user_id, *budget in result.all():
+        budgets_by_user[user_id].append(budget)
+    coverage = await budget_coverage(db, {
+        (user_id, budget_category_id) for user_id, budgets in budgets_by_user.items() for _, budget_category_id, _, _ in budgets
+    })
+    for user_id, budgets in budgets_by_user.items():
+        items = expenses[user_id]
+        for budget_id, budget_category_id, start_date, end_date in budgets:
+            covered = coverage.get((user_id, budget_category_id), frozenset((budget_category_id,)))
+            delta = sum(
+                (amount for day, category_id, amount in items if start_date <= day <= end_date and category_id in covered),
+                Decimal("0"),
+            )
+            if not delta:
+                continue
+            amount, spent = (await db.execute(
+                update(Budget)
+                .where(Budget.budget_id == budget_id)
+                .values(spent_amount=Budget.spent_amount + delta)
+                .returning(Budget.amount, Budget.spent_amount)
+                .execution_options(synchronize_session=False)
+            )).one()
+            changes.append({
+                "budget_id": budget_id, "category_id": budget_category_id, "budget_amount": amount,
+                "spent_before": spent - delta, "spent_amount": spent,
+            })
+    if changes:
+        logger.debug("Applied spend deltas to %s budgets", len(changes))
+    return changes
+
+async def rebuild_budget_spent(db: AsyncSession, user_id: int, as_of: date | None = None):
+    # Tính lại spent_amount từ rollup (budget tạo ngoài app, đổi cây danh mục, sau rebuild_rollups)
+    logger.info("Rebuilding budget spent amounts for user_id=%s", user_id)
+    query = select(Budget).filter(Budget.user_id == user_id)
+    if as_of is not None:
+        query = query.filter(Budget.end_date >= as_of)
+    budgets = (await db.execute(query)).scalars().all()
+    coverage = await budget_coverage(db, {(user_id, budget.category_id) for budget in budgets})
+    spent = await sum_budget_spending(db, user_id, budgets, {category_id: covered for (_, category_id), covered in coverage.items()})
+    for budget in budgets:
+        budget.spent_amount = spent.get(budget.budget_id, Decimal("0"))
+    await db.commit()
+    return len(budgets)
@@ -0,0 +1,65 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.category import Category, CategoryType
+from app.core.category_cache import category_cache
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+async def get_user_category(db: AsyncSession, category_id: int, user_id: int):
+    # Chỉ danh mục riêng của user mới được sửa/xóa
+    result = await db.execute(select(Category).filter(Category.category_id == category_id, Category.user_id == user_id))
+    return result.scalars().first()
+
+def _duplicate_name_error(category_name: str) -> ValueError:
+    return ValueError(f"Category name '{category_name}' already exists for this user")
+
+async def create_category(db: AsyncSession, user_id: int, category_data: dict):
+    logger.debug("Creating category for user_id=%s, data=%s", user_id, category_data)
+    stmt = pg_insert(Category).values(
+        user_id=user_id,
+        category_name=category_data["category_name"],
+        category_type=CategoryType(category_data["category_type"]),
+        parent_category_id=category_data.get("parent_category_id"),
+        icon=category_data.get("icon"),
+        is_custom=True,
+    ).on_conflict_do_nothing(
+        index_elements=[Category.user_id, Category.category_name],
+        index_where=Category.user_id.is_not(None),
+    ).returning(Category)
+    category = (await db.scalars(stmt)).first()
+    if category is None:
+        await db.rollback()
+        raise _duplicate_name_error(category_data["category_name"])
+    await db.commit()
+    category_cache.invalidate(user_id)
+    return category
+
+async def update_category(db: AsyncSession, category: Category, update_data: dict):
+    logger.debug("Updating category_id=%s with data=%s", category.category_id, update_data)
+    for key, value in update_data.items():
+        setattr(category, key, value)
+    category_name, user_id = category.category_name, category.user_id  # rollback sẽ expire object
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise _duplicate_name_error(category_name)
+    category_cache.invalidate(user_id)
+    await db.refresh(category)
+    return category
+
+async def delete_category(db: AsyncSession, category: Category):
+    logger.debug("Deleting category_id=%s", category.category_id)
+    user_id = category.user_id
+    await db.delete(category)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Transactions/Budgets/RecurringTransactions tham chiếu category với ON DELETE RESTRICT
+        await db.rollback()
+        raise ValueError("Category is in use and cannot be deleted")
+    category_cache.invalidate(user_id)  # danh mục con chuyển thành top-level (ON DELETE SET NULL)
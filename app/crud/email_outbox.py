@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.email_outbox import EmailOutbox
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+async def enqueue_email(db: AsyncSession, user_id: int, purpose: str, recipient: str, subject: str, body: str):
+    # Nếu user đã có email cùng mục đích đang chờ thì chỉ thay nội dung (link/token mới nhất), không gửi hai lần
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(EmailOutbox).values(
+        user_id=user_id, purpose=purpose, recipient=recipient, subject=subject, body=body,
+        status="pending", attempts=0, next_attempt_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "purpose"],
+        index_where=text("status IN ('pending', 'sending')"),
+        set_={
+            "recipient": stmt.excluded.recipient, "subject": stmt.excluded.subject, "body": stmt.excluded.body,
+            "status": "pending", "attempts": 0, "next_attempt_at": now, "last_error": None,
+            "claim_version": EmailOutbox.claim_version + 1,
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+    logger.debug("Email queued: user_id=%s, purpose=%s", user_id, purpose)
+
+async def claim_due_emails(db: AsyncSession, batch_size: int) -> list[EmailOutbox]:
+    # SKIP LOCKED để các worker không nhận trùng; dòng "sending" quá hạn (worker chết giữa chừng) được nhận lại
+    now = datetime.now(timezone.utc)
+    query = (
+        select(EmailOutbox)
+        .where(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.email_id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(query)
+    emails = list(result.scalars().all())
+    for email in emails:
+        email.status = "sending"
+        email.attempts += 1
+        email.claim_version += 1
+        email.next_attempt_at = now + timedelta(seconds=settings.EMAIL_SEND_TIMEOUT_SECONDS)
+    await db.commit()
+    return emails
+
+def _still_claimed(email: EmailOutbox):
+    # Dòng chưa bị enqueue lại hay bị worker khác nhận lại trong lúc gửi (khi đó nội dung mới sẽ được gửi ở lượt đó).
+    # So claim_version chứ không so attempts: enqueue lại reset attempts về 0 nên lần claim sau lại ra attempts cũ (ABA)
+    return and_(
+        EmailOutbox.email_id == email.email_id, EmailOutbox.status == "sending",
+        EmailOutbox.claim_version == email.claim_version,
+    )
+
+async def mark_email_sent(db: AsyncSession, email: EmailOutbox):
+    await db.execute(
+        update(EmailOutbox)
+        .where(_still_claimed(email))
+        .values(status="sent", sent_at=datetime.now(timezone.utc), last_error=None)
+    )
+    await db.commit()
+
+async def mark_email_failed(db: AsyncSession, email: EmailOutbox, error: str, retry_at: datetime | None):
+    values = {"status": "pending", "next_attempt_at": retry_at} if retry_at else {"status": "failed"}
+    await db.execute(
+        update(EmailOutbox)
+        .where(_still_claimed(email))
+        .values(last_error=error[:1000], **values)
+    )
+    await db.commit()
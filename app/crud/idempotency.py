@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.idempotency_key import IdempotencyKey
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+async def claim_idempotency_key(db: AsyncSession, user_id: int, key: str, request_hash: str) -> bool:
+    """Insert the key as "processing"; True if this request now owns it and must run the endpoint."""
+    # Key đã hết hạn, hoặc "processing" quá hạn (process chết giữa chừng) với cùng request, được nhận lại
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(IdempotencyKey).values(
+        user_id=user_id, idempotency_key=key, request_hash=request_hash, status="processing",
+        locked_at=now, created_at=now, expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "idempotency_key"],
+        set_={
+            "request_hash": stmt.excluded.request_hash, "status": "processing", "response_status": None,
+            "response_headers": None, "response_body": None, "locked_at": now, "created_at": now,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            IdempotencyKey.expires_at <= now,
+            and_(
+                IdempotencyKey.status == "processing",
+                IdempotencyKey.request_hash == stmt.excluded.request_hash,
+                IdempotencyKey.locked_at <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS),
+            ),
+        ),
+    ).returning(IdempotencyKey.user_id)
+    claimed = (await db.execute(stmt)).first() is not None
+    await db.commit()
+    return claimed
+
+async def get_idempotency_key(db: AsyncSession, user_id: int, key: str) -> IdempotencyKey | None:
+    result = await db.execute(
+        select(IdempotencyKey).filter(IdempotencyKey.user_id == user_id, IdempotencyKey.idempotency_key == key)
+    )
+    return result.scalars().first()
+
+async def complete_idempotency_key(
+    db: AsyncSession, user_id: int, key: str, request_hash: str, status_code: int, headers: list, body: bytes
+):
+    await db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.idempotency_key == key,
+            IdempotencyKey.request_hash == request_hash, IdempotencyKey.status == "processing",
+        )
+        .values(status="completed", response_status=status_code, response_headers=headers, response_body=body)
+    )
+    await db.commit()
+
+async def release_idempotency_key(db: AsyncSession, user_id: int, key: str, request_hash: str):
+    # Request lỗi (5xx/exception): xóa để lần retry sau chạy lại endpoint
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.idempotency_key == key,
+            IdempotencyKey.request_hash == request_hash, IdempotencyKey.status == "processing",
+        )
+    )
+    await db.commit()
+
+async def purge_expired_idempotency_keys(db: AsyncSession) -> int:
+    result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc)))
+    await db.commit()
+    if result.rowcount:
+        logger.info("Purged %s expired idempotency keys", result.rowcount)
+    return result.rowcount
@@ -0,0 +1,65 @@
+import calendar
+from datetime import date, timedelta
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.account import Account
+from app.models.recurring_transaction import RecurringTransaction, RecurrenceFrequency
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+def next_occurrence(current: date, frequency: RecurrenceFrequency, anchor: date) -> date:
+    # Tháng/năm luôn tính theo ngày của start_date để 31/01 -> 29/02 -> 31/03 không bị trôi ngày
+    if frequency == RecurrenceFrequency.daily:
+        return current + timedelta(days=1)
+    if frequency == RecurrenceFrequency.weekly:
+        return current + timedelta(weeks=1)
+    months = 1 if frequency == RecurrenceFrequency.monthly else 12
+    year, month = divmod(current.month - 1 + months, 12)
+    year += current.year
+    month += 1
+    return date(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+
+def due_occurrences(schedule: RecurringTransaction, today: date, limit: int) -> tuple[list[date], date]:
+    """Return (occurrence dates due up to today, new next_due_date)."""
+    occurrences = []
+    current = schedule.next_due_date
+    while current <= today and len(occurrences) < limit:
+        if schedule.end_date is not None and current > schedule.end_date:
+            break
+        occurrences.append(current)
+        current = next_occurrence(current, schedule.frequency, schedule.start_date)
+    return occurrences, current
+
+async def claim_due_schedules(
+    db: AsyncSession, today: date, batch_size: int, schedule_ids: list[int] | None = None
+) -> list[RecurringTransaction]:
+    # FOR UPDATE SKIP LOCKED: nhiều worker chạy song song sẽ nhận các batch khác nhau, không chờ nhau
+    query = (
+        select(RecurringTransaction)
+        .join(Account, Account.account_id == RecurringTransaction.account_id)
+        .where(
+            RecurringTransaction.is_active == True,
+            RecurringTransaction.next_due_date <= today,
+            Account.is_active == True,
+        )
+        .order_by(RecurringTransaction.next_due_date, RecurringTransaction.recurring_transaction_id)
+        .limit(batch_size)
+        .with_for_update(of=RecurringTransaction, skip_locked=True)
+    )
+    if schedule_ids is not None:
+        query = query.where(RecurringTransaction.recurring_transaction_id.in_(schedule_ids))
+    result = await db.execute(query)
+    schedules = list(result.scalars().all())
+    logger.debug("Claimed %s due recurring transactions", len(schedules))
+    return schedules
+
+async def deactivate_schedule(db: AsyncSession, schedule_id: int):
+    # Giữ nguyên next_due_date: sửa dữ liệu rồi bật lại thì lượt sau tự bù các lần đã lỡ
+    await db.execute(
+        update(RecurringTransaction)
+        .where(RecurringTransaction.recurring_transaction_id == schedule_id)
+        .values(is_active=False)
+    )
+    await db.commit()
@@ -0,0 +1,204 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+from sqlalchemy import case, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.budget import sum_budget_spending
+from app.models.budget import Budget
+from app.models.category import Category, CategoryType
+from app.models.report import TransactionDailyRollup
+from app.models.transaction import Transaction
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+Rollup = TransactionDailyRollup
+
+def report_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.REPORT_TIMEZONE)
+
+def rollup_day(transaction_date: datetime) -> date:
+    if transaction_date.tzinfo is None:
+        transaction_date = transaction_date.replace(tzinfo=timezone.utc)
+    return transaction_date.astimezone(report_timezone()).date()
+
+def rollup_key(user_id: int, account_id: int, category_id: int, transaction_type: CategoryType, transaction_date: datetime) -> tuple:
+    return (user_id, rollup_day(transaction_date), account_id, category_id, transaction_type.value)
+
+def new_rollup_deltas() -> defaultdict:
+    # key -> [tổng tiền, số giao dịch]
+    return defaultdict(lambda: [Decimal("0"), 0])
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: dict[tuple, list]):
+    # Upsert cộng dồn; không commit - chạy trong cùng transaction với thao tác ghi giao dịch.
+    # Sắp xếp theo key để các request đồng thời khóa các dòng rollup theo cùng thứ tự.
+    rows = [
+        {
+            "user_id": key[0], "rollup_date": key[1], "account_id": key[2], "category_id": key[3],
+            "transaction_type": CategoryType(key[4]), "total_amount": amount, "transaction_count": count,
+        }
+        for key, (amount, count) in sorted(deltas.items())
+        if amount != 0 or count != 0
+    ]
+    if not rows:
+        return
+    logger.debug("Applying %s rollup deltas", len(rows))
+    stmt = pg_insert(Rollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Rollup.user_id, Rollup.rollup_date, Rollup.account_id, Rollup.category_id, Rollup.transaction_type],
+        set_={
+            "total_amount": Rollup.total_amount + stmt.excluded.total_amount,
+            "transaction_count": Rollup.transaction_count + stmt.excluded.transaction_count,
+        },
+    )
+    await db.execute(stmt, rows)
+
+async def rebuild_rollups(db: AsyncSession, user_id: int | None = None):
+    # Tính lại toàn bộ từ bảng Transactions (backfill lần đầu hoặc sau khi đổi REPORT_TIMEZONE)
+    logger.info("Rebuilding rollups for user_id=%s", user_id if user_id is not None else "ALL")
+    user_filter = "WHERE user_id = :user_id" if user_id is not None else ""
+    params = {"tz": settings.REPORT_TIMEZONE}
+    if user_id is not None:
+        params["user_id"] = user_id
+    await db.execute(text(f"DELETE FROM transaction_daily_rollups {user_filter}"), params)
+    await db.execute(text(f"""
+        INSERT INTO transaction_daily_rollups
+            (user_id, rollup_date, account_id, category_id, transaction_type, total_amount, transaction_count)
+        SELECT user_id, (transaction_date AT TIME ZONE :tz)::date, account_id, category_id, transaction_type,
+               SUM(amount), COUNT(*)
+        FROM transactions
+        {user_filter}
+        GROUP BY 1, 2, 3, 4, 5
+    """), params)
+    await db.commit()
+
+def split_period(start: datetime, end: datetime) -> tuple[date | None, date | None, list[tuple[datetime, datetime]]]:
+    """Split [start, end) into whole report-timezone days [first_day, last_day) and leftover partial ranges."""
+    tz = report_timezone()
+    start_local = start.astimezone(tz)
+    end_local = end.astimezone(tz)
+    first_day = start_local.date()
+    if start_local.time() != datetime.min.time():
+        first_day = date.fromordinal(first_day.toordinal() + 1)
+    last_day = end_local.date()
+    if first_day >= last_day:
+        return None, None, [(start, end)]
+    partial = []
+    first_midnight = datetime.combine(first_day, datetime.min.time(), tz)
+    last_midnight = datetime.combine(last_day, datetime.min.time(), tz)
+    if start < first_midnight:
+        partial.append((start, first_midnight))
+    if last_midnight < end:
+        partial.append((last_midnight, end))
+    return first_day, last_day, partial
+
+async def _sum_grouped(db: AsyncSession, user_id: int, start: datetime, end: datetime, group_column_name: str,
+                       account_id: int | None = None, transaction_type: CategoryType | None = None) -> dict:
+    """Totals grouped by one column: rollups for whole days plus raw transactions for partial days."""
+    totals = defaultdict(Decimal)
+    first_day, last_day, partial = split_period(start, end)
+    if first_day is not None:
+        group_column = getattr(Rollup, group_column_name)
+        query = select(group_column, func.sum(Rollup.total_amount)).filter(
+            Rollup.user_id == user_id, Rollup.rollup_date >= first_day, Rollup.rollup_date < last_day
+        )
+        if account_id is not None:
+            query = query.filter(Rollup.account_id == account_id)
+        if transaction_type is not None:
+            query = query.filter(Rollup.transaction_type == transaction_type)
+        for key, amount in (await db.execute(query.group_by(group_column))).all():
+            totals[key] += amount or 0
+    for range_start, range_end in partial:
+        group_column = getattr(Transaction, group_column_name)
+        query = select(group_column, func.sum(Transaction.amount)).filter(
+            Transaction.user_id == user_id,
+            Transaction.transaction_date >= range_start,
+            Transaction.transaction_date < range_end,
+        )
+        if account_id is not None:
+            query = query.filter(Transaction.account_id == account_id)
+        if transaction_type is not None:
+            query = query.filter(Transaction.transaction_type == transaction_type)
+        for key, amount in (await db.execute(query.group_by(group_column))).all():
+            totals[key] += amount or 0
+    return totals
+
+async def get_summary(db: AsyncSession, user_id: int, start: datetime, end: datetime, account_id: int | None = None) -> dict:
+    logger.debug("Computing summary for user_id=%s, start=%s, end=%s, account_id=%s", user_id, start, end, account_id)
+    totals = await _sum_grouped(db, user_id, start, end, "transaction_type", account_id=account_id)
+    total_income = totals.get(CategoryType.income, Decimal("0"))
+    total_expense = totals.get(CategoryType.expense, Decimal("0"))
+    return {"total_income": total_income, "total_expense": total_expense, "net_flow": total_income - total_expense}
+
+async def get_daily_account_flows(db: AsyncSession, user_id: int, since: date) -> list[tuple[int, date, Decimal]]:
+    """(account_id, rollup_date, income - expense) for every day >= since, from the rollups."""
+    logger.debug("Loading daily account flows for user_id=%s, since=%s", user_id, since)
+    signed = case((Rollup.transaction_type == CategoryType.income, Rollup.total_amount), else_=-Rollup.total_amount)
+    query = (
+        select(Rollup.account_id, Rollup.rollup_date, func.sum(signed))
+        .filter(Rollup.user_id == user_id, Rollup.rollup_date >= since)
+        .group_by(Rollup.account_id, Rollup.rollup_date)
+    )
+    return (await db.execute(query)).all()
+
+async def get_spending_by_category(
+    db: AsyncSession, user_id: int, start: datetime, end: datetime, account_id: int | None = None,
+    group_into: dict[int, int] | None = None, names: dict[int, str] | None = None,
+) -> list[dict]:
+    """group_into maps category_id -> reporting category (e.g. its top-level ancestor) to roll subcategories up."""
+    logger.debug("Computing spending by category for user_id=%s, start=%s, end=%s", user_id, start, end)
+    raw = await _sum_grouped(db, user_id, start, end, "category_id", account_id=account_id, transaction_type=CategoryType.expense)
+    totals = defaultdict(Decimal)
+    for category_id, amount in raw.items():
+        if amount:
+            totals[group_into.get(category_id, category_id) if group_into else category_id] += amount
+    if not totals:
+        return []
+    if names is None:
+        names = dict((await db.execute(
+            select(Category.category_id, Category.category_name).filter(Category.category_id.in_(totals))
+        )).all())
+    grand_total = sum(totals.values())
+    return [
+        {
+            "category_id": category_id,
+            "category_name": names.get(category_id),
+            "total_amount": amount,
+            "percentage": round(amount * 100 / grand_total, 2),
+        }
+        for category_id, amount in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+async def get_budget_status(
+    db: AsyncSession, user_id: int, start: date, end: date, descendants: dict[int, frozenset[int]] | None = None,
+) -> list[dict]:
+    """Budgets overlapping [start, end]; spending covers each budget's whole period and, via descendants, its subcategories."""
+    logger.debug("Computing budget status for user_id=%s, start=%s, end=%s", user_id, start, end)
+    query = (
+        select(Budget, Category.category_name)
+        .join(Category, Category.category_id == Budget.category_id)
+        .filter(Budget.user_id == user_id, Budget.start_date <= end, Budget.end_date >= start)
+        .order_by(Budget.start_date, Budget.budget_id)
+    )
+    rows = (await db.execute(query)).all()
+    spent = await sum_budget_spending(db, user_id, [budget for budget, _ in rows], descendants or {})
+    result = []
+    for budget, category_name in rows:
+        actual = spent.get(budget.budget_id, Decimal("0"))
+        result.append({
+            "budget_id": budget.budget_id,
+            "category_id": budget.category_id,
+            "category_name": category_name,
+            "start_date": budget.start_date,
+            "end_date": budget.end_date,
+            "budget_amount": budget.amount,
+            "actual_spending": actual,
+            "remaining_amount": budget.amount - actual,
+            "percentage_used": round(actual * 100 / budget.amount, 2),
+            "is_exceeded": actual > budget.amount,
+        })
+    return result
@@ -0,0 +1,240 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+import re
+from sqlalchemy import exists, func, insert, literal, literal_column, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.category import CategoryType
+from app.models.tag import TransactionTag
+from app.models.transaction import Transaction
+from app.crud.account import apply_balance_deltas, notify_account_changes
+from app.crud.base import keyset_paginate, encode_cursor, decode_cursor
+from app.crud.budget import apply_budget_deltas
+from app.crud.report import rollup_key, new_rollup_deltas, apply_rollup_deltas
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+def balance_delta(transaction_type: CategoryType, amount: Decimal) -> Decimal:
+    # amount luôn dương; chi tiêu làm giảm số dư, thu nhập làm tăng
+    return amount if transaction_type == CategoryType.income else -amount
+
+async def _apply_deltas(db: AsyncSession, deltas: dict[int, Decimal]):
+    # Khóa các account theo thứ tự account_id để tránh deadlock khi một thao tác chạm nhiều account
+    changed = [account_id for account_id in sorted(deltas) if deltas[account_id] != 0]
+    await apply_balance_deltas(db, [(account_id, deltas[account_id]) for account_id in changed])
+    # Đẩy số dư mới tới GET /accounts/stream khi transaction commit
+    await notify_account_changes(db, changed)
+
+def _add_rollup(rollup_deltas: dict, transaction: Transaction, sign: int):
+    entry = rollup_deltas[rollup_key(
+        transaction.user_id, transaction.account_id, transaction.category_id,
+        transaction.transaction_type, transaction.transaction_date,
+    )]
+    entry[0] += sign * transaction.amount
+    entry[1] += sign
+
+async def create_transaction(db: AsyncSession, user_id: int, transaction_data: dict, transaction_type: CategoryType):
+    logger.debug("Creating transaction for user_id=%s, data=%s", user_id, transaction_data)
+    transaction_fields = {
+        "user_id": user_id,
+        "account_id": transaction_data["account_id"],
+        "category_id": transaction_data["category_id"],
+        "amount": transaction_data["amount"],
+        "transaction_type": transaction_type,
+        "description": transaction_data.get("description"),
+        "location": transaction_data.get("location"),
+    }
+    # Gán ngày ở phía app để biết ngày rollup trước khi insert
+    transaction_fields["transaction_date"] = transaction_data.get("transaction_date") or datetime.now(timezone.utc)
+    db_transaction = Transaction(**transaction_fields)
+    db.add(db_transaction)
+    await _apply_deltas(db, {db_transaction.account_id: balance_delta(transaction_type, db_transaction.amount)})
+    rollup_deltas = new_rollup_deltas()
+    _add_rollup(rollup_deltas, db_transaction, 1)
+    await apply_rollup_deltas(db, rollup_deltas)
+    budget_changes = await apply_budget_deltas(db, rollup_deltas)
+    await db.commit()
+    await db.refresh(db_transaction)
+    logger.debug("Transaction created: transaction_id=%s", db_transaction.transaction_id)
+    return db_transaction, budget_changes
+
+async def get_transaction_by_id(db: AsyncSession, transaction_id: int, user_id: int, for_update: bool = False):
+    logger.debug("Querying transaction_id=%s for user_id=%s, for_update=%s", transaction_id, user_id, for_update)
+    query = select(Transaction).filter(Transaction.transaction_id == transaction_id, Transaction.user_id == user_id)
+    if for_update:
+        # Khóa dòng để hai request sửa/xóa cùng giao dịch không hoàn tác cùng một số tiền cũ
+        query = query.with_for_update()
+    result = await db.execute(query)
+    return result.scalars().first()
+
+SORTABLE_COLUMNS = {
+    "transaction_date": Transaction.transaction_date,
+    "amount": Transaction.amount,
+    "created_at": Transaction.created_at,
+}
+
+def _apply_filters(
+    query,
+    user_id: int,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    account_id: int | None = None,
+    category_id: int | None = None,
+    transaction_type: CategoryType | None = None,
+    tag_id: int | None = None,
+):
+    query = query.filter(Transaction.user_id == user_id)
+    if start_date is not None:
+        query = query.filter(Transaction.transaction_date >= start_date)
+    if end_date is not None:
+        query = query.filter(Transaction.transaction_date <= end_date)
+    if account_id is not None:
+        query = query.filter(Transaction.account_id == account_id)
+    if category_id is not None:
+        query = query.filter(Transaction.category_id == category_id)
+    if transaction_type is not None:
+        query = query.filter(Transaction.transaction_type == transaction_type)
+    if tag_id is not None:
+        query = query.filter(exists().where(
+            TransactionTag.transaction_id == Transaction.transaction_id, TransactionTag.tag_id == tag_id
+        ))
+    return query
+
+# Các cột TransactionResponse cần - đường list nhanh select Row thay vì ORM instance
+TRANSACTION_LIST_COLUMNS = (
+    Transaction.transaction_id, Transaction.user_id, Transaction.account_id, Transaction.category_id,
+    Transaction.amount, Transaction.transaction_type, Transaction.transaction_date, Transaction.description,
+    Transaction.location, Transaction.created_at, Transaction.updated_at,
+)
+
+async def get_transactions_by_user(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    sort_by: str = "transaction_date",
+    order: str = "desc",
+    cursor: str | None = None,
+    limit: int = 20,
+    columns: tuple | None = None,
+    **filters,
+):
+    logger.debug("Querying transactions for user_id=%s, sort_by=%s, order=%s, limit=%s", user_id, sort_by, order, limit)
+    query = _apply_filters(select(*columns) if columns else select(Transaction), user_id, **filters)
+    transactions, next_cursor = await keyset_paginate(
+        db, query,
+        sort_column=SORTABLE_COLUMNS[sort_by], id_column=Transaction.transaction_id,
+        cursor=cursor, limit=limit, descending=order == "desc", rows=columns is not None,
+    )
+    logger.debug("Found %s transactions", len(transactions))
+    return transactions, next_cursor
+
+async def stream_transaction_rows(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    sort_by: str = "transaction_date",
+    order: str = "desc",
+    columns: tuple = TRANSACTION_LIST_COLUMNS,
+    batch_size: int = 1000,
+    **filters,
+):
+    """Yield batches of Row tuples from a server-side cursor; memory stays bounded by batch_size."""
+    sort_column = SORTABLE_COLUMNS[sort_by]
+    query = _apply_filters(select(*columns), user_id, **filters)
+    if order == "desc":
+        query = query.order_by(sort_column.desc(), Transaction.transaction_id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Transaction.transaction_id.asc())
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        yield partition
+
+# Cột generated trong DB (xem sql/script.sql), không map vào model để không bị SELECT kèm mỗi lần load Transaction
+SEARCH_TEXT = literal_column("transactions.search_text")
+SEARCH_VECTOR = literal_column("transactions.search_vector")
+_SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+
+async def search_transactions(
+    db: AsyncSession,
+    user_id: int,
+    q: str,
+    *,
+    cursor: str | None = None,
+    limit: int = 20,
+    columns: tuple | None = None,
+    **filters,
+):
+    """Ranked search over description/location: prefix full-text match OR trigram word similarity (typos)."""
+    logger.debug("Searching transactions for user_id=%s, q=%r, limit=%s", user_id, q, limit)
+    terms = _SEARCH_TERM.findall(q.lower())
+    if not terms:
+        return [], None
+    # Tự dựng tsquery từ các từ (prefix :*) để input của user không gây lỗi cú pháp tsquery
+    tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{term}:*" for term in terms))
+    phrase = " ".join(terms)
+    rank = (func.ts_rank(SEARCH_VECTOR, tsquery) + func.word_similarity(phrase, SEARCH_TEXT)).label("rank")
+    query = _apply_filters(select(*(columns or (Transaction,)), rank), user_id, **filters).filter(or_(
+        SEARCH_VECTOR.op("@@")(tsquery),
+        literal(phrase).op("<%")(SEARCH_TEXT),  # word_similarity >= pg_trgm.word_similarity_threshold, dùng GIN trgm
+    ))
+    if cursor:
+        rank_value, id_value = decode_cursor(cursor, "rank")
+        query = query.filter(tuple_(rank.element, Transaction.transaction_id) < tuple_(rank_value, id_value))
+    query = query.order_by(rank.desc(), Transaction.transaction_id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor("rank", last.rank, last.transaction_id if columns else last[0].transaction_id)
+    logger.debug("Search matched %s transactions", len(rows))
+    # Row thừa cột rank nhưng validate from_attributes chỉ đọc các field của schema
+    return (rows if columns else [row[0] for row in rows]), next_cursor
+
+async def update_transaction(db: AsyncSession, transaction: Transaction, update_data: dict, transaction_type: CategoryType):
+    logger.debug("Updating transaction_id=%s with data=%s", transaction.transaction_id, update_data)
+    deltas = defaultdict(Decimal)
+    rollup_deltas = new_rollup_deltas()
+    deltas[transaction.account_id] -= balance_delta(transaction.transaction_type, transaction.amount)
+    _add_rollup(rollup_deltas, transaction, -1)
+    for key, value in update_data.items():
+        if value is not None:
+            setattr(transaction, key, value)
+    transaction.transaction_type = transaction_type
+    # Nếu đổi account: hoàn tác ở account cũ và ghi vào account mới, cùng một transaction DB
+    deltas[transaction.account_id] += balance_delta(transaction.transaction_type, transaction.amount)
+    _add_rollup(rollup_deltas, transaction, 1)
+    await _apply_deltas(db, deltas)
+    await apply_rollup_deltas(db, rollup_deltas)
+    await apply_budget_deltas(db, rollup_deltas)
+    await db.commit()
+    await db.refresh(transaction)
+    logger.debug("Transaction updated: transaction_id=%s", transaction.transaction_id)
+    return transaction
+
+async def delete_transaction(db: AsyncSession, transaction: Transaction):
+    logger.debug("Deleting transaction_id=%s", transaction.transaction_id)
+    await db.delete(transaction)
+    await _apply_deltas(db, {transaction.account_id: -balance_delta(transaction.transaction_type, transaction.amount)})
+    rollup_deltas = new_rollup_deltas()
+    _add_rollup(rollup_deltas, transaction, -1)
+    await apply_rollup_deltas(db, rollup_deltas)
+    await apply_budget_deltas(db, rollup_deltas)
+    await db.commit()
+    logger.debug("Transaction deleted: transaction_id=%s", transaction.transaction_id)
+    return transaction
+
+async def insert_transactions_batch(db: AsyncSession, rows: list[dict]):
+    # executemany trong transaction hiện tại; không commit, không refresh từng object
+    logger.debug("Bulk inserting %s transactions", len(rows))
+    if rows:
+        await db.execute(insert(Transaction), rows)
+
+async def commit_bulk_transactions(db: AsyncSession, deltas: dict[int, Decimal], rollup_deltas: dict[tuple, list]):
+    # Một lần cập nhật số dư/rollup cho mỗi account, commit cùng toàn bộ các batch đã insert
+    await _apply_deltas(db, deltas)
+    await apply_rollup_deltas(db, rollup_deltas)
+    await apply_budget_deltas(db, rollup_deltas)
+    await db.commit()
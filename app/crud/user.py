@@ -1,38 +1,74 @@
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.api.v1.schemas import UserCreate, UserUpdate
 from app.crud.base import CRUDBase
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.core.user_cache import user_cache
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
-    def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        result = await db.execute(select(User).filter(User.email == email))
+        return result.scalars().first()
 
-    def get_by_username(self, db: Session, *, username: str) -> Optional[User]:
-        return db.query(User).filter(User.username == username).first()
+    async def get_password_hash(self, db: AsyncSession, *, user_id: int) -> Optional[str]:
+        # User lấy từ cache không có password_hash - luôn đọc hash mới nhất từ DB
+        result = await db.execute(select(User.password_hash).filter(User.user_id == user_id))
+        return result.scalar_one_or_none()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
-        db_obj = User(
+    async def get_by_username(self, db: AsyncSession, *, username: str) -> Optional[User]:
+        result = await db.execute(select(User).filter(User.username == username))
+        return result.scalars().first()
+
+    async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        # Một round-trip: unique constraint của DB quyết định trùng lặp, không SELECT kiểm tra trước
+        stmt = pg_insert(User).values(
             username=obj_in.username,
             email=obj_in.email,
-            password_hash=get_password_hash(obj_in.password),
+            password_hash=await get_password_hash_async(obj_in.password),
             full_name=obj_in.full_name,
             default_currency=obj_in.default_currency,
             is_active=False  # Mặc định chưa kích hoạt
-        )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        ).on_conflict_do_nothing().returning(User)
+        db_obj = (await db.scalars(stmt)).first()
+        if db_obj is None:
+            await db.rollback()
+            # Chỉ khi bị trùng mới cần query thêm để biết trùng email hay username
+            email_taken = (await db.execute(select(User.user_id).filter(User.email == obj_in.email).limit(1))).first()
+            raise ValueError("Email already registered" if email_taken else "Username already taken")
+        await db.commit()
         return db_obj
 
-    def update(self, db: Session, *, db_obj: User, obj_in: UserUpdate) -> User:
+    async def update(self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate) -> User:
         update_data = obj_in.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_obj, key, value)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await user_cache.invalidate(db_obj.user_id)
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def activate(self, db: AsyncSession, *, db_obj: User) -> User:
+        db_obj.is_active = True
+        db.add(db_obj)
+        await db.commit()
+        await user_cache.invalidate(db_obj.user_id)
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_password(self, db: AsyncSession, *, db_obj: User, new_password: str) -> User:
+        password_hash = await get_password_hash_async(new_password)
+        return await self.update_password_hash(db, db_obj=db_obj, password_hash=password_hash)
+
+    async def update_password_hash(self, db: AsyncSession, *, db_obj: User, password_hash: str) -> User:
+        db_obj.password_hash = password_hash
+        db.add(db_obj)
+        await db.commit()
+        await user_cache.invalidate(db_obj.user_id)
+        await db.refresh(db_obj)
         return db_obj
 
-user = CRUDUser(User)
\ No newline at end of file
+user = CRUDUser(User)
@@ -1,9 +1,47 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, profile, accounts
+from fastapi.responses import JSONResponse
+from app.core.account_feed import account_feed
+from app.core.security import PasswordHashQueueFull
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.logger import DebugSamplingMiddleware
+from app.core.idempotency import IdempotencyMiddleware, purge_expired_keys_forever
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.rate_limit import RateLimitMiddleware
+from app.crud.base import InvalidCursor
+from app.services.email_service import EmailService
+from app.services.recurring_service import RecurringService
+from app.api.v1.endpoints import auth, profile, accounts, categories, transactions, reports, internal, metrics
 
-app = FastAPI(title="Personal Finance API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    # Worker gửi email từ outbox
+    if settings.EMAIL_WORKER_ENABLED:
+        tasks.extend(EmailService.start_workers())
+    # Scheduler giao dịch lặp lại chạy nền trong app nếu được bật (hoặc chạy riêng bằng run_recurring.py)
+    if settings.RECURRING_SCHEDULER_ENABLED:
+        tasks.append(asyncio.create_task(RecurringService.run_forever()))
+    # Xóa định kỳ các Idempotency-Key đã hết hạn
+    if settings.IDEMPOTENCY_ENABLED:
+        tasks.append(asyncio.create_task(purge_expired_keys_forever()))
+    yield
+    await account_feed.close()
+    for task in tasks:
+        task.cancel()
+    with suppress(asyncio.CancelledError):
+        await asyncio.gather(*tasks, return_exceptions=True)
 
+app = FastAPI(title="Personal Finance API", lifespan=lifespan)
+
+# Idempotency-Key: retry của client được trả response đã lưu, không chạy lại endpoint
+app.add_middleware(IdempotencyMiddleware)
+# Rate limit endpoint auth; đặt ngoài Idempotency để request bị 429 không claim/poll key trong DB,
+# và trong CORS để response 429 vẫn có header CORS
+app.add_middleware(RateLimitMiddleware)
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -12,11 +50,34 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Lấy mẫu log DEBUG theo route (LOG_DEBUG_SAMPLE_RATES)
+app.add_middleware(DebugSamplingMiddleware)
+# Histogram latency theo route, số query/thời gian DB mỗi request, header Server-Timing
+if settings.METRICS_ENABLED:
+    instrument_engine(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
 
 # Include API routers
 app.include_router(auth.router)
 app.include_router(profile.router)
 app.include_router(accounts.router)
+app.include_router(categories.router)
+app.include_router(transactions.router)
+app.include_router(reports.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
+
+@app.exception_handler(PasswordHashQueueFull)
+async def password_hash_queue_full_handler(request: Request, exc: PasswordHashQueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 @app.get("/")
 async def root():
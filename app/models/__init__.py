@@ -1,4 +1,17 @@
 from .account import Base, Account, AccountType
 from .user import User
+from .category import Category, CategoryType
+from .transaction import Transaction
+from .budget import Budget
+from .report import TransactionDailyRollup
+from .recurring_transaction import RecurringTransaction, RecurrenceFrequency
+from .email_outbox import EmailOutbox
+from .tag import Tag, TransactionTag
+from .exchange_rate import ExchangeRate
+from .idempotency_key import IdempotencyKey
 
-__all__ = ["Base", "User", "Account", "AccountType"]
\ No newline at end of file
+__all__ = [
+    "Base", "User", "Account", "AccountType", "Category", "CategoryType",
+    "Transaction", "Budget", "TransactionDailyRollup", "RecurringTransaction", "RecurrenceFrequency",
+    "EmailOutbox", "Tag", "TransactionTag", "ExchangeRate", "IdempotencyKey",
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Enum, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, String, Enum, Numeric, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 import enum
@@ -16,13 +16,17 @@ class AccountType(enum.Enum):
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (
+        # Tên account là duy nhất trong các account đang active của một user
+        Index("uq_accounts_user_active_name", "user_id", "account_name", unique=True, postgresql_where=text("is_active")),
+    )
 
     account_id = Column(BigInteger, primary_key=True)
     user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=False)
     account_name = Column(String(100), nullable=False)
-    account_type = Column(Enum(AccountType), nullable=False)
-    initial_balance = Column(Float, nullable=False, default=0.0)
-    current_balance = Column(Float, nullable=False, default=0.0)
+    account_type = Column(Enum(AccountType, name="account_type"), nullable=False)
+    initial_balance = Column(Numeric(18, 2), nullable=False, default=0)
+    current_balance = Column(Numeric(18, 2), nullable=False, default=0)
     currency = Column(String(3), nullable=False)
     is_active = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
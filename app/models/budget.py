@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Numeric, Date, DateTime, ForeignKey, func
+from .account import Base  # Import Base từ account.py
+
+class Budget(Base):
+    __tablename__ = "budgets"
+
+    budget_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=False)
+    category_id = Column(BigInteger, ForeignKey("categories.category_id"), nullable=False)
+    amount = Column(Numeric(18, 2), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # Chi tiêu lũy kế trong kỳ (gồm danh mục con), cộng dồn khi ghi giao dịch - xem crud.budget.apply_budget_deltas
+    spent_amount = Column(Numeric(18, 2), nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
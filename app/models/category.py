@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, String, Enum, Boolean, DateTime, ForeignKey, func
+import enum
+from .account import Base  # Import Base từ account.py
+
+class CategoryType(enum.Enum):
+    expense = "expense"
+    income = "income"
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    category_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=True)  # NULL = danh mục hệ thống
+    category_name = Column(String(100), nullable=False)
+    parent_category_id = Column(BigInteger, ForeignKey("categories.category_id"), nullable=True)
+    category_type = Column(Enum(CategoryType, name="category_type"), nullable=False)
+    icon = Column(String(50))
+    is_custom = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
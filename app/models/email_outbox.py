@@ -0,0 +1,27 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, ForeignKey, Index, func, text
+from .account import Base  # Import Base từ account.py
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Mỗi user chỉ có một email đang chờ gửi cho mỗi mục đích (activation, reset_password)
+        Index(
+            "uq_email_outbox_pending", "user_id", "purpose", unique=True,
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+    )
+
+    email_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=False)
+    purpose = Column(String(32), nullable=False)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")  # pending | sending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    # Tăng mỗi lần claim hoặc enqueue lại (attempts thì bị reset về 0) - worker chỉ ghi kết quả khi version còn khớp
+    claim_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
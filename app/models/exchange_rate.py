@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Date, Numeric, String
+from .account import Base  # Import Base từ account.py
+
+class ExchangeRate(Base):
+    __tablename__ = "exchange_rates"
+
+    rate_date = Column(Date, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    rate = Column(Numeric(20, 10), nullable=False)  # giá trị 1 đơn vị currency quy ra FX_BASE_CURRENCY
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, BigInteger, Integer, String, LargeBinary, JSON, DateTime, ForeignKey, Index, func
+from .account import Base  # Import Base từ account.py
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), primary_key=True)
+    idempotency_key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 của method, path, query string và body
+    status = Column(String(16), nullable=False, default="processing")  # processing | completed
+    response_status = Column(Integer)
+    response_headers = Column(JSON)  # [[name, value], ...]
+    response_body = Column(LargeBinary)
+    locked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, Enum, Numeric, Text, Boolean, Date, DateTime, ForeignKey, func
+import enum
+from .account import Base  # Import Base từ account.py
+from .category import CategoryType
+
+class RecurrenceFrequency(enum.Enum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
+    yearly = "yearly"
+
+class RecurringTransaction(Base):
+    __tablename__ = "recurringtransactions"
+
+    recurring_transaction_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=False)
+    account_id = Column(BigInteger, ForeignKey("accounts.account_id"), nullable=False)
+    category_id = Column(BigInteger, ForeignKey("categories.category_id"), nullable=False)
+    amount = Column(Numeric(18, 2), nullable=False)
+    transaction_type = Column(Enum(CategoryType, name="category_type"), nullable=False)
+    description = Column(Text)
+    frequency = Column(Enum(RecurrenceFrequency, name="recurrence_frequency"), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date)  # NULL = lặp vô thời hạn
+    next_due_date = Column(Date, nullable=False)
+    last_created_date = Column(Date)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
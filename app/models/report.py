@@ -0,0 +1,14 @@
+from sqlalchemy import Column, BigInteger, Integer, Enum, Numeric, Date, ForeignKey
+from .account import Base  # Import Base từ account.py
+from .category import CategoryType
+
+class TransactionDailyRollup(Base):
+    __tablename__ = "transaction_daily_rollups"
+
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), primary_key=True)
+    rollup_date = Column(Date, primary_key=True)
+    account_id = Column(BigInteger, ForeignKey("accounts.account_id"), primary_key=True)
+    category_id = Column(BigInteger, ForeignKey("categories.category_id"), primary_key=True)
+    transaction_type = Column(Enum(CategoryType, name="category_type"), primary_key=True)
+    total_amount = Column(Numeric(18, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, ForeignKey, func
+from .account import Base  # Import Base từ account.py
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    tag_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=False)
+    tag_name = Column(String(50), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+class TransactionTag(Base):
+    __tablename__ = "transaction_tags"
+
+    transaction_id = Column(BigInteger, ForeignKey("transactions.transaction_id"), primary_key=True)
+    tag_id = Column(BigInteger, ForeignKey("tags.tag_id"), primary_key=True)
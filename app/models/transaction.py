@@ -0,0 +1,18 @@
+from sqlalchemy import Column, BigInteger, String, Enum, Numeric, Text, DateTime, ForeignKey, func
+from .account import Base  # Import Base từ account.py
+from .category import CategoryType
+
+class Transaction(Base):
+    __tablename__ = "transactions"
+
+    transaction_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), nullable=False)
+    account_id = Column(BigInteger, ForeignKey("accounts.account_id"), nullable=False)
+    category_id = Column(BigInteger, ForeignKey("categories.category_id"), nullable=False)
+    amount = Column(Numeric(18, 2), nullable=False)  # Luôn dương, dấu được suy ra từ transaction_type
+    transaction_type = Column(Enum(CategoryType, name="category_type"), nullable=False)
+    transaction_date = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    description = Column(Text)
+    location = Column(String(255))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
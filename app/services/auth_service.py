@@ -1,119 +1,73 @@
 from typing import Optional
 from datetime import timedelta
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.user import user as user_crud
-from app.crud.account import create_account, get_accounts_by_user, get_account_by_id, update_account, delete_account
+from app.crud.account import (
+    create_account, get_accounts_page, get_accounts_version, get_account_by_id, get_account_version, update_account, delete_account,
+    stream_account_rows,
+)
 from app.api.v1.schemas import UserCreate, Token
-from app.core.security import verify_password, create_access_token, decode_access_token
+from app.core.account_feed import TooManySubscribers, account_feed
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.security import (
+    verify_password_async, verify_and_update_password, create_access_token, decode_access_token,
+    create_activation_token, create_reset_password_token, decode_activation_token, decode_reset_password_token
+)
 from app.models.user import User
 from app.core.logger import setup_logger
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from app.core.config import settings
+from app.core.user_cache import user_cache
+from app.services.email_service import EmailService
 
 # Setup logger
 logger = setup_logger(__name__)
-# Email configuration
-mail_conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False
-)
+
 class AuthService:
     @staticmethod
-    async def send_activation_email(user: User, activation_token: str):
-        logger.info(f"Sending activation email to {user.email}")
-        activation_link = f"{settings.FRONTEND_URL}/activate?token={activation_token}"
-        html = f"""
-        <h1>Activate Your Account</h1>
-        <p>Hello {user.full_name or user.username},</p>
-        <p>Please click the link below to activate your account:</p>
-        <a href="{activation_link}">Activate Account</a>
-        <p>The link will expire in 24 hours.</p>
-        """
-        message = MessageSchema(
-            subject="Activate Your Account",
-            recipients=[user.email],
-            body=html,
-            subtype="html"
-        )
-        fm = FastMail(mail_conf)
+    async def register(db: AsyncSession, user_in: UserCreate) -> User:
+        logger.info("Registering user with email=%s", user_in.email)
         try:
-            await fm.send_message(message)
-            logger.info(f"Activation email sent to {user.email}")
-        except Exception as e:
-            logger.error(f"Failed to send activation email to {user.email}: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to send activation email")
-
-    @staticmethod
-    async def send_reset_password_email(user: User, reset_token: str):
-        logger.info(f"Sending reset password email to {user.email}")
-        reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-        html = f"""
-        <h1>Reset Your Password</h1>
-        <p>Hello {user.full_name or user.username},</p>
-        <p>We received a request to reset your password. Click the link below to reset it:</p>
-        <a href="{reset_link}">Reset Password</a>
-        <p>The link will expire in 1 hour.</p>
-        """
-        message = MessageSchema(
-            subject="Reset Your Password",
-            recipients=[user.email],
-            body=html,
-            subtype="html"
-        )
-        fm = FastMail(mail_conf)
-        try:
-            await fm.send_message(message)
-            logger.info(f"Reset password email sent to {user.email}")
-        except Exception as e:
-            logger.error(f"Failed to send reset password email to {user.email}: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to send reset password email")
-        
-    @staticmethod
-    def register(db: Session, user_in: UserCreate) -> User:
-        logger.info(f"Registering user with email={user_in.email}")
-        if user_crud.get_by_email(db, email=user_in.email):
-            logger.error(f"Email {user_in.email} already registered")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        if user_crud.get_by_username(db, username=user_in.username):
-            logger.error(f"Username {user_in.username} already taken")
+            user = await user_crud.create(db, obj_in=user_in)
+        except ValueError as e:
+            logger.error("Registration failed for email=%s: %s", user_in.email, e)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
+                detail=str(e)
             )
-        
-        user = user_crud.create(db, obj_in=user_in)
-        logger.info(f"User registered successfully: user_id={user.user_id}")
+        logger.info("User registered successfully: user_id=%s", user.user_id)
+        # Chỉ ghi vào outbox; worker gửi email nên signup không phải chờ SMTP
+        await EmailService.send_activation_email(db, user, create_activation_token(user.user_id))
         return user
 
     @staticmethod
-    def login(db: Session, email: str, password: str) -> Token:
-        logger.info(f"Attempting login for email={email}")
-        db_user = user_crud.get_by_email(db, email=email)
-        if not db_user or not verify_password(password, db_user.password_hash):
-            logger.error(f"Login failed for email={email}: Incorrect email or password")
+    async def login(db: AsyncSession, email: str, password: str) -> Token:
+        logger.info("Attempting login for email=%s", email)
+        db_user = await user_crud.get_by_email(db, email=email)
+        # Kết thúc transaction đọc để trả connection về pool trong lúc chờ bcrypt
+        await db.commit()
+        verified, new_hash = (False, None)
+        if db_user:
+            verified, new_hash = await verify_and_update_password(password, db_user.password_hash)
+        if not verified:
+            logger.error("Login failed for email=%s: Incorrect email or password", email)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if new_hash:
+            # Hash cũ có cost khác BCRYPT_ROUNDS - băm lại khi đã có mật khẩu gốc
+            await user_crud.update_password_hash(db, db_obj=db_user, password_hash=new_hash)
+            logger.info("Rehashed password for user_id=%s", db_user.user_id)
         
         access_token = create_access_token(data={"sub": str(db_user.user_id)})
-        logger.info(f"Login successful for user_id={db_user.user_id}, token generated")
+        logger.info("Login successful for user_id=%s, token generated", db_user.user_id)
         return Token(access_token=access_token, token_type="bearer")
 
     @staticmethod
-    def get_current_user(db: Session, token: str) -> User:
-        logger.info(f"Validating token: {token[:10]}...")
+    async def get_current_user(db: AsyncSession, token: str) -> User:
+        logger.debug("Validating token: %s...", token[:10])
         token_data = decode_access_token(token)
         if token_data is None:
             logger.error("Invalid authentication credentials")
@@ -123,65 +77,177 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        db_user = user_crud.get(db, id=token_data.user_id)
+        db_user = await user_cache.get(db, token_data["user_id"])
+        if db_user is None:
+            db_user = await user_crud.get(db, id=token_data["user_id"])
+            if db_user is not None:
+                await user_cache.set(db_user)
         if db_user is None:
-            logger.error(f"User not found for user_id={token_data.user_id}")
+            logger.error("User not found for user_id=%s", token_data["user_id"])
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        logger.info(f"Token validated, user_id={db_user.user_id}")
+        logger.debug("Token validated, user_id=%s", db_user.user_id)
+        return db_user
+
+    @staticmethod
+    async def activate_user(db: AsyncSession, token: str) -> User:
+        token_data = decode_activation_token(token)
+        if token_data is None:
+            logger.error("Invalid or expired activation token")
+            raise HTTPException(status_code=400, detail="Invalid or expired activation token")
+
+        db_user = await user_crud.get(db, id=token_data["user_id"])
+        if db_user is None:
+            logger.error("User not found for user_id=%s", token_data["user_id"])
+            raise HTTPException(status_code=404, detail="User not found")
+        if db_user.is_active:
+            logger.info("User_id=%s already activated", db_user.user_id)
+            return db_user
+
+        db_user = await user_crud.activate(db, db_obj=db_user)
+        logger.info("User activated: user_id=%s", db_user.user_id)
+        return db_user
+
+    @staticmethod
+    async def request_reset_password(db: AsyncSession, email: str) -> dict:
+        db_user = await user_crud.get_by_email(db, email=email)
+        if db_user is not None:
+            reset_token = create_reset_password_token(db_user.user_id)
+            await EmailService.send_reset_password_email(db, db_user, reset_token)
+            logger.info("Reset password email queued for user_id=%s", db_user.user_id)
+        else:
+            logger.error("No user found for reset password request")
+        # Không tiết lộ email có tồn tại hay không
+        return {"message": "If the email is registered, a reset link has been sent"}
+
+    @staticmethod
+    async def reset_password(db: AsyncSession, token: str, new_password: str) -> User:
+        token_data = decode_reset_password_token(token)
+        if token_data is None:
+            logger.error("Invalid or expired reset password token")
+            raise HTTPException(status_code=400, detail="Invalid or expired reset password token")
+
+        db_user = await user_crud.get(db, id=token_data["user_id"])
+        if db_user is None:
+            logger.error("User not found for user_id=%s", token_data["user_id"])
+            raise HTTPException(status_code=404, detail="User not found")
+
+        db_user = await user_crud.update_password(db, db_obj=db_user, new_password=new_password)
+        logger.info("Password reset for user_id=%s", db_user.user_id)
         return db_user
 
+    @staticmethod
+    async def change_password(db: AsyncSession, user: User, old_password: str, new_password: str) -> User:
+        logger.info("Changing password for user_id=%s", user.user_id)
+        password_hash = await user_crud.get_password_hash(db, user_id=user.user_id)
+        await db.commit()
+        if password_hash is None or not await verify_password_async(old_password, password_hash):
+            logger.error("Incorrect old password for user_id=%s", user.user_id)
+            raise HTTPException(status_code=400, detail="Incorrect old password")
+
+        user = await user_crud.update_password(db, db_obj=user, new_password=new_password)
+        logger.info("Password changed for user_id=%s", user.user_id)
+        return user
+
     # Account Methods
     @staticmethod
-    def create_account(db: Session, user_id: int, account_data: dict):
-        logger.info(f"Creating account for user_id={user_id}, data={account_data}")
+    async def create_account(db: AsyncSession, user_id: int, account_data: dict):
+        logger.debug("Creating account for user_id=%s, data=%s", user_id, account_data)
         try:
-            account = create_account(db, user_id, account_data)
-            logger.info(f"Account created: account_id={account.account_id}")
+            account = await create_account(db, user_id, account_data)
+            logger.info("Account created: account_id=%s", account.account_id)
             return account
         except ValueError as e:
-            logger.error(f"Failed to create account: {str(e)}")
+            logger.error("Failed to create account: %s", e)
             raise HTTPException(status_code=400, detail=str(e))
 
     @staticmethod
-    def get_accounts(db: Session, user_id: int, is_active: bool | None = None):
-        logger.info(f"Fetching accounts for user_id={user_id}, is_active={is_active}")
-        accounts = get_accounts_by_user(db, user_id, is_active)
-        logger.info(f"Fetched {len(accounts)} accounts for user_id={user_id}")
-        return accounts
+    async def get_accounts(
+        db: AsyncSession,
+        user_id: int,
+        is_active: bool | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+        columns: tuple | None = None,
+    ):
+        logger.debug("Fetching accounts for user_id=%s, is_active=%s, limit=%s", user_id, is_active, limit)
+        accounts, next_cursor = await get_accounts_page(db, user_id, is_active, cursor, limit, columns)
+        logger.debug("Fetched %d accounts for user_id=%s", len(accounts), user_id)
+        return accounts, next_cursor
+
+    @staticmethod
+    async def stream_accounts(db: AsyncSession, user_id: int, is_active: bool | None = None):
+        logger.debug("Streaming accounts for user_id=%s, is_active=%s", user_id, is_active)
+        async for rows in stream_account_rows(db, user_id, is_active, batch_size=settings.LIST_STREAM_BATCH_SIZE):
+            yield rows
+
+    @staticmethod
+    async def open_account_stream(db: AsyncSession, user_id: int):
+        """Subscribe to account changes and load the current accounts; returns (subscriber, accounts)."""
+        if not settings.ACCOUNT_STREAM_ENABLED:
+            raise HTTPException(status_code=404, detail="Account stream is disabled")
+        logger.info("Opening account stream for user_id=%s", user_id)
+        try:
+            subscriber = account_feed.subscribe(user_id)
+        except TooManySubscribers:
+            logger.warning("Account stream limit reached, rejecting user_id=%s", user_id)
+            raise HTTPException(status_code=503, detail="Too many open account streams", headers={"Retry-After": "5"})
+        try:
+            # Đăng ký trước khi đọc snapshot để không lỡ thay đổi commit giữa hai bước
+            accounts = [row async for rows in stream_account_rows(db, user_id) for row in rows]
+        except BaseException:
+            account_feed.unsubscribe(user_id, subscriber)
+            raise
+        finally:
+            # Trả connection về pool ngay, kết nối SSE có thể mở hàng giờ
+            await db.close()
+        return subscriber, accounts
+
+    @staticmethod
+    async def get_accounts_etag(db: AsyncSession, user_id: int, is_active: bool | None = None, cursor: str | None = None, limit: int = 100) -> str:
+        count, last_updated = await get_accounts_version(db, user_id, is_active)
+        return make_etag("accounts", user_id, is_active, cursor, limit, count, last_updated)
+
+    @staticmethod
+    async def get_account_etag(db: AsyncSession, account_id: int, user_id: int) -> str | None:
+        updated_at = await get_account_version(db, account_id, user_id)
+        return None if updated_at is None else make_etag("account", account_id, updated_at)
 
     @staticmethod
-    def get_account(db: Session, account_id: int, user_id: int):
-        logger.info(f"Fetching account_id={account_id} for user_id={user_id}")
-        account = get_account_by_id(db, account_id, user_id)
+    async def get_account(db: AsyncSession, account_id: int, user_id: int):
+        logger.debug("Fetching account_id=%s for user_id=%s", account_id, user_id)
+        account = await get_account_by_id(db, account_id, user_id)
         if not account:
-            logger.error(f"Account_id={account_id} not found or user_id={user_id} lacks permission")
+            logger.error("Account_id=%s not found or user_id=%s lacks permission", account_id, user_id)
             raise HTTPException(status_code=404, detail="Account not found or you don't have permission")
-        logger.info(f"Found account: {account.__dict__}")
         return account
 
     @staticmethod
-    def update_account(db: Session, account_id: int, user_id: int, update_data: dict):
-        logger.info(f"Updating account_id={account_id} for user_id={user_id}, update_data={update_data}")
-        account = get_account_by_id(db, account_id, user_id)
+    async def update_account(db: AsyncSession, account_id: int, user_id: int, update_data: dict):
+        logger.debug("Updating account_id=%s for user_id=%s, update_data=%s", account_id, user_id, update_data)
+        account = await get_account_by_id(db, account_id, user_id)
         if not account:
-            logger.error(f"Account_id={account_id} not found or user_id={user_id} lacks permission")
+            logger.error("Account_id=%s not found or user_id=%s lacks permission", account_id, user_id)
             raise HTTPException(status_code=404, detail="Account not found or you don't have permission")
-        account = update_account(db, account, update_data)
-        logger.info(f"Account updated: {account.__dict__}")
+        try:
+            account = await update_account(db, account, update_data)
+        except ValueError as e:
+            logger.error("Failed to update account: %s", e)
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.info("Account updated: account_id=%s", account.account_id)
         return account
 
     @staticmethod
-    def delete_account(db: Session, account_id: int, user_id: int):
-        logger.info(f"Deactivating account_id={account_id} for user_id={user_id}")
-        account = get_account_by_id(db, account_id, user_id)
+    async def delete_account(db: AsyncSession, account_id: int, user_id: int):
+        logger.debug("Deactivating account_id=%s for user_id=%s", account_id, user_id)
+        account = await get_account_by_id(db, account_id, user_id)
         if not account:
-            logger.error(f"Account_id={account_id} not found or user_id={user_id} lacks permission")
+            logger.error("Account_id=%s not found or user_id=%s lacks permission", account_id, user_id)
             raise HTTPException(status_code=404, detail="Account not found or you don't have permission")
-        account = delete_account(db, account)
-        logger.info(f"Account_id={account_id} deactivated")
+        account = await delete_account(db, account)
+        logger.info("Account_id=%s deactivated", account_id)
         return account
\ No newline at end of file
@@ -0,0 +1,91 @@
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.category_cache import category_cache
+from app.crud.budget import rebuild_budget_spent
+from app.crud.category import get_user_category, create_category, update_category, delete_category
+from app.crud.report import report_timezone
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+class CategoryService:
+    @staticmethod
+    async def get_categories(db: AsyncSession, user_id: int, category_type: str | None = None):
+        tree = await category_cache.get(db, user_id)
+        nodes = sorted(tree.nodes.values(), key=lambda node: (node.user_id is not None, node.category_name))
+        if category_type is not None:
+            nodes = [node for node in nodes if node.category_type.value == category_type]
+        return nodes
+
+    @staticmethod
+    async def _check_parent(db: AsyncSession, user_id: int, parent_id: int | None, category_type: str, category_id: int | None = None):
+        if parent_id is None:
+            return
+        # Đổi cha (category_id có giá trị): kiểm tra vòng trên cây đọc từ DB, cây cache có thể cũ nếu worker khác vừa đổi cây
+        tree = await category_cache.get(db, user_id, fresh=category_id is not None)
+        parent = tree.get(parent_id)
+        if parent is None and category_id is None:
+            # Danh mục cha có thể vừa được tạo ở worker khác - đọc lại từ DB trước khi từ chối
+            tree = await category_cache.get(db, user_id, fresh=True)
+            parent = tree.get(parent_id)
+        if parent is None:
+            raise HTTPException(status_code=400, detail="Parent category not found or you don't have permission")
+        if parent.category_type.value != category_type:
+            raise HTTPException(status_code=400, detail="Parent category must have the same category_type")
+        # Không cho chọn chính nó hoặc con cháu của nó làm cha (tạo vòng)
+        if category_id is not None and parent_id in tree.descendants.get(category_id, ()):
+            raise HTTPException(status_code=400, detail="Parent category cannot be the category itself or one of its subcategories")
+
+    @staticmethod
+    async def create_category(db: AsyncSession, user_id: int, category_data: dict):
+        logger.info("Creating category for user_id=%s", user_id)
+        await CategoryService._check_parent(db, user_id, category_data.get("parent_category_id"), category_data["category_type"])
+        try:
+            category = await create_category(db, user_id, category_data)
+        except ValueError as e:
+            logger.error("Failed to create category: %s", e)
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.info("Category created: category_id=%s", category.category_id)
+        return category
+
+    @staticmethod
+    async def _get_own(db: AsyncSession, category_id: int, user_id: int):
+        category = await get_user_category(db, category_id, user_id)
+        if not category:
+            logger.error("Category_id=%s not found or user_id=%s lacks permission", category_id, user_id)
+            raise HTTPException(status_code=404, detail="Category not found or you don't have permission")
+        return category
+
+    @staticmethod
+    async def update_category(db: AsyncSession, category_id: int, user_id: int, update_data: dict):
+        logger.info("Updating category_id=%s for user_id=%s", category_id, user_id)
+        category = await CategoryService._get_own(db, category_id, user_id)
+        if update_data.get("category_name") is None:
+            update_data.pop("category_name", None)
+        if "parent_category_id" in update_data:
+            await CategoryService._check_parent(
+                db, user_id, update_data["parent_category_id"], category.category_type.value, category_id
+            )
+        parent_changed = "parent_category_id" in update_data and update_data["parent_category_id"] != category.parent_category_id
+        try:
+            category = await update_category(db, category, update_data)
+        except ValueError as e:
+            logger.error("Failed to update category: %s", e)
+            raise HTTPException(status_code=400, detail=str(e))
+        if parent_changed:
+            # Cây đổi thì tập danh mục con của budget đổi theo - tính lại spent_amount của budget còn hiệu lực
+            await rebuild_budget_spent(db, user_id, as_of=datetime.now(report_timezone()).date())
+        return category
+
+    @staticmethod
+    async def delete_category(db: AsyncSession, category_id: int, user_id: int):
+        logger.info("Deleting category_id=%s for user_id=%s", category_id, user_id)
+        category = await CategoryService._get_own(db, category_id, user_id)
+        try:
+            await delete_category(db, category)
+        except ValueError as e:
+            logger.error("Failed to delete category: %s", e)
+            raise HTTPException(status_code=400, detail=str(e))
+        await rebuild_budget_spent(db, user_id, as_of=datetime.now(report_timezone()).date())
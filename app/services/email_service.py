@@ -0,0 +1,160 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+import aiosmtplib
+from jinja2 import Environment
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logger import setup_logger
+from app.crud.email_outbox import enqueue_email, claim_due_emails, mark_email_sent, mark_email_failed
+from app.models.email_outbox import EmailOutbox
+from app.models.user import User
+
+# Setup logger
+logger = setup_logger(__name__)
+
+# Template biên dịch một lần khi import; autoescape để tên người dùng không chèn được HTML
+_env = Environment(autoescape=True)
+TEMPLATES = {
+    "activation": ("Activate Your Account", _env.from_string("""
+        <h1>Activate Your Account</h1>
+        <p>Hello {{ name }},</p>
+        <p>Please click the link below to activate your account:</p>
+        <a href="{{ link }}">Activate Account</a>
+        <p>The link will expire in 24 hours.</p>
+        """)),
+    "reset_password": ("Reset Your Password", _env.from_string("""
+        <h1>Reset Your Password</h1>
+        <p>Hello {{ name }},</p>
+        <p>We received a request to reset your password. Click the link below to reset it:</p>
+        <a href="{{ link }}">Reset Password</a>
+        <p>The link will expire in 1 hour.</p>
+        """)),
+}
+
+# Đánh thức worker trong cùng process ngay khi có email mới, không phải chờ hết chu kỳ poll
+_wakeup = asyncio.Event()
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff có jitter, giới hạn bởi EMAIL_RETRY_MAX_SECONDS
+    delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+class SMTPSender:
+    """One persistent SMTP connection, reconnected lazily when the server drops it."""
+
+    def __init__(self):
+        self.client: aiosmtplib.SMTP | None = None
+
+    async def _connect(self):
+        self.client = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME or None,
+            password=settings.MAIL_PASSWORD or None,
+            start_tls=settings.MAIL_STARTTLS,
+            use_tls=settings.MAIL_SSL_TLS,
+            timeout=settings.MAIL_TIMEOUT_SECONDS,
+        )
+        await self.client.connect()
+        logger.info("SMTP connection opened to %s:%s", settings.MAIL_SERVER, settings.MAIL_PORT)
+
+    async def send(self, message: EmailMessage):
+        if self.client is None or not self.client.is_connected:
+            await self._connect()
+        try:
+            await self.client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Server đóng kết nối rảnh - mở lại một lần rồi gửi tiếp
+            await self._connect()
+            await self.client.send_message(message)
+
+    async def close(self):
+        if self.client is not None and self.client.is_connected:
+            try:
+                await self.client.quit()
+            except aiosmtplib.SMTPException:
+                self.client.close()
+        self.client = None
+
+class EmailService:
+    @staticmethod
+    async def enqueue(db: AsyncSession, user: User, purpose: str, link: str):
+        subject, template = TEMPLATES[purpose]
+        body = template.render(name=user.full_name or user.username, link=link)
+        await enqueue_email(db, user.user_id, purpose, user.email, subject, body)
+        _wakeup.set()
+        logger.info("Queued %s email for user_id=%s", purpose, user.user_id)
+
+    @staticmethod
+    async def send_activation_email(db: AsyncSession, user: User, activation_token: str):
+        await EmailService.enqueue(db, user, "activation", f"{settings.FRONTEND_URL}/activate?token={activation_token}")
+
+    @staticmethod
+    async def send_reset_password_email(db: AsyncSession, user: User, reset_token: str):
+        await EmailService.enqueue(db, user, "reset_password", f"{settings.FRONTEND_URL}/reset-password?token={reset_token}")
+
+    @staticmethod
+    def build_message(email: EmailOutbox) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+        message["To"] = email.recipient
+        message["Subject"] = email.subject
+        message.set_content(email.body, subtype="html")
+        return message
+
+    @staticmethod
+    async def deliver(db: AsyncSession, sender: SMTPSender, email: EmailOutbox):
+        try:
+            await sender.send(EmailService.build_message(email))
+        except Exception as e:
+            await sender.close()
+            retry_at = None
+            if email.attempts < settings.EMAIL_MAX_ATTEMPTS:
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=retry_delay(email.attempts))
+            logger.error("Failed to send %s email_id=%s (attempt %s): %s", email.purpose, email.email_id, email.attempts, e)
+            await mark_email_failed(db, email, str(e), retry_at)
+            return False
+        await mark_email_sent(db, email)
+        logger.info("Sent %s email_id=%s to %s", email.purpose, email.email_id, email.recipient)
+        return True
+
+    @staticmethod
+    async def process_batch(sender: SMTPSender, batch_size: int | None = None) -> int:
+        async with AsyncSessionLocal() as db:
+            emails = await claim_due_emails(db, batch_size or settings.EMAIL_BATCH_SIZE)
+            for email in emails:
+                await EmailService.deliver(db, sender, email)
+        return len(emails)
+
+    @staticmethod
+    async def run_worker(worker_id: int):
+        logger.info("Email worker %s started", worker_id)
+        sender = SMTPSender()
+        try:
+            while True:
+                # clear trước khi nhận batch để email được enqueue trong lúc xử lý vẫn đánh thức worker
+                _wakeup.clear()
+                try:
+                    claimed = await EmailService.process_batch(sender)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Email worker %s failed to process outbox: %s", worker_id, e)
+                    claimed = 0
+                if claimed:
+                    continue
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=settings.EMAIL_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await sender.close()
+
+    @staticmethod
+    def start_workers() -> list[asyncio.Task]:
+        # Số worker = số kết nối SMTP đồng thời tối đa
+        return [asyncio.create_task(EmailService.run_worker(i)) for i in range(settings.EMAIL_WORKERS)]
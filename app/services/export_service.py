@@ -0,0 +1,108 @@
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import AsyncIterator, List
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.schemas import TransactionResponse
+from app.core.config import settings
+from app.core.serialization import NDJSON_MEDIA_TYPE, ndjson_lines
+from app.crud.transaction import TRANSACTION_LIST_COLUMNS, stream_transaction_rows
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": (NDJSON_MEDIA_TYPE, "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+EXPORT_FIELDS = [column.key for column in TRANSACTION_LIST_COLUMNS]
+
+_transactions_adapter = TypeAdapter(List[TransactionResponse])
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def _csv_chunks(partitions: AsyncIterator) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in partitions:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        # Dùng lại buffer cho batch sau để bộ nhớ không tăng theo số dòng
+        buffer.seek(0)
+        buffer.truncate()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object for ParquetWriter; bytes are drained after each row group."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+def _parquet_schema(pa):
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("transaction_id", pa.int64()), ("user_id", pa.int64()), ("account_id", pa.int64()), ("category_id", pa.int64()),
+        ("amount", pa.decimal128(18, 2)), ("transaction_type", pa.string()), ("transaction_date", timestamp),
+        ("description", pa.string()), ("location", pa.string()), ("created_at", timestamp), ("updated_at", timestamp),
+    ])
+
+async def _parquet_chunks(partitions: AsyncIterator, pa, pq) -> AsyncIterator[bytes]:
+    schema = _parquet_schema(pa)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    async for rows in partitions:
+        # Mỗi partition là một record batch / row group, không giữ lại sau khi ghi
+        columns = list(zip(*rows))
+        transaction_types = columns[EXPORT_FIELDS.index("transaction_type")]
+        columns[EXPORT_FIELDS.index("transaction_type")] = [t.value for t in transaction_types]
+        writer.write_batch(pa.record_batch([pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+class ExportService:
+    @staticmethod
+    def stream_transactions(db: AsyncSession, user_id: int, file_format: str, **filters) -> tuple[str, str, AsyncIterator[bytes]]:
+        """Return (media_type, file_extension, byte chunks) for a full export streamed from a server-side cursor."""
+        logger.info("Exporting transactions for user_id=%s, format=%s", user_id, file_format)
+        media_type, extension = EXPORT_FORMATS[file_format]
+        pa = pq = None
+        if file_format == "parquet":
+            # pyarrow là dependency tùy chọn, chỉ cần khi export parquet
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                logger.error("Parquet export requested but pyarrow is not installed")
+                raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+        partitions = stream_transaction_rows(db, user_id, batch_size=settings.EXPORT_BATCH_SIZE, **filters)
+        if file_format == "csv":
+            chunks = _csv_chunks(partitions)
+        elif file_format == "ndjson":
+            chunks = ndjson_lines(_transactions_adapter, partitions)
+        else:
+            chunks = _parquet_chunks(partitions, pa, pq)
+        return media_type, extension, chunks
@@ -0,0 +1,223 @@
+import codecs
+import csv
+import re
+from collections import defaultdict, deque
+from decimal import Decimal
+from typing import AsyncIterator, List
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.schemas import TransactionImportRow
+from app.crud.account import get_accounts_by_user
+from app.core.category_cache import category_cache
+from app.crud.transaction import balance_delta, insert_transactions_batch, commit_bulk_transactions
+from app.crud.report import rollup_key, new_rollup_deltas
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+_rows_adapter = TypeAdapter(List[TransactionImportRow])
+
+CSV_COLUMNS = {"date": "transaction_date", "amount": "amount", "category": "category",
+               "account": "account", "description": "description", "location": "location"}
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+_MAX_RECORD_LINES = 1000
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Giải mã từng chunk, chỉ giữ lại phần dòng chưa hoàn chỉnh trong bộ nhớ
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+class _LineQueue:
+    """Iterator over queued lines: StopIteration when empty, yet csv.reader keeps reading once more lines are queued."""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """Yield (row_number, raw_row) from a CSV stream with a header line."""
+    # Một csv.reader cho cả stream để field trong ngoặc kép được chứa xuống dòng (memo nhiều dòng)
+    queue = _LineQueue()
+    reader = csv.reader(queue)
+
+    async def records():
+        quotes = 0
+        async for line in _iter_lines(chunks):
+            queue.lines.append(line + "\n")
+            quotes += line.count('"')
+            # Chỉ cho reader đọc khi bản ghi đã đủ (số dấu " chẵn), không để nó hết dữ liệu giữa một field;
+            # ngoặc kép không bao giờ đóng thì cắt ở _MAX_RECORD_LINES dòng thay vì giữ cả phần còn lại của file
+            if quotes % 2 == 0 or len(queue.lines) >= _MAX_RECORD_LINES:
+                quotes = 0
+                for values in reader:
+                    yield values
+        for values in reader:
+            yield values
+
+    header = None
+    row_number = 0
+    async for values in records():
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [CSV_COLUMNS.get(name.strip().lower()) for name in values]
+            missing = {"transaction_date", "amount", "category"} - set(header)
+            if missing:
+                raise HTTPException(status_code=400, detail=f"CSV header is missing columns: {sorted(missing)}")
+            continue
+        row_number += 1
+        yield row_number, {key: value.strip() or None for key, value in zip(header, values) if key}
+
+async def iter_ofx_rows(chunks: AsyncIterator[bytes], income_category: str, expense_category: str) -> AsyncIterator[tuple[int, dict]]:
+    """Yield (row_number, raw_row) for each <STMTTRN> block of an OFX (SGML or XML) stream."""
+    buffer = ""
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        buffer += line + "\n"
+        while "</STMTTRN>" in buffer:
+            block, buffer = buffer.split("</STMTTRN>", 1)
+            block = block[block.find("<STMTTRN>"):]
+            fields = dict(_OFX_FIELD.findall(block))
+            row_number += 1
+            amount = fields.get("TRNAMT", "")
+            posted = fields.get("DTPOSTED", "")[:8]
+            description = " - ".join(v.strip() for v in (fields.get("NAME"), fields.get("MEMO")) if v and v.strip())
+            yield row_number, {
+                "transaction_date": f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) == 8 else posted,
+                "amount": amount,
+                "category": expense_category if amount.strip().startswith("-") else income_category,
+                "description": description or None,
+            }
+        if "<STMTTRN>" not in buffer:
+            buffer = ""  # Bỏ phần header/footer OFX, không giữ lại
+
+class ImportService:
+    @staticmethod
+    async def import_transactions(
+        db: AsyncSession,
+        user_id: int,
+        chunks: AsyncIterator[bytes],
+        *,
+        file_format: str = "csv",
+        account_id: int | None = None,
+        income_category: str | None = None,
+        expense_category: str | None = None,
+    ) -> dict:
+        logger.info("Importing %s transactions for user_id=%s, account_id=%s", file_format, user_id, account_id)
+        # Tra cứu tên -> id trong bộ nhớ, không query theo từng dòng
+        accounts = {a.account_id: a for a in await get_accounts_by_user(db, user_id, is_active=True)}
+        account_ids_by_name = {a.account_name.strip().lower(): a.account_id for a in accounts.values()}
+        categories = {}
+        # Cây đọc thẳng từ DB (một query cho cả file): danh mục vừa tạo ở worker khác không bị báo "Unknown category"
+        tree = await category_cache.get(db, user_id, fresh=True)
+        for category in sorted(tree.nodes.values(), key=lambda c: c.user_id is not None):
+            # Danh mục riêng của user ghi đè danh mục hệ thống cùng tên
+            categories[category.category_name.strip().lower()] = category
+        categories_by_id = {str(c.category_id): c for c in categories.values()}
+
+        if account_id is not None and account_id not in accounts:
+            raise HTTPException(status_code=400, detail="Account not found or you don't have permission")
+        if file_format == "ofx":
+            if account_id is None or not income_category or not expense_category:
+                raise HTTPException(status_code=400, detail="OFX import requires account_id, income_category and expense_category")
+            rows = iter_ofx_rows(chunks, income_category, expense_category)
+        else:
+            rows = iter_csv_rows(chunks)
+
+        def resolve(row: TransactionImportRow) -> dict:
+            category = categories.get(row.category.strip().lower()) or categories_by_id.get(row.category.strip())
+            if category is None:
+                raise ValueError(f"Unknown category '{row.category}'")
+            if row.account:
+                resolved_account_id = account_ids_by_name.get(row.account.strip().lower())
+                if resolved_account_id is None and row.account.strip().isdigit() and int(row.account) in accounts:
+                    resolved_account_id = int(row.account)
+                if resolved_account_id is None:
+                    raise ValueError(f"Unknown account '{row.account}'")
+            elif account_id is not None:
+                resolved_account_id = account_id
+            else:
+                raise ValueError("Missing account")
+            return {
+                "user_id": user_id,
+                "account_id": resolved_account_id,
+                "category_id": category.category_id,
+                "amount": abs(row.amount),
+                "transaction_type": category.category_type,
+                "transaction_date": row.transaction_date,
+                "description": row.description,
+                "location": row.location,
+            }
+
+        imported = 0
+        failed = 0
+        errors = []
+        deltas = defaultdict(Decimal)
+        rollup_deltas = new_rollup_deltas()
+
+        def record_error(row_number: int, message: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "error": message})
+
+        async def flush(batch: list[tuple[int, dict]]):
+            nonlocal imported
+            row_errors = {}
+            try:
+                parsed = _rows_adapter.validate_python([raw for _, raw in batch])
+            except ValidationError as e:
+                # Validate cả batch một lần; chỉ parse lại từng dòng khi batch có lỗi
+                for err in e.errors():
+                    row_errors.setdefault(err["loc"][0], f"{'.'.join(str(p) for p in err['loc'][1:])}: {err['msg']}")
+                parsed = [None if i in row_errors else TransactionImportRow.model_validate(raw) for i, (_, raw) in enumerate(batch)]
+            values = []
+            for i, (row_number, _) in enumerate(batch):
+                if i in row_errors:
+                    record_error(row_number, row_errors[i])
+                    continue
+                try:
+                    value = resolve(parsed[i])
+                except ValueError as e:
+                    record_error(row_number, str(e))
+                    continue
+                deltas[value["account_id"]] += balance_delta(value["transaction_type"], value["amount"])
+                rollup = rollup_deltas[rollup_key(
+                    user_id, value["account_id"], value["category_id"], value["transaction_type"], value["transaction_date"]
+                )]
+                rollup[0] += value["amount"]
+                rollup[1] += 1
+                values.append(value)
+            await insert_transactions_batch(db, values)
+            imported += len(values)
+
+        batch = []
+        async for row_number, raw in rows:
+            batch.append((row_number, raw))
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        await commit_bulk_transactions(db, deltas, rollup_deltas)
+
+        logger.info("Imported %s transactions for user_id=%s, failed=%s", imported, user_id, failed)
+        return {"imported": imported, "failed": failed, "errors": errors}
@@ -0,0 +1,129 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logger import setup_logger
+from app.crud.recurring_transaction import claim_due_schedules, deactivate_schedule, due_occurrences
+from app.crud.report import report_timezone, rollup_key, new_rollup_deltas
+from app.crud.transaction import balance_delta, insert_transactions_batch, commit_bulk_transactions
+
+# Setup logger
+logger = setup_logger(__name__)
+
+def _is_row_error(error: DBAPIError) -> bool:
+    # SQLSTATE 22 (tràn số, giá trị sai) / 23 (FK, CHECK): lỗi của chính dữ liệu, chạy lại y hệt vẫn lỗi.
+    # asyncpg chỉ map nhóm 23 thành IntegrityError nên phân loại theo SQLSTATE thay vì theo lớp exception
+    return (getattr(error.orig, "sqlstate", None) or "")[:2] in ("22", "23")
+
+class RecurringService:
+    @staticmethod
+    def today() -> date:
+        return datetime.now(report_timezone()).date()
+
+    @staticmethod
+    async def _materialize(db, schedules: list, today: date) -> int:
+        """Insert every missed occurrence of the claimed schedules and commit. Returns the transactions created."""
+        tz = report_timezone()
+        rows = []
+        deltas = defaultdict(Decimal)
+        rollup_deltas = new_rollup_deltas()
+        for schedule in schedules:
+            occurrences, next_due = due_occurrences(schedule, today, settings.RECURRING_MAX_CATCHUP)
+            for occurrence in occurrences:
+                # Giao dịch sinh ra vào 00:00 của ngày đến hạn theo múi giờ báo cáo
+                transaction_date = datetime.combine(occurrence, time.min, tzinfo=tz)
+                rows.append({
+                    "user_id": schedule.user_id,
+                    "account_id": schedule.account_id,
+                    "category_id": schedule.category_id,
+                    "amount": schedule.amount,
+                    "transaction_type": schedule.transaction_type,
+                    "transaction_date": transaction_date,
+                    "description": schedule.description,
+                })
+                deltas[schedule.account_id] += balance_delta(schedule.transaction_type, schedule.amount)
+                rollup = rollup_deltas[rollup_key(
+                    schedule.user_id, schedule.account_id, schedule.category_id, schedule.transaction_type, transaction_date
+                )]
+                rollup[0] += schedule.amount
+                rollup[1] += 1
+            if occurrences:
+                schedule.last_created_date = occurrences[-1]
+            schedule.next_due_date = next_due
+            if schedule.end_date is not None and next_due > schedule.end_date:
+                schedule.is_active = False
+
+        # Một executemany + một lần cập nhật số dư/rollup cho cả batch, commit cùng với next_due_date mới
+        await insert_transactions_batch(db, rows)
+        await commit_bulk_transactions(db, deltas, rollup_deltas)
+        return len(rows)
+
+    @staticmethod
+    async def _process_one_by_one(db, today: date, schedule_ids: list[int]) -> int:
+        # Mỗi định nghĩa một transaction riêng; định nghĩa vẫn lỗi bị tắt để không chặn các định nghĩa xếp sau nó
+        created = 0
+        for schedule_id in schedule_ids:
+            schedules = await claim_due_schedules(db, today, 1, schedule_ids=[schedule_id])
+            if not schedules:
+                await db.rollback()
+                continue
+            try:
+                created += await RecurringService._materialize(db, schedules, today)
+            except DBAPIError as e:
+                await db.rollback()
+                if not _is_row_error(e):
+                    raise
+                await deactivate_schedule(db, schedule_id)
+                logger.error("Deactivated recurring_transaction_id=%s, it cannot be materialized: %s", schedule_id, e)
+        return created
+
+    @staticmethod
+    async def process_batch(db, today: date, batch_size: int) -> tuple[int, int]:
+        """Claim one batch of due schedules and materialize every missed occurrence. Returns (schedules, transactions)."""
+        schedules = await claim_due_schedules(db, today, batch_size)
+        if not schedules:
+            await db.rollback()
+            return 0, 0
+        schedule_ids = [schedule.recurring_transaction_id for schedule in schedules]
+        try:
+            created = await RecurringService._materialize(db, schedules, today)
+        except DBAPIError as e:
+            await db.rollback()
+            if not _is_row_error(e):
+                raise
+            # Lỗi dữ liệu của một định nghĩa làm rollback cả batch, và batch được nhận lại y hệt ở lượt sau -
+            # thử lại từng định nghĩa thay vì chặn mọi định nghĩa xếp sau nó
+            logger.warning("Recurring batch of %s schedules failed, retrying one by one: %s", len(schedule_ids), e)
+            created = await RecurringService._process_one_by_one(db, today, schedule_ids)
+        logger.info("Materialized %s transactions from %s recurring schedules", created, len(schedule_ids))
+        return len(schedule_ids), created
+
+    @staticmethod
+    async def run_once(today: date | None = None, batch_size: int | None = None) -> int:
+        """Process batches until nothing is due. Returns the number of transactions created."""
+        today = today or RecurringService.today()
+        batch_size = batch_size or settings.RECURRING_BATCH_SIZE
+        created = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                claimed, inserted = await RecurringService.process_batch(db, today, batch_size)
+            created += inserted
+            if claimed < batch_size:
+                return created
+
+    @staticmethod
+    async def run_forever(interval: int | None = None, batch_size: int | None = None):
+        interval = interval or settings.RECURRING_INTERVAL_SECONDS
+        logger.info("Recurring transaction scheduler started, interval=%ss", interval)
+        while True:
+            try:
+                await RecurringService.run_once(batch_size=batch_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Lỗi một lượt không làm dừng scheduler; các batch chưa commit sẽ được nhận lại ở lượt sau
+                logger.error("Recurring transaction run failed: %s", e)
+            await asyncio.sleep(interval)
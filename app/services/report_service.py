@@ -0,0 +1,152 @@
+import calendar
+from datetime import date, datetime, timedelta
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.category_cache import category_cache
+from app.core.fx import UnknownCurrency, fx_cache, to_epoch_days
+from app.crud.account import get_account_by_id, get_accounts_by_user
+from app.crud.report import report_timezone, get_summary, get_spending_by_category, get_budget_status, get_daily_account_flows
+from app.models.user import User
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+NET_WORTH_MAX_DAYS = 3660
+
+class ReportService:
+    @staticmethod
+    def _period(start_date: date | datetime, end_date: date | datetime) -> tuple[datetime, datetime]:
+        # Chuẩn hóa về [start, end) có múi giờ; ngày thuần được hiểu là trọn ngày theo REPORT_TIMEZONE
+        tz = report_timezone()
+        if isinstance(start_date, datetime):
+            start = start_date if start_date.tzinfo else start_date.replace(tzinfo=tz)
+        else:
+            start = datetime.combine(start_date, datetime.min.time(), tz)
+        if isinstance(end_date, datetime):
+            end = (end_date if end_date.tzinfo else end_date.replace(tzinfo=tz)) + timedelta(microseconds=1)
+        else:
+            end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tz)
+        if start >= end:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        return start, end
+
+    @staticmethod
+    async def _check_account(db: AsyncSession, account_id: int | None, user_id: int):
+        if account_id is not None and not await get_account_by_id(db, account_id, user_id):
+            logger.error("Account_id=%s not found or user_id=%s lacks permission", account_id, user_id)
+            raise HTTPException(status_code=404, detail="Account not found or you don't have permission")
+
+    @staticmethod
+    async def summary(db: AsyncSession, user_id: int, start_date: date | datetime, end_date: date | datetime, account_id: int | None = None):
+        logger.info(
+            "Building summary report for user_id=%s, start=%s, end=%s, account_id=%s", user_id, start_date, end_date, account_id
+        )
+        start, end = ReportService._period(start_date, end_date)
+        await ReportService._check_account(db, account_id, user_id)
+        return await get_summary(db, user_id, start, end, account_id)
+
+    @staticmethod
+    async def spending_by_category(
+        db: AsyncSession,
+        user_id: int,
+        start_date: date | datetime,
+        end_date: date | datetime,
+        account_id: int | None = None,
+        include_subcategories: bool = False,
+    ):
+        logger.info("Building spending-by-category report for user_id=%s, start=%s, end=%s", user_id, start_date, end_date)
+        start, end = ReportService._period(start_date, end_date)
+        await ReportService._check_account(db, account_id, user_id)
+        tree = await category_cache.get(db, user_id)
+        names = {category_id: node.category_name for category_id, node in tree.nodes.items()}
+        # include_subcategories: cộng chi tiêu của danh mục con vào danh mục gốc (top-level)
+        group_into = tree.roots if include_subcategories else None
+        return await get_spending_by_category(db, user_id, start, end, account_id, group_into=group_into, names=names)
+
+    @staticmethod
+    async def budget_status(
+        db: AsyncSession,
+        user_id: int,
+        month: int | None = None,
+        year: int | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ):
+        if start_date is None or end_date is None:
+            today = datetime.now(report_timezone()).date()
+            year = year or today.year
+            month = month or today.month
+            start_date = date(year, month, 1)
+            end_date = date(year, month, calendar.monthrange(year, month)[1])
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        logger.info("Building budget status for user_id=%s, start=%s, end=%s", user_id, start_date, end_date)
+        tree = await category_cache.get(db, user_id)
+        return await get_budget_status(db, user_id, start_date, end_date, tree.descendants)
+
+    @staticmethod
+    async def net_worth(db: AsyncSession, user: User, start_date: date | None = None, end_date: date | None = None):
+        today = datetime.now(report_timezone()).date()
+        end_date = end_date or today
+        start_date = start_date or end_date - timedelta(days=30)
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must be before end_date")
+        n_days = (end_date - start_date).days + 1
+        if n_days > NET_WORTH_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"Net worth series is limited to {NET_WORTH_MAX_DAYS} days")
+        currency = user.default_currency
+        logger.info(
+            "Building net worth for user_id=%s, start=%s, end=%s, currency=%s", user.user_id, start_date, end_date, currency
+        )
+
+        accounts = await get_accounts_by_user(db, user.user_id, is_active=True)
+        fx = await fx_cache.get(db)
+        account_index = {account.account_id: i for i, account in enumerate(accounts)}
+        currencies = np.array([account.currency for account in accounts], dtype="U3")
+        balances = np.array([account.current_balance for account in accounts], dtype=np.float64)
+
+        # Ma trận ngày x account: flow trong kỳ nằm ở dòng của ngày đó, flow sau end_date dồn vào dòng cuối
+        start_epoch = int(to_epoch_days(start_date))
+        flows = np.zeros((n_days + 1, len(accounts)))
+        rows = [row for row in await get_daily_account_flows(db, user.user_id, start_date) if row[0] in account_index]
+        if rows:
+            account_ids, flow_days, amounts = zip(*rows)
+            day_rows = np.minimum(to_epoch_days(flow_days) - start_epoch, n_days)
+            np.add.at(flows, (day_rows, [account_index[a] for a in account_ids]), np.array(amounts, dtype=np.float64))
+        # Số dư cuối ngày i = số dư hiện tại - tổng flow của các ngày sau i
+        later = np.cumsum(flows[::-1], axis=0)[::-1]
+        history = balances - later[1:]
+
+        series_days = start_epoch + np.arange(n_days)
+        try:
+            # Quy đổi theo tỷ giá của từng ngày: một lần gather trên ma trận tỷ giá cho cả kỳ
+            factors = fx.factors(series_days[:, None], currencies[None, :], currency)
+            current_factors = fx.factors(to_epoch_days(today), currencies, currency)
+        except UnknownCurrency as e:
+            logger.error("Net worth for user_id=%s failed: %s", user.user_id, e)
+            raise HTTPException(status_code=400, detail=str(e))
+        net_worth = (history * factors).sum(axis=1)
+        net_flow = (flows[:n_days] * factors).sum(axis=1)
+        converted = balances * current_factors
+
+        return {
+            "currency": currency,
+            "as_of": today,
+            "total": round(float(converted.sum()), 2),
+            "accounts": [
+                {
+                    "account_id": account.account_id,
+                    "account_name": account.account_name,
+                    "currency": account.currency,
+                    "balance": account.current_balance,
+                    "converted_balance": round(float(converted[i]), 2),
+                }
+                for i, account in enumerate(accounts)
+            ],
+            "series": [
+                {"day": start_date + timedelta(days=i), "net_worth": round(float(net_worth[i]), 2), "net_flow": round(float(net_flow[i]), 2)}
+                for i in range(n_days)
+            ],
+        }
@@ -0,0 +1,147 @@
+from datetime import datetime
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.account import get_account_by_id
+from app.core.category_cache import category_cache
+from app.crud.transaction import (
+    create_transaction, get_transaction_by_id, get_transactions_by_user, search_transactions,
+    stream_transaction_rows, update_transaction, delete_transaction,
+)
+from app.models.category import CategoryType
+from app.core.config import settings
+from app.core.logger import setup_logger
+
+# Setup logger
+logger = setup_logger(__name__)
+
+ALERT_THRESHOLDS = sorted(Decimal(t.strip()) for t in settings.BUDGET_ALERT_THRESHOLDS.split(",") if t.strip())
+
+def budget_alerts(budget_changes: list[dict]) -> list[dict]:
+    # Cảnh báo khi giao dịch đẩy chi tiêu qua một ngưỡng, hoặc budget đang vượt mức
+    alerts = []
+    for change in budget_changes:
+        amount, before, after = change["budget_amount"], change["spent_before"], change["spent_amount"]
+        crossed = [t for t in ALERT_THRESHOLDS if before < amount * t <= after]
+        if crossed or after > amount:
+            alerts.append({
+                "budget_id": change["budget_id"], "category_id": change["category_id"], "budget_amount": amount,
+                "spent_amount": after, "threshold": crossed[-1] if crossed else None, "exceeded": after > amount,
+            })
+    return alerts
+
+class TransactionService:
+    @staticmethod
+    async def _check_account(db: AsyncSession, account_id: int, user_id: int):
+        account = await get_account_by_id(db, account_id, user_id)
+        if not account or not account.is_active:
+            logger.error("Account_id=%s not found, inactive or user_id=%s lacks permission", account_id, user_id)
+            raise HTTPException(status_code=400, detail="Account not found or you don't have permission")
+        return account
+
+    @staticmethod
+    async def _resolve_type(db: AsyncSession, category_id: int, user_id: int) -> CategoryType:
+        # transaction_type luôn được suy ra từ category, không nhận từ client
+        # Tra trong cây danh mục đã cache (O(1)), không query mỗi lần ghi giao dịch
+        tree = await category_cache.get(db, user_id)
+        transaction_type = tree.type_of(category_id)
+        if transaction_type is None:
+            # Danh mục có thể vừa được tạo ở worker khác (cây cache chưa hết TTL) - đọc lại từ DB trước khi từ chối
+            transaction_type = (await category_cache.get(db, user_id, fresh=True)).type_of(category_id)
+        if transaction_type is None:
+            logger.error("Category_id=%s not found or user_id=%s lacks permission", category_id, user_id)
+            raise HTTPException(status_code=400, detail="Category not found or you don't have permission")
+        return transaction_type
+
+    @staticmethod
+    async def create_transaction(db: AsyncSession, user_id: int, transaction_data: dict):
+        logger.info("Creating transaction for user_id=%s", user_id)
+        await TransactionService._check_account(db, transaction_data["account_id"], user_id)
+        transaction_type = await TransactionService._resolve_type(db, transaction_data["category_id"], user_id)
+        transaction, budget_changes = await create_transaction(db, user_id, transaction_data, transaction_type)
+        logger.info("Transaction created: transaction_id=%s", transaction.transaction_id)
+        alerts = budget_alerts(budget_changes)
+        if alerts:
+            logger.info(
+                "Budget alerts for user_id=%s: %s", user_id, [(a["budget_id"], a["threshold"], a["exceeded"]) for a in alerts]
+            )
+        return transaction, alerts
+
+    @staticmethod
+    async def get_transactions(
+        db: AsyncSession,
+        user_id: int,
+        *,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        account_id: int | None = None,
+        category_id: int | None = None,
+        transaction_type: CategoryType | None = None,
+        tag_id: int | None = None,
+        sort_by: str = "transaction_date",
+        order: str = "desc",
+        cursor: str | None = None,
+        limit: int = 20,
+        columns: tuple | None = None,
+    ):
+        logger.info("Fetching transactions for user_id=%s, sort_by=%s, order=%s, limit=%s", user_id, sort_by, order, limit)
+        transactions, next_cursor = await get_transactions_by_user(
+            db, user_id,
+            start_date=start_date, end_date=end_date, account_id=account_id, category_id=category_id,
+            transaction_type=transaction_type, tag_id=tag_id, sort_by=sort_by, order=order, cursor=cursor, limit=limit,
+            columns=columns,
+        )
+        logger.info("Fetched %s transactions for user_id=%s", len(transactions), user_id)
+        return transactions, next_cursor
+
+    @staticmethod
+    async def search_transactions(db: AsyncSession, user_id: int, q: str, *, cursor: str | None = None, limit: int = 20, **filters):
+        logger.info("Searching transactions for user_id=%s, limit=%s", user_id, limit)
+        transactions, next_cursor = await search_transactions(db, user_id, q, cursor=cursor, limit=limit, **filters)
+        logger.info("Search returned %s transactions for user_id=%s", len(transactions), user_id)
+        return transactions, next_cursor
+
+    @staticmethod
+    async def stream_transactions(db: AsyncSession, user_id: int, *, sort_by: str = "transaction_date", order: str = "desc", **filters):
+        logger.info("Streaming transactions for user_id=%s, sort_by=%s, order=%s", user_id, sort_by, order)
+        async for rows in stream_transaction_rows(
+            db, user_id, sort_by=sort_by, order=order, batch_size=settings.LIST_STREAM_BATCH_SIZE, **filters
+        ):
+            yield rows
+
+    @staticmethod
+    async def get_transaction(db: AsyncSession, transaction_id: int, user_id: int):
+        logger.info("Fetching transaction_id=%s for user_id=%s", transaction_id, user_id)
+        transaction = await get_transaction_by_id(db, transaction_id, user_id)
+        if not transaction:
+            logger.error("Transaction_id=%s not found or user_id=%s lacks permission", transaction_id, user_id)
+            raise HTTPException(status_code=404, detail="Transaction not found or you don't have permission")
+        return transaction
+
+    @staticmethod
+    async def update_transaction(db: AsyncSession, transaction_id: int, user_id: int, update_data: dict):
+        logger.info("Updating transaction_id=%s for user_id=%s", transaction_id, user_id)
+        transaction = await get_transaction_by_id(db, transaction_id, user_id, for_update=True)
+        if not transaction:
+            logger.error("Transaction_id=%s not found or user_id=%s lacks permission", transaction_id, user_id)
+            raise HTTPException(status_code=404, detail="Transaction not found or you don't have permission")
+        if update_data.get("account_id") is not None and update_data["account_id"] != transaction.account_id:
+            await TransactionService._check_account(db, update_data["account_id"], user_id)
+        category_id = update_data.get("category_id") or transaction.category_id
+        transaction_type = transaction.transaction_type
+        if category_id != transaction.category_id:
+            transaction_type = await TransactionService._resolve_type(db, category_id, user_id)
+        transaction = await update_transaction(db, transaction, update_data, transaction_type)
+        logger.info("Transaction updated: transaction_id=%s", transaction.transaction_id)
+        return transaction
+
+    @staticmethod
+    async def delete_transaction(db: AsyncSession, transaction_id: int, user_id: int):
+        logger.info("Deleting transaction_id=%s for user_id=%s", transaction_id, user_id)
+        transaction = await get_transaction_by_id(db, transaction_id, user_id, for_update=True)
+        if not transaction:
+            logger.error("Transaction_id=%s not found or user_id=%s lacks permission", transaction_id, user_id)
+            raise HTTPException(status_code=404, detail="Transaction not found or you don't have permission")
+        transaction = await delete_transaction(db, transaction)
+        logger.info("Transaction_id=%s deleted", transaction_id)
+        return transaction
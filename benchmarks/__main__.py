@@ -0,0 +1,116 @@
+"""Benchmark suite: python -m benchmarks --help"""
+import argparse
+import asyncio
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed synthetic data and load-test the API in-process")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--accounts-per-user", type=int, default=5)
+    parser.add_argument("--transactions-per-account", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", default="login,auth_user,accounts_list,accounts_get,accounts_create,transactions_list")
+    parser.add_argument("--name", default="default", help="baseline file name in benchmarks/baselines/")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression vs baseline (0.2 = 20%%)")
+    parser.add_argument("--output", type=Path, help="also write this run's results to a JSON file")
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override an app setting for this run, e.g. --set LOG_LEVEL=DEBUG")
+    return parser.parse_args()
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args) -> int:
+    # Import app sau khi áp dụng --set để Settings đọc được giá trị override
+    import httpx
+    from app.main import app
+    from benchmarks import baseline
+    from benchmarks.load import run_load
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import PASSWORD, seed, cleanup
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios: {sorted(unknown)}; available: {sorted(SCENARIOS)}")
+        return 2
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users x {args.accounts_per_user} accounts x {args.transactions_per_account} transactions ...")
+    start = time.perf_counter()
+    users = await seed(run_id, args.users, args.accounts_per_user, args.transactions_per_account)
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            for user in users:
+                response = await client.post("/auth/login", json={"email": user["email"], "password": PASSWORD})
+                response.raise_for_status()
+                user["headers"] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            context = {"users": users, "run_id": run_id}
+            for name in names:
+                request = SCENARIOS[name](client, context)
+                results[name] = await run_load(request, requests=args.requests, concurrency=args.concurrency, warmup=args.warmup)
+                r = results[name]
+                print(f"{name:20s} {r['throughput_rps']:9.1f} rps  p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  "
+                      f"p99 {r['p99_ms']:8.2f}ms  {r['bytes_per_request']:8.1f} B/req  errors {r['errors']}")
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+
+    current = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "users": args.users,
+            "accounts_per_user": args.accounts_per_user,
+            "transactions_per_account": args.transactions_per_account,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "settings": args.set,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        baseline.save(args.output, current)
+
+    baseline_path = BASELINE_DIR / f"{args.name}.json"
+    if args.save_baseline:
+        baseline.save(baseline_path, current)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+    previous = baseline.load(baseline_path)
+    if previous is None:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+    regressions = baseline.compare(current, previous, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+def main():
+    args = parse_args()
+    # Mọi request load test đến từ cùng một IP - tắt rate limit trừ khi bật lại bằng --set
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    for item in args.set:
+        key, _, value = item.partition("=")
+        os.environ[key] = value
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
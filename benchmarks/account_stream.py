@@ -0,0 +1,153 @@
+"""Account stream benchmark: python -m benchmarks.account_stream --connections 5000 --max-kib-per-connection 64
+
+Mở N kết nối SSE GET /accounts/stream (idle, chia đều cho --users user) gọi thẳng ASGI app, đo RSS và bộ nhớ Python
+(tracemalloc) tăng thêm trên mỗi kết nối - gồm cả phần stub client trong cùng process nên là cận trên.
+Sau đó ghi một giao dịch qua API và đo thời gian đến khi mọi kết nối của user đó nhận event "account" (NOTIFY -> fan-out).
+Exit code 1 nếu bộ nhớ mỗi kết nối vượt ngưỡng, fan-out thiếu kết nối hoặc còn subscriber sau khi đóng.
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Memory per idle SSE subscriber and NOTIFY fan-out latency")
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=100, help="connections opened at a time")
+    parser.add_argument("--max-kib-per-connection", type=float, default=64.0)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+class SSEConnection:
+    """Minimal in-process client: drives the ASGI app directly and only remembers what the benchmark checks."""
+
+    __slots__ = ("app", "scope", "task", "opened", "changed", "closed", "status", "request_sent")
+
+    def __init__(self, app, token: str):
+        self.app = app
+        self.scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/accounts/stream", "raw_path": b"/accounts/stream", "root_path": "",
+            "query_string": b"", "server": ("bench", 80), "client": ("127.0.0.1", 0),
+            "headers": [(b"host", b"bench"), (b"accept", b"text/event-stream"), (b"authorization", f"Bearer {token}".encode())],
+        }
+        self.opened = asyncio.Event()
+        self.changed = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.status = 0
+        self.request_sent = False
+        self.task = None
+
+    async def receive(self):
+        if not self.request_sent:
+            self.request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Client idle cho tới khi benchmark đóng kết nối
+        await self.closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            if self.status != 200:
+                self.opened.set()
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            if body.startswith(b"event: snapshot"):
+                self.opened.set()
+            elif body.startswith(b"event: account"):
+                self.changed.set()
+            if not message.get("more_body", False):
+                self.opened.set()
+
+    async def open(self):
+        self.task = asyncio.create_task(self.app(self.scope, self.receive, self.send))
+        await self.opened.wait()
+
+    async def close(self):
+        self.closed.set()
+        await self.task
+
+async def run(args) -> int:
+    import httpx
+    from app.core.account_feed import account_feed
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users ...")
+    users = await seed(run_id, args.users, 1, 0)
+    for user in users:
+        user["token"] = create_access_token({"sub": str(user["user_id"])})
+    failed = False
+    connections = []
+    try:
+        # Làm nóng: user cache, token cache, listener LISTEN và các đường code
+        warmup = [SSEConnection(app, user["token"]) for user in users]
+        await asyncio.gather(*(connection.open() for connection in warmup))
+        await asyncio.gather(*(connection.close() for connection in warmup))
+        del warmup
+        gc.collect()
+        rss_before = current_rss()
+        tracemalloc.start()
+        start = time.perf_counter()
+        for offset in range(0, args.connections, args.concurrency):
+            batch = [
+                SSEConnection(app, users[i % len(users)]["token"])
+                for i in range(offset, min(offset + args.concurrency, args.connections))
+            ]
+            await asyncio.gather(*(connection.open() for connection in batch))
+            connections.extend(batch)
+        open_s = time.perf_counter() - start
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_growth = current_rss() - rss_before
+        rejected = sum(1 for connection in connections if connection.status != 200)
+        per_connection_kib = rss_growth / len(connections) / 1024
+        print(f"Opened {len(connections)} streams in {open_s:.1f}s ({rejected} rejected), "
+              f"subscribers {account_feed.stats()['subscribers']}")
+        print(f"RSS growth      {rss_growth / 2**20:8.1f} MiB  {per_connection_kib:7.2f} KiB/connection")
+        print(f"Python heap     {traced / 2**20:8.1f} MiB  {traced / len(connections) / 1024:7.2f} KiB/connection")
+        failed |= rejected > 0 or per_connection_kib > args.max_kib_per_connection
+
+        # Một giao dịch của user đầu tiên -> NOTIFY khi commit -> event tới mọi kết nối của user đó
+        user = users[0]
+        targets = connections[::len(users)]
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            start = time.perf_counter()
+            response = await client.post("/transactions", headers={"Authorization": f"Bearer {user['token']}"}, json={
+                "account_id": user["account_ids"][0], "category_id": user["category_ids"][0], "amount": "1000",
+            })
+            try:
+                await asyncio.wait_for(asyncio.gather(*(connection.changed.wait() for connection in targets)), timeout=10)
+            except asyncio.TimeoutError:
+                pass
+            fanout_ms = (time.perf_counter() - start) * 1000
+        delivered = sum(1 for connection in targets if connection.changed.is_set())
+        print(f"Fan-out         status {response.status_code}, {delivered}/{len(targets)} streams in {fanout_ms:.1f}ms")
+        failed |= response.status_code != 201 or delivered != len(targets)
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections if connection.task is not None))
+        remaining = account_feed.stats()["subscribers"]
+        print(f"Closed all streams, subscribers left {remaining}")
+        failed |= remaining != 0
+        await account_feed.close()
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Email outbox benchmark: python -m benchmarks.email --signups 200 --smtp-delays-ms 0,200,1000
+
+Chạy SMTP server giả (aiosmtpd) ở local, mỗi email bị giữ lại --smtp-delays-ms trước khi trả 250, và các worker gửi
+email của app (EmailService.start_workers) đọc outbox gửi tới server đó. Với từng độ trễ SMTP: bắn --signups request
+POST /auth/signup, in p50/p95 của signup, số email còn chờ trong outbox khi đợt signup kết thúc và thời gian worker
+gửi hết. Exit code 1 nếu có lỗi, email không được gửi hết, hoặc p95 signup ở độ trễ lớn nhất tăng quá --max-slowdown
+lần so với độ trễ đầu tiên.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Signup latency against a slow SMTP server while the email outbox drains")
+    parser.add_argument("--signups", type=int, default=200, help="signups per SMTP delay")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--smtp-delays-ms", default="0,200,1000", help="comma-separated SMTP DATA delays to sweep")
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--drain-timeout", type=float, default=300.0, help="seconds to wait for the outbox to drain")
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    return parser.parse_args()
+
+class SlowHandler:
+    """aiosmtpd handler: accept every message after `delay` seconds."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+async def outbox_counts(prefix: str) -> tuple[int, int]:
+    """(pending or sending, sent) outbox rows of the benchmark's users."""
+    from sqlalchemy import func, select
+    from app.core.database import AsyncSessionLocal
+    from app.models import User
+    from app.models.email_outbox import EmailOutbox
+
+    async with AsyncSessionLocal() as db:
+        rows = dict((await db.execute(
+            select(EmailOutbox.status, func.count())
+            .join(User, User.user_id == EmailOutbox.user_id)
+            .where(User.email.like(f"{prefix}\\_%", escape="\\"))
+            .group_by(EmailOutbox.status)
+        )).all())
+    return rows.get("pending", 0) + rows.get("sending", 0), rows.get("sent", 0)
+
+async def run(args) -> int:
+    import httpx
+    from aiosmtpd.controller import Controller
+    from app.core.config import settings
+    from app.main import app
+    from app.services.email_service import EmailService
+    from benchmarks.load import run_load
+    from benchmarks.seed import PASSWORD, cleanup
+
+    delays = [float(d) / 1000 for d in args.smtp_delays_ms.split(",") if d.strip()]
+    run_id = f"bench{int(time.time())}"
+    handler = SlowHandler()
+    # Controller chạy SMTP server trên thread riêng với event loop riêng
+    controller = Controller(handler, hostname=settings.MAIL_SERVER, port=settings.MAIL_PORT)
+    controller.start()
+    workers = EmailService.start_workers()
+    print(f"SMTP stand-in on {settings.MAIL_SERVER}:{settings.MAIL_PORT}; {settings.EMAIL_WORKERS} email workers, "
+          f"{args.signups} signups per delay at concurrency {args.concurrency}")
+
+    failed = False
+    p95 = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            for delay in delays:
+                handler.delay = delay
+                prefix = f"{run_id}_{int(delay * 1000)}ms"
+
+                async def request(i):
+                    # Warmup (i < 0) cũng tạo user thật nên dùng tên riêng
+                    name = f"{prefix}_{'w' if i < 0 else ''}{abs(i)}"
+                    response = await client.post("/auth/signup", json={
+                        "email": f"{name}@bench.example.com", "username": name, "password": PASSWORD,
+                    })
+                    return response.status_code
+
+                r = await run_load(request, requests=args.signups, concurrency=args.concurrency, warmup=args.concurrency)
+                backlog, _ = await outbox_counts(prefix)
+                expected = args.signups + args.concurrency
+                start = time.perf_counter()
+                while True:
+                    pending, sent = await outbox_counts(prefix)
+                    if sent >= expected or time.perf_counter() - start > args.drain_timeout:
+                        break
+                    await asyncio.sleep(0.2)
+                drained = time.perf_counter() - start
+                print(f"SMTP delay {delay * 1000:6.0f}ms  signup p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  "
+                      f"errors {r['errors']}  outbox backlog {backlog:4d} after signups, drained in {drained:6.1f}s "
+                      f"(sent {sent}/{expected})")
+                p95.append(r["p95_ms"])
+                failed |= r["errors"] > 0 or sent < expected
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        controller.stop()
+        await cleanup(run_id)
+    if len(p95) > 1 and p95[0]:
+        print(f"signup p95 at {delays[-1] * 1000:.0f}ms SMTP delay: {p95[-1] / p95[0]:.2f}x of {delays[0] * 1000:.0f}ms")
+        failed |= p95[-1] > p95[0] * args.max_slowdown
+    return 1 if failed else 0
+
+def main():
+    args = parse_args()
+    # Gửi tới SMTP giả ở local, không TLS/đăng nhập; signup đến từ cùng một IP nên tắt rate limit
+    os.environ.update({
+        "MAIL_SERVER": "127.0.0.1", "MAIL_PORT": str(args.smtp_port), "MAIL_STARTTLS": "false",
+        "MAIL_SSL_TLS": "false", "MAIL_USERNAME": "", "MAIL_PASSWORD": "",
+    })
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
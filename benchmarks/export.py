@@ -0,0 +1,90 @@
+"""Export memory check: python -m benchmarks.export --rows 1000000 --max-rss-growth-mib 150
+
+Seed một user với --rows giao dịch, stream GET /transactions/export và lấy mẫu RSS trong lúc export.
+Exit code 1 nếu RSS tăng quá ngưỡng - bộ nhớ phải không đổi theo số dòng.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Assert bounded peak RSS while streaming a large export")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", default="csv,ndjson,parquet")
+    parser.add_argument("--max-rss-growth-mib", type=float, default=150.0)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+async def stream_export(app, token: str, file_format: str) -> tuple[int, int, int]:
+    """Call the ASGI app directly and drop each body chunk (httpx's ASGITransport would buffer the whole body)."""
+    status = 0
+    received = 0
+    peak = current_rss()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/transactions/export", "raw_path": b"/transactions/export", "root_path": "",
+        "query_string": f"format={file_format}".encode(), "server": ("bench", 80), "client": ("127.0.0.1", 0),
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+    }
+
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # StreamingResponse chờ disconnect song song với việc gửi body - chỉ trả về khi response xong
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, received, peak
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            peak = max(peak, current_rss())
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, received, peak
+
+async def run(args) -> int:
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.rows} transactions ...")
+    users = await seed(run_id, 1, 1, args.rows)
+    token = create_access_token({"sub": str(users[0]["user_id"])})
+    failed = False
+    try:
+        for file_format in [f.strip() for f in args.formats.split(",") if f.strip()]:
+            baseline = current_rss()
+            start = time.perf_counter()
+            status, received, peak = await stream_export(app, token, file_format)
+            growth = (peak - baseline) / 2**20
+            ok = status == 200 and growth <= args.max_rss_growth_mib
+            failed |= not ok
+            print(f"{file_format:8s} status {status}  {received / 2**20:9.1f} MiB in {time.perf_counter() - start:7.1f}s  "
+                  f"RSS growth {growth:7.1f} MiB  {'OK' if ok else 'FAIL'}")
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
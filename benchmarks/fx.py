@@ -0,0 +1,63 @@
+"""FX conversion benchmark: python -m benchmarks.fx --transactions 1000000 --currencies 20
+
+Quy đổi N giao dịch (ngày, tiền tệ ngẫu nhiên) về một đồng tiền: gather NumPy trên ma trận tỷ giá
+so với vòng lặp Python tra dict theo từng dòng. Không cần database.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare vectorized vs per-row FX conversion")
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--currencies", type=int, default=20)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--to", default="VND")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    import numpy as np
+    from app.core.fx import FxRates, to_epoch_days
+
+    rng = random.Random(42)
+    codes = ["VND", "USD"] + [f"C{i:02d}" for i in range(args.currencies - 2)]
+    first_day = date.today() - timedelta(days=365 * args.years)
+    # Tỷ giá ngày làm việc (bỏ cuối tuần) để có cả nhánh forward-fill
+    records = [
+        (first_day + timedelta(days=d), code, rng.uniform(0.00004, 2.0))
+        for d in range(365 * args.years) if (first_day + timedelta(days=d)).weekday() < 5
+        for code in codes if code != "USD"
+    ]
+    start = time.perf_counter()
+    fx = FxRates(records, "USD")
+    print(f"Built {len(fx)} days x {len(fx.currencies)} currencies from {len(records)} rates in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    np_rng = np.random.default_rng(42)
+    amounts = np_rng.uniform(1, 10_000, args.transactions)
+    epoch_days = to_epoch_days(first_day) + np_rng.integers(0, 365 * args.years, args.transactions)
+    currencies = np.array(codes, dtype="U3")[np_rng.integers(0, len(codes), args.transactions)]
+
+    start = time.perf_counter()
+    vectorized = fx.convert(amounts, epoch_days, currencies, args.to)
+    vectorized_s = time.perf_counter() - start
+
+    # Đường per-row: tra dict + index ma trận cho từng giao dịch
+    rows = list(zip(amounts.tolist(), epoch_days.tolist(), currencies.tolist()))
+    matrix, index, start_day, last = fx.matrix.tolist(), fx.currencies, fx.start_day, len(fx) - 1
+    to_index = index[args.to]
+    start = time.perf_counter()
+    looped = []
+    for amount, day, code in rows:
+        rates = matrix[min(max(day - start_day, 0), last)]
+        looped.append(amount * rates[index[code]] / rates[to_index])
+    loop_s = time.perf_counter() - start
+
+    assert np.allclose(vectorized, looped)
+    print(f"{args.transactions} transactions, {len(codes)} currencies -> {args.to}")
+    print(f"numpy gather   {vectorized_s * 1000:9.1f}ms")
+    print(f"python loop    {loop_s * 1000:9.1f}ms  ({loop_s / vectorized_s:.1f}x slower)")
+
+if __name__ == "__main__":
+    main()
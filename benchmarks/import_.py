@@ -0,0 +1,83 @@
+"""Import benchmark: python -m benchmarks.import_ --rows 100000 --max-rss-growth-mib 100
+
+Sinh file CSV giả theo từng chunk (không dựng cả file trong bộ nhớ), stream vào POST /transactions/import rồi in
+rows/sec và RSS tăng thêm lúc đỉnh so với trước khi import. Exit code 1 nếu có dòng lỗi hoặc RSS vượt ngưỡng.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rows/sec and peak RSS of a streamed CSV import")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rows-per-chunk", type=int, default=1000, help="CSV rows per request body chunk")
+    parser.add_argument("--max-rss-growth-mib", type=float, default=100.0)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def csv_chunks(rows: int, rows_per_chunk: int, category_names: list[str], peak: list[int]):
+    from benchmarks.account_stream import current_rss
+    from benchmarks.seed import DESCRIPTION_WORDS
+
+    rng = random.Random(rows)
+    today = date.today()
+    yield b"date,amount,category,description,location\n"
+    for start in range(0, rows, rows_per_chunk):
+        lines = [
+            f"{today - timedelta(days=rng.randint(0, 3650))},{rng.randint(1, 5000) * 1000},"
+            f"{rng.choice(category_names)},{' '.join(rng.sample(DESCRIPTION_WORDS, 3))},Ha Noi\n"
+            for _ in range(min(rows_per_chunk, rows - start))
+        ]
+        # Lấy mẫu RSS mỗi lần app đọc thêm một chunk - tức là trong suốt quá trình import
+        peak[0] = max(peak[0], current_rss())
+        yield "".join(lines).encode()
+
+async def run(args) -> int:
+    import httpx
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.account_stream import current_rss
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    print("Seeding 1 user ...")
+    user = (await seed(run_id, 1, 1, 0))[0]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user['user_id'])})}"}
+    account_id = user["account_ids"][0]
+
+    failed = False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            # Request nhỏ trước để import module/khởi tạo pool không bị tính vào RSS của import
+            await client.get("/accounts", headers=headers)
+            baseline = current_rss()
+            peak = [baseline]
+            start = time.perf_counter()
+            response = await client.post(
+                "/transactions/import", params={"format": "csv", "account_id": account_id}, headers=headers,
+                content=csv_chunks(args.rows, args.rows_per_chunk, ["Bench expense", "Bench income"], peak),
+            )
+            elapsed = time.perf_counter() - start
+            peak[0] = max(peak[0], current_rss())
+        if response.status_code != 200:
+            print(f"Import failed: {response.status_code} {response.text[:500]}")
+            return 1
+        result = response.json()
+        growth_mib = (peak[0] - baseline) / 2**20
+        print(f"imported {result['imported']} rows (failed {result['failed']}) in {elapsed:.2f}s  "
+              f"{result['imported'] / elapsed:10.0f} rows/s  peak RSS +{growth_mib:.1f} MiB "
+              f"(baseline {baseline / 2**20:.1f} MiB)")
+        failed = result["imported"] != args.rows or growth_mib > args.max_rss_growth_mib
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
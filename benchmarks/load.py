@@ -0,0 +1,56 @@
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_load(request: Callable[[int], Awaitable[int]], *, requests: int, concurrency: int, warmup: int = 0) -> dict:
+    """Run `requests` calls with `concurrency` workers; request(i) returns the HTTP status code
+    or (status_code, response_bytes)."""
+    for i in range(warmup):
+        await request(-1 - i)
+
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+    response_bytes = 0
+
+    async def worker():
+        nonlocal errors, response_bytes
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            start = time.perf_counter()
+            try:
+                status_code = await request(i)
+            except Exception:
+                status_code = 0
+            if isinstance(status_code, tuple):
+                status_code, size = status_code
+                response_bytes += size
+            latencies.append(time.perf_counter() - start)
+            if status_code >= 400 or status_code == 0:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "bytes_per_request": round(response_bytes / requests, 1) if requests else 0.0,
+    }
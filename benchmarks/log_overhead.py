@@ -0,0 +1,100 @@
+"""Logging overhead benchmark: python -m benchmarks.log_overhead --requests 2000
+
+Chạy cùng các kịch bản (mặc định accounts_list, transactions_list, transactions_create) với logger "app" ở INFO rồi
+DEBUG trên cùng process và dữ liệu, in thời gian trung bình mỗi request, p95, số log record mỗi request và chi phí tăng
+thêm (µs/request) khi bật DEBUG. Listener vẫn format và ghi từng record nhưng ra /dev/null để output của terminal không
+làm lệch kết quả. Exit code 1 nếu có lỗi hoặc DEBUG làm mỗi request chậm hơn quá --max-overhead-us.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-request overhead of DEBUG logging vs INFO")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transactions-per-account", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1, help="1 = time is the per-request cost")
+    parser.add_argument("--scenarios", default="accounts_list,transactions_list,transactions_create")
+    parser.add_argument("--max-overhead-us", type=float, default=2000.0)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+class RecordCounter(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.records = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        self.records += 1
+        return True
+
+async def run(args) -> int:
+    import httpx
+    from app.core import logger as app_logging
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.load import run_load
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import seed, cleanup
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        print(f"Unknown scenarios: {sorted(unknown)}; available: {sorted(SCENARIOS)}")
+        return 2
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users ...")
+    users = await seed(run_id, args.users, 2, args.transactions_per_account)
+    for user in users:
+        user["headers"] = {"Authorization": f"Bearer {create_access_token({'sub': str(user['user_id'])})}"}
+
+    app_logger = logging.getLogger(app_logging.APP_LOGGER)
+    level = app_logger.level
+    counter = RecordCounter()
+    devnull = open(os.devnull, "w")
+    streams = [handler.setStream(devnull) for handler in app_logging._listener.handlers]
+    for handler in app_logger.handlers:
+        handler.addFilter(counter)
+
+    failed = False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            context = {"users": users, "run_id": run_id}
+            for name in names:
+                per_request = {}
+                for level_name in ("INFO", "DEBUG"):
+                    app_logger.setLevel(level_name)
+                    request = SCENARIOS[name](client, context)
+                    await run_load(request, requests=args.concurrency * 10, concurrency=args.concurrency)
+                    counter.records = 0
+                    r = await run_load(request, requests=args.requests, concurrency=args.concurrency)
+                    per_request[level_name] = r["elapsed_s"] / args.requests * 1e6
+                    print(f"{name:20s} {level_name:5s} {per_request[level_name]:9.1f} µs/req  p95 {r['p95_ms']:7.2f}ms  "
+                          f"{counter.records / args.requests:5.1f} records/req  errors {r['errors']}")
+                    failed |= r["errors"] > 0
+                overhead = per_request["DEBUG"] - per_request["INFO"]
+                print(f"{name:20s} DEBUG overhead {overhead:+8.1f} µs/req ({overhead / per_request['INFO']:+.1%})")
+                failed |= overhead > args.max_overhead_us
+    finally:
+        app_logger.setLevel(level)
+        for handler in app_logger.handlers:
+            handler.removeFilter(counter)
+        for handler, stream in zip(app_logging._listener.handlers, streams):
+            handler.setStream(stream)
+        devnull.close()
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    # Mọi request đến từ cùng một IP - tắt rate limit
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
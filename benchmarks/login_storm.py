@@ -0,0 +1,108 @@
+"""Login storm benchmark: python -m benchmarks.login_storm --logins 400 --login-concurrency 200
+
+Bắn một đợt đăng nhập đồng thời lớn hơn PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT trong khi các request không
+liên quan (GET /auth/user) chạy đều, rồi in p99 của request không liên quan khi yên tĩnh và khi có đợt đăng nhập,
+p99 của login và tỉ lệ 503 (hàng đợi bcrypt đầy). --compare-inline chạy thêm chế độ bcrypt ngay trên event loop
+(như trước khi có worker pool) để so sánh. Exit code 1 nếu p99 request không liên quan (worker pool) tăng quá --max-slowdown lần.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Unrelated-request p99 and 503 rate during a concurrent login storm")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--login-concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000, help="unrelated GET /auth/user requests per phase")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--compare-inline", action="store_true", help="also run bcrypt inline on the event loop")
+    parser.add_argument("--max-slowdown", type=float, default=3.0)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def storm(client, users: list[dict], args, statuses: Counter, latencies: list[float]):
+    from benchmarks.seed import PASSWORD
+
+    semaphore = asyncio.Semaphore(args.login_concurrency)
+
+    async def login(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/auth/login", json={"email": users[i % len(users)]["email"], "password": PASSWORD})
+                statuses[response.status_code] += 1
+            except Exception:
+                statuses[0] += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(login(i) for i in range(args.logins)))
+
+async def run_phase(client, users, headers, args) -> tuple[dict, dict, Counter, list[float]]:
+    from benchmarks.load import run_load
+
+    async def request(i):
+        return (await client.get("/auth/user", headers=headers[i % len(headers)])).status_code
+
+    quiet = await run_load(request, requests=args.requests, concurrency=args.concurrency, warmup=args.concurrency)
+    statuses, latencies = Counter(), []
+    stormer = asyncio.create_task(storm(client, users, args, statuses, latencies))
+    under_storm = await run_load(request, requests=args.requests, concurrency=args.concurrency)
+    await stormer
+    return quiet, under_storm, statuses, latencies
+
+async def run(args) -> int:
+    import httpx
+    from app.core import security
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.load import percentile
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users (bcrypt rounds {settings.BCRYPT_ROUNDS}) ...")
+    users = await seed(run_id, args.users, 1, 0)
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': str(user['user_id'])})}"} for user in users]
+    print(f"bcrypt pool: {settings.PASSWORD_HASH_WORKERS} workers, queue limit {settings.PASSWORD_HASH_QUEUE_LIMIT}; "
+          f"{args.logins} logins at concurrency {args.login_concurrency}")
+
+    run_hash_job = security._run_hash_job
+
+    async def run_inline(func, *args):
+        # Đường cũ: bcrypt chạy thẳng trên event loop
+        return func(*args)
+
+    modes = [("pool", run_hash_job)] + ([("inline", run_inline)] if args.compare_inline else [])
+    failed = False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+            for mode, job in modes:
+                security._run_hash_job = job
+                quiet, under_storm, statuses, latencies = await run_phase(client, users, headers, args)
+                latencies.sort()
+                slowdown = under_storm["p99_ms"] / quiet["p99_ms"] if quiet["p99_ms"] else 0.0
+                print(f"bcrypt {mode}")
+                print(f"  /auth/user quiet  p50 {quiet['p50_ms']:8.2f}ms  p99 {quiet['p99_ms']:8.2f}ms  errors {quiet['errors']}")
+                print(f"  /auth/user storm  p50 {under_storm['p50_ms']:8.2f}ms  p99 {under_storm['p99_ms']:8.2f}ms  "
+                      f"errors {under_storm['errors']}  ({slowdown:.1f}x p99)")
+                print(f"  logins            p50 {percentile(latencies, 0.5) * 1000:8.2f}ms  p99 {percentile(latencies, 0.99) * 1000:8.2f}ms  "
+                      f"503 rate {statuses[503] / args.logins:6.1%}  statuses {dict(sorted(statuses.items()))}")
+                if mode == "pool":
+                    failed = slowdown > args.max_slowdown or under_storm["errors"] > 0
+    finally:
+        security._run_hash_job = run_hash_job
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    # Mọi login đến từ cùng một IP - tắt rate limit để đo riêng worker pool bcrypt
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Auth rate limit benchmark: python -m benchmarks.rate_limit --users 50 --attack-rps 300
+
+Đo latency đăng nhập của user hợp lệ (mỗi user một IP riêng) khi không có tấn công và khi có một đợt
+credential stuffing (vài IP, mật khẩu sai vào các email có thật). Chạy cả khi tắt và bật rate limit:
+không có rate limit, mỗi lần thử của attacker chạy bcrypt; có rate limit, attacker nhận 429 trước khi chạm DB.
+Exit code 1 nếu p95 của user hợp lệ khi có tấn công (rate limit bật) vượt --max-slowdown lần so với lúc bình thường.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Legitimate login latency with and without a brute-force burst")
+    parser.add_argument("--users", type=int, default=50, help="legitimate users, one client IP each")
+    parser.add_argument("--victims", type=int, default=20, help="existing accounts targeted by the attack")
+    parser.add_argument("--logins-per-user", type=int, default=3, help="keep below RATE_LIMIT_EMAIL_BURST")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--attack-ips", type=int, default=5)
+    parser.add_argument("--attack-concurrency", type=int, default=50)
+    parser.add_argument("--attack-rps", type=float, default=300, help="total attacker request rate")
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def legit_logins(app, users: list[dict], args) -> dict:
+    import httpx
+    from benchmarks.load import run_load
+    from benchmarks.seed import PASSWORD
+
+    clients = [
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(f"10.1.{i // 250}.{i % 250 + 1}", 40000)),
+                          base_url="http://bench", timeout=120)
+        for i in range(len(users))
+    ]
+
+    async def request(i):
+        user_index = i % len(users)
+        response = await clients[user_index].post("/auth/login", json={"email": users[user_index]["email"], "password": PASSWORD})
+        return response.status_code
+
+    try:
+        return await run_load(request, requests=len(users) * args.logins_per_user, concurrency=args.concurrency)
+    finally:
+        for client in clients:
+            await client.aclose()
+
+async def attack(app, victims: list[dict], args, stop: asyncio.Event, statuses: Counter):
+    import httpx
+
+    clients = [
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(f"203.0.113.{i + 1}", 50000)),
+                          base_url="http://bench", timeout=120)
+        for i in range(args.attack_ips)
+    ]
+
+    # Giới hạn tốc độ attacker: client chạy cùng process, không giới hạn thì chỉ đo được CPU của httpx
+    interval = args.attack_concurrency / args.attack_rps
+
+    async def worker(n):
+        attempt = 0
+        next_at = time.perf_counter() + interval * n / args.attack_concurrency
+        while not stop.is_set():
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            next_at += interval
+            victim = victims[(n + attempt) % len(victims)]
+            try:
+                response = await clients[n % len(clients)].post(
+                    "/auth/login", json={"email": victim["email"], "password": f"guess-{n}-{attempt}"}
+                )
+                statuses[response.status_code] += 1
+            except Exception:
+                statuses[0] += 1  # lỗi trong app (hết connection pool...) như run_load
+            attempt += 1
+
+    try:
+        await asyncio.gather(*(worker(n) for n in range(args.attack_concurrency)))
+    finally:
+        for client in clients:
+            await client.aclose()
+
+async def run_phase(app, users, victims, args) -> tuple[dict, dict, Counter]:
+    from app.core.rate_limit import rate_limiter
+
+    await rate_limiter.backend.clear()
+    quiet = await legit_logins(app, users, args)
+    await rate_limiter.backend.clear()
+    stop = asyncio.Event()
+    statuses = Counter()
+    attacker = asyncio.create_task(attack(app, victims, args, stop, statuses))
+    await asyncio.sleep(0.5)  # để đợt tấn công chạy ổn định trước khi đo
+    under_attack = await legit_logins(app, users, args)
+    stop.set()
+    await attacker
+    return quiet, under_attack, statuses
+
+def _line(label: str, r: dict) -> str:
+    return (f"  {label:14s} {r['throughput_rps']:8.1f} rps  p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  "
+            f"p99 {r['p99_ms']:8.2f}ms  errors {r['errors']}")
+
+async def run(args) -> int:
+    from app.core.rate_limit import rate_limiter
+    from app.main import app
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users + {args.victims} attack targets ...")
+    seeded = await seed(run_id, args.users + args.victims, 1, 0)
+    users, victims = seeded[:args.users], seeded[args.users:]
+    failed = False
+    try:
+        for enabled in (False, True):
+            rate_limiter.enabled = enabled
+            quiet, under_attack, statuses = await run_phase(app, users, victims, args)
+            slowdown = under_attack["p95_ms"] / quiet["p95_ms"] if quiet["p95_ms"] else 0.0
+            print(f"rate limit {'on' if enabled else 'off'}")
+            print(_line("no attack", quiet))
+            print(_line("under attack", under_attack) + f"  ({slowdown:.1f}x p95)")
+            print(f"  attacker responses {dict(sorted(statuses.items()))}")
+            if enabled:
+                failed = slowdown > args.max_slowdown or under_attack["errors"] > 0
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Recurring scheduler benchmark: python -m benchmarks.recurring --schedules 100000 --workers 1,2,4,8
+
+Tạo --schedules định nghĩa giao dịch định kỳ (daily) đã đến hạn, mỗi định nghĩa trễ --catchup-days ngày, rồi chạy
+RecurringService.run_once với từng số worker song song (như run_recurring.py --once --workers N) và in
+schedules/s, giao dịch/s. Trước mỗi lượt dữ liệu được tạo lại từ đầu. Exit code 1 nếu số giao dịch sinh ra khác
+số dự kiến (thiếu hoặc ghi trùng khi nhiều worker cùng nhận batch).
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recurring materialization throughput per worker count")
+    parser.add_argument("--schedules", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--accounts-per-user", type=int, default=5)
+    parser.add_argument("--catchup-days", type=int, default=0, help="extra missed daily occurrences per schedule")
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts to sweep")
+    parser.add_argument("--batch-size", type=int, default=None, help="defaults to RECURRING_BATCH_SIZE")
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def reset_schedules(users: list[dict], schedules: int, catchup_days: int, today) -> int:
+    """Replace the seeded users' schedules and generated transactions; returns the transaction count expected."""
+    from sqlalchemy import delete, insert
+    from app.core.database import AsyncSessionLocal
+    from app.models import CategoryType, RecurrenceFrequency, RecurringTransaction, Transaction
+
+    user_ids = [user["user_id"] for user in users]
+    targets = [(user["user_id"], account_id, user["category_ids"]) for user in users for account_id in user["account_ids"]]
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Transaction).where(Transaction.user_id.in_(user_ids)))
+        await db.execute(delete(RecurringTransaction).where(RecurringTransaction.user_id.in_(user_ids)))
+        due = today - timedelta(days=catchup_days)
+        rows = []
+        for i in range(schedules):
+            user_id, account_id, (expense_id, income_id) = targets[i % len(targets)]
+            rows.append({
+                "user_id": user_id, "account_id": account_id,
+                "category_id": income_id if i % 5 == 0 else expense_id,
+                "transaction_type": CategoryType.income if i % 5 == 0 else CategoryType.expense,
+                "amount": Decimal(1000 + i % 100), "description": f"bench recurring {i}",
+                "frequency": RecurrenceFrequency.daily, "start_date": due, "next_due_date": due, "is_active": True,
+            })
+            if len(rows) >= 5000:
+                await db.execute(insert(RecurringTransaction), rows)
+                rows = []
+        if rows:
+            await db.execute(insert(RecurringTransaction), rows)
+        await db.commit()
+    return schedules * (catchup_days + 1)
+
+async def run(args) -> int:
+    from sqlalchemy import func, select
+    from app.core.config import settings
+    from app.core.database import AsyncSessionLocal
+    from app.models import Transaction
+    from app.services.recurring_service import RecurringService
+    from benchmarks.seed import seed, cleanup
+
+    worker_counts = [int(n) for n in args.workers.split(",") if n.strip()]
+    batch_size = args.batch_size or settings.RECURRING_BATCH_SIZE
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users x {args.accounts_per_user} accounts ...")
+    users = await seed(run_id, args.users, args.accounts_per_user, 0)
+    user_ids = [user["user_id"] for user in users]
+    today = RecurringService.today()
+
+    failed = False
+    try:
+        for workers in worker_counts:
+            expected = await reset_schedules(users, args.schedules, args.catchup_days, today)
+            start = time.perf_counter()
+            # Giống run_recurring.py --once: mỗi worker một vòng run_once với session riêng, SKIP LOCKED chia batch
+            results = await asyncio.gather(*(RecurringService.run_once(today, batch_size) for _ in range(workers)))
+            elapsed = time.perf_counter() - start
+            async with AsyncSessionLocal() as db:
+                created = await db.scalar(select(func.count()).select_from(Transaction).where(Transaction.user_id.in_(user_ids)))
+            print(f"workers {workers:2d}  {args.schedules / elapsed:9.0f} schedules/s  {created / elapsed:9.0f} transactions/s  "
+                  f"{elapsed:7.2f}s  created {created} (expected {expected}, reported {sum(results)})")
+            failed |= created != expected
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Reports benchmark: python -m benchmarks.reports --accounts 10 --transactions-per-account 100000
+
+Seed một user có ~1M giao dịch trải đều một năm rồi đo latency của GET /reports/summary và /reports/spending-by-category
+trên cả năm: khoảng trọn ngày (chỉ đọc rollup) và khoảng có giờ lẻ ở hai đầu (rollup + giao dịch thô của ngày lẻ).
+Để so sánh, chạy cùng phép SUM ... GROUP BY trực tiếp trên Transactions (cách làm trước khi có rollup).
+Exit code 1 nếu có lỗi hoặc p95 đọc rollup không nhanh hơn quét bảng Transactions.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report endpoint latency from rollups vs a raw scan over ~1M transactions")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--transactions-per-account", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def run(args) -> int:
+    import httpx
+    from sqlalchemy import func, select, text
+    from app.core.database import AsyncSessionLocal
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.models import Transaction
+    from benchmarks.load import run_load
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    total = args.accounts * args.transactions_per_account
+    print(f"Seeding 1 user with {total} transactions ...")
+    started = time.perf_counter()
+    user = (await seed(run_id, 1, args.accounts, args.transactions_per_account))[0]
+    print(f"  seeded in {time.perf_counter() - started:.1f}s")
+    async with AsyncSessionLocal() as db:
+        # Cập nhật thống kê cho planner sau bulk insert (autovacuum chưa kịp chạy) - nếu không plan của ngày lẻ rất tệ
+        await db.execute(text("ANALYZE transactions"))
+        await db.execute(text("ANALYZE transaction_daily_rollups"))
+        await db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user['user_id'])})}"}
+
+    # Seed rải giao dịch trong 365 ngày gần nhất
+    now = datetime.now(timezone.utc)
+    periods = {
+        "whole days": {"start_date": (now - timedelta(days=366)).date().isoformat(), "end_date": now.date().isoformat()},
+        "partial days": {"start_date": (now - timedelta(days=366, hours=5)).isoformat(), "end_date": now.isoformat()},
+    }
+
+    async def raw_scan(params):
+        start = datetime.fromisoformat(params["start_date"])
+        end = datetime.fromisoformat(params["end_date"])
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                select(Transaction.category_id, func.sum(Transaction.amount))
+                .where(Transaction.user_id == user["user_id"], Transaction.transaction_date >= start,
+                       Transaction.transaction_date <= end)
+                .group_by(Transaction.category_id)
+            )
+
+    failed = False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+            for period, params in periods.items():
+                results = {}
+                for path in ("/reports/summary", "/reports/spending-by-category"):
+
+                    async def request(i, path=path):
+                        return (await client.get(path, headers=headers, params=params)).status_code
+
+                    results[path] = await run_load(request, requests=args.requests, concurrency=args.concurrency,
+                                                   warmup=args.concurrency)
+
+                async def scan(i):
+                    await raw_scan(params)
+                    return 200
+
+                results["raw SUM GROUP BY"] = await run_load(scan, requests=max(args.requests // 10, args.concurrency),
+                                                            concurrency=args.concurrency, warmup=1)
+                print(f"{period}")
+                for name, r in results.items():
+                    print(f"  {name:30s} {r['throughput_rps']:8.1f} rps  p50 {r['p50_ms']:8.2f}ms  "
+                          f"p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  errors {r['errors']}")
+                    failed |= r["errors"] > 0
+                failed |= results["/reports/summary"]["p95_ms"] >= results["raw SUM GROUP BY"]["p95_ms"]
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import itertools
+from benchmarks.seed import DESCRIPTION_WORDS, PASSWORD
+
+# name -> factory(client, context) trả về hàm request(i) -> status code hoặc (status code, số byte body).
+# context: {"users": [{user_id, email, account_ids, category_ids, headers}], "run_id": str}
+SCENARIOS = {}
+
+def scenario(name: str):
+    def register(factory):
+        SCENARIOS[name] = factory
+        return factory
+    return register
+
+def _round_robin(users):
+    cycle = itertools.cycle(users)
+    return lambda: next(cycle)
+
+@scenario("login")
+def login(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        response = await client.post("/auth/login", json={"email": next_user()["email"], "password": PASSWORD})
+        return response.status_code
+    return request
+
+@scenario("auth_user")
+def auth_user(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        response = await client.get("/auth/user", headers=next_user()["headers"])
+        return response.status_code, len(response.content)
+    return request
+
+@scenario("accounts_list")
+def accounts_list(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        response = await client.get("/accounts", headers=next_user()["headers"])
+        return response.status_code, len(response.content)
+    return request
+
+@scenario("accounts_get")
+def accounts_get(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        user = next_user()
+        account_id = user["account_ids"][i % len(user["account_ids"])]
+        response = await client.get(f"/accounts/{account_id}", headers=user["headers"])
+        return response.status_code, len(response.content)
+    return request
+
+def _conditional_poll(client, context, path_of):
+    # Client poll giữ ETag của lần trước; so với kịch bản không gửi If-None-Match để thấy byte/latency tiết kiệm
+    next_user = _round_robin(context["users"])
+    etags = {}
+    async def request(i):
+        user = next_user()
+        path = path_of(user, i)
+        headers = dict(user["headers"])
+        if path in etags:
+            headers["If-None-Match"] = etags[path]
+        response = await client.get(path, headers=headers)
+        etags[path] = response.headers.get("etag", etags.get(path, ""))
+        return response.status_code, len(response.content)
+    return request
+
+@scenario("accounts_list_poll")
+def accounts_list_poll(client, context):
+    return _conditional_poll(client, context, lambda user, i: "/accounts?limit=100")
+
+@scenario("accounts_get_poll")
+def accounts_get_poll(client, context):
+    return _conditional_poll(client, context, lambda user, i: f"/accounts/{user['account_ids'][i % len(user['account_ids'])]}")
+
+@scenario("auth_user_poll")
+def auth_user_poll(client, context):
+    return _conditional_poll(client, context, lambda user, i: "/auth/user")
+
+@scenario("accounts_create")
+def accounts_create(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        response = await client.post("/accounts", headers=next_user()["headers"], json={
+            "account_name": f"Load {context['run_id']} {i}", "account_type": "cash",
+            "initial_balance": "0", "currency": "VND",
+        })
+        return response.status_code
+    return request
+
+@scenario("transactions_list")
+def transactions_list(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        return (await client.get("/transactions", params={"limit": 50}, headers=next_user()["headers"])).status_code
+    return request
+
+@scenario("transactions_search")
+def transactions_search(client, context):
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        # Xen kẽ từ đầy đủ và tiền tố để đo cả nhánh tsvector lẫn trigram
+        word = DESCRIPTION_WORDS[i % len(DESCRIPTION_WORDS)]
+        params = {"q": word if i % 2 else word[:4], "limit": 50}
+        return (await client.get("/transactions/search", params=params, headers=next_user()["headers"])).status_code
+    return request
+
+@scenario("transactions_create")
+def transactions_create(client, context):
+    # So sánh có/không cache cây danh mục: --set CATEGORY_CACHE_ENABLED=false
+    next_user = _round_robin(context["users"])
+    async def request(i):
+        user = next_user()
+        response = await client.post("/transactions", headers=user["headers"], json={
+            "account_id": user["account_ids"][i % len(user["account_ids"])],
+            "category_id": user["category_ids"][i % len(user["category_ids"])],
+            "amount": "1000", "description": "load",
+        })
+        return response.status_code
+    return request
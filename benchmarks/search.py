@@ -0,0 +1,133 @@
+"""Search benchmark: python -m benchmarks.search --users 10 --accounts-per-user 10 --transactions-per-account 10000
+
+Seed ~1M giao dịch rồi với từng cụm từ tìm kiếm, đo latency trên dữ liệu của một user (p50/p95, concurrency 1) của:
+  ilike     description ILIKE '%từ%' cho từng từ, mới nhất trước (cách làm trước khi có search_vector/search_text)
+  tsvector  search_vector @@ to_tsquery (prefix), xếp theo ts_rank - dùng GIN idx_transactions_search_vector
+  trigram   cụm từ <% search_text, xếp theo word_similarity - dùng GIN idx_transactions_search_trgm (cần pg_trgm)
+  endpoint  GET /transactions/search (tsvector OR trigram, như app chạy thật)
+Cụm từ mặc định gồm từ phổ biến, nhiều từ, và từ không khớp dòng nào (ILIKE phải quét hết giao dịch của user).
+Exit code 1 nếu có lỗi hoặc p95 của tsvector chậm hơn ILIKE ở cụm từ mà ILIKE phải quét hết (trả về ít hơn --limit dòng).
+"""
+import argparse
+import asyncio
+import re
+import sys
+import time
+
+STRATEGIES = ("ilike", "tsvector", "trigram", "endpoint")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ILIKE vs tsvector vs trigram search latency over ~1M transactions")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--accounts-per-user", type=int, default=10)
+    parser.add_argument("--transactions-per-account", type=int, default=10000)
+    parser.add_argument("--queries", default="coffee|grab taxi|refund", help="'|'-separated search phrases")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--requests", type=int, default=50, help="timed runs per query and strategy")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+SQL = {
+    "ilike": """
+        SELECT transaction_id FROM transactions
+        WHERE user_id = :user_id AND {ilike}
+        ORDER BY transaction_date DESC, transaction_id DESC LIMIT :limit
+    """,
+    "tsvector": """
+        SELECT transaction_id FROM transactions
+        WHERE user_id = :user_id AND search_vector @@ to_tsquery('simple', :tsquery)
+        ORDER BY ts_rank(search_vector, to_tsquery('simple', :tsquery)) DESC, transaction_id DESC LIMIT :limit
+    """,
+    "trigram": """
+        SELECT transaction_id FROM transactions
+        WHERE user_id = :user_id AND :phrase <% search_text
+        ORDER BY word_similarity(:phrase, search_text) DESC, transaction_id DESC LIMIT :limit
+    """,
+}
+
+async def run(args) -> int:
+    import httpx
+    from sqlalchemy import text
+    from app.core.database import AsyncSessionLocal
+    from app.core.security import create_access_token
+    from app.main import app
+    from benchmarks.load import run_load
+    from benchmarks.seed import seed, cleanup
+
+    strategies = [name.strip() for name in args.strategies.split(",") if name.strip()]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        print(f"Unknown strategies: {sorted(unknown)}; available: {list(STRATEGIES)}")
+        return 2
+    queries = [query.strip() for query in args.queries.split("|") if query.strip()]
+
+    run_id = f"bench{int(time.time())}"
+    total = args.users * args.accounts_per_user * args.transactions_per_account
+    print(f"Seeding {args.users} users x {args.accounts_per_user} accounts x {args.transactions_per_account} "
+          f"transactions ({total} rows) ...")
+    start = time.perf_counter()
+    users = await seed(run_id, args.users, args.accounts_per_user, args.transactions_per_account)
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+    user = users[0]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user['user_id'])})}"}
+    async with AsyncSessionLocal() as db:
+        # Thống kê mới cho planner sau bulk insert (autovacuum chưa kịp chạy)
+        await db.execute(text("ANALYZE transactions"))
+        await db.commit()
+        if {"trigram", "endpoint"} & set(strategies) and not await db.scalar(
+            text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'")
+        ):
+            print("pg_trgm is not installed: skipping trigram and endpoint (they need the <% operator and its GIN index)")
+            strategies = [name for name in strategies if name not in ("trigram", "endpoint")]
+
+    failed = False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+            for phrase in queries:
+                terms = re.findall(r"\w+", phrase.lower())
+                params = {
+                    "user_id": user["user_id"], "limit": args.limit, "phrase": " ".join(terms),
+                    "tsquery": " & ".join(f"{term}:*" for term in terms),
+                    **{f"p{i}": f"%{term}%" for i, term in enumerate(terms)},
+                }
+                ilike = " AND ".join(f"description ILIKE :p{i}" for i in range(len(terms)))
+                results, counts = {}, {}
+                for strategy in strategies:
+                    matched = 0
+                    if strategy == "endpoint":
+                        async def request(i):
+                            nonlocal matched
+                            response = await client.get("/transactions/search", headers=headers,
+                                                        params={"q": phrase, "limit": args.limit})
+                            matched = len(response.json()["items"]) if response.status_code == 200 else 0
+                            return response.status_code
+                    else:
+                        statement = text(SQL[strategy].format(ilike=ilike))
+
+                        async def request(i, statement=statement):
+                            nonlocal matched
+                            async with AsyncSessionLocal() as db:
+                                matched = len((await db.execute(statement, params)).all())
+                            return 200
+
+                    results[strategy] = r = await run_load(request, requests=args.requests, concurrency=1, warmup=2)
+                    counts[strategy] = matched
+                    print(f"{phrase!r:14s} {strategy:9s} p50 {r['p50_ms']:9.2f}ms  p95 {r['p95_ms']:9.2f}ms  "
+                          f"{matched:3d} rows  errors {r['errors']}")
+                    failed |= r["errors"] > 0
+                if "ilike" in results and "tsvector" in results:
+                    speedup = results["ilike"]["p95_ms"] / results["tsvector"]["p95_ms"]
+                    print(f"{phrase!r:14s} p95 ilike / tsvector = {speedup:.2f}")
+                    if counts["ilike"] < args.limit:
+                        failed |= speedup < 1
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from sqlalchemy import delete, insert, select
+from app.core.database import AsyncSessionLocal
+from app.core.security import get_password_hash
+from app.crud.report import rollup_key, new_rollup_deltas
+from app.crud.transaction import balance_delta, insert_transactions_batch, commit_bulk_transactions
+from app.models import (
+    Account, AccountType, Budget, Category, CategoryType, RecurringTransaction, Transaction, TransactionDailyRollup, User,
+)
+
+PASSWORD = "bench-password-1"
+# Mô tả đa dạng để kịch bản search có dữ liệu thực tế
+DESCRIPTION_WORDS = ["coffee", "grab", "lunch", "rent", "salary", "market", "electric", "water", "internet", "gym",
+                     "book", "taxi", "pharmacy", "dinner", "bonus", "gift", "fuel", "parking", "phone", "insurance"]
+
+async def seed(prefix: str, users: int, accounts_per_user: int, transactions_per_account: int, batch_size: int = 5000) -> list[dict]:
+    """Insert synthetic users/accounts/transactions; returns [{user_id, email, account_ids, category_ids}]."""
+    rng = random.Random(prefix)
+    password_hash = get_password_hash(PASSWORD)  # Băm một lần, dùng chung cho mọi user seed
+    now = datetime.now(timezone.utc)
+    seeded = []
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(insert(User).returning(User.user_id, User.email), [
+            {
+                "username": f"{prefix}_{i}", "email": f"{prefix}_{i}@bench.example.com",
+                "password_hash": password_hash, "is_active": True,
+            }
+            for i in range(users)
+        ])
+        user_rows = result.all()
+        for user_id, email in user_rows:
+            result = await db.execute(insert(Category).returning(Category.category_id, Category.category_type), [
+                {"user_id": user_id, "category_name": "Bench expense", "category_type": CategoryType.expense, "is_custom": True},
+                {"user_id": user_id, "category_name": "Bench income", "category_type": CategoryType.income, "is_custom": True},
+            ])
+            categories = result.all()
+            result = await db.execute(insert(Account).returning(Account.account_id), [
+                {
+                    "user_id": user_id, "account_name": f"Bench {j}", "account_type": AccountType.bank_account,
+                    "initial_balance": Decimal("1000000"), "current_balance": Decimal("1000000"), "currency": "VND",
+                    "is_active": True, "created_at": now, "updated_at": now,
+                }
+                for j in range(accounts_per_user)
+            ])
+            account_ids = [row[0] for row in result.all()]
+            seeded.append({
+                "user_id": user_id, "email": email, "account_ids": account_ids,
+                "category_ids": [category_id for category_id, _ in categories],
+            })
+
+            # Giao dịch đi qua cùng đường bulk insert của import để số dư và rollup nhất quán
+            deltas = {account_id: Decimal("0") for account_id in account_ids}
+            rollup_deltas = new_rollup_deltas()
+            rows = []
+            for account_id in account_ids:
+                for _ in range(transactions_per_account):
+                    category_id, category_type = rng.choice(categories)
+                    amount = Decimal(rng.randint(1, 5000)) * 1000
+                    transaction_date = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+                    rows.append({
+                        "user_id": user_id, "account_id": account_id, "category_id": category_id,
+                        "amount": amount, "transaction_type": category_type, "transaction_date": transaction_date,
+                        "description": " ".join(rng.sample(DESCRIPTION_WORDS, 3)),
+                    })
+                    deltas[account_id] += balance_delta(category_type, amount)
+                    rollup = rollup_deltas[rollup_key(user_id, account_id, category_id, category_type, transaction_date)]
+                    rollup[0] += amount
+                    rollup[1] += 1
+                    if len(rows) >= batch_size:
+                        await insert_transactions_batch(db, rows)
+                        rows = []
+            await insert_transactions_batch(db, rows)
+            await commit_bulk_transactions(db, deltas, rollup_deltas)
+    return seeded
+
+async def cleanup(prefix: str):
+    # Transactions/RecurringTransactions -> Accounts là ON DELETE RESTRICT nên phải xóa trước; phần còn lại CASCADE theo user
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.user_id).where(User.email.like(f"{prefix}\\_%@bench.example.com", escape="\\")))
+        user_ids = [row[0] for row in result.all()]
+        if user_ids:
+            for model in (Transaction, RecurringTransaction, Budget, TransactionDailyRollup, Account, Category, User):
+                await db.execute(delete(model).where(model.user_id.in_(user_ids)))
+            await db.commit()
+    return len(user_ids)
@@ -0,0 +1,75 @@
+"""List serialization benchmark: python -m benchmarks.serialization --rows 10000
+
+So sánh đường cũ (load ORM instance -> validate qua response_model -> JSON) với đường nhanh
+(select cột -> TypeAdapter validate cả trang -> orjson) trên cùng một danh sách giao dịch.
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare ORM vs column-row list serialization")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def measure(name: str, build, repeat: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        size = len(await build())
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    await build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {"name": name, "best_ms": round(timings[0] * 1000, 2), "median_ms": round(timings[len(timings) // 2] * 1000, 2),
+            "peak_mib": round(peak / 2**20, 2), "bytes": size}
+
+async def run(args):
+    import orjson
+    from pydantic import TypeAdapter
+    from app.api.v1.schemas import TransactionListResponse, TransactionResponse
+    from app.core.database import AsyncSessionLocal
+    from app.core.serialization import dump_rows
+    from app.crud.transaction import TRANSACTION_LIST_COLUMNS, get_transactions_by_user
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    users = await seed(run_id, 1, 1, args.rows)
+    user_id = users[0]["user_id"]
+    response_adapter = TypeAdapter(TransactionListResponse)
+    list_adapter = TypeAdapter(list[TransactionResponse])
+
+    async def orm_path() -> bytes:
+        async with AsyncSessionLocal() as db:
+            items, _ = await get_transactions_by_user(db, user_id, limit=args.rows)
+            # Tương đương FastAPI: validate giá trị trả về theo response_model rồi dump JSON
+            return response_adapter.dump_json(response_adapter.validate_python({"items": items, "limit": args.rows}, from_attributes=True))
+
+    async def fast_path() -> bytes:
+        async with AsyncSessionLocal() as db:
+            rows, _ = await get_transactions_by_user(db, user_id, limit=args.rows, columns=TRANSACTION_LIST_COLUMNS)
+            return orjson.dumps({"items": dump_rows(list_adapter, rows), "limit": args.rows}, option=orjson.OPT_UTC_Z)
+
+    try:
+        results = [await measure("orm+response_model", orm_path, args.repeat), await measure("rows+typeadapter+orjson", fast_path, args.repeat)]
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    print(f"{args.rows} rows, best of {args.repeat}")
+    for r in results:
+        print(f"{r['name']:26s} best {r['best_ms']:9.2f}ms  median {r['median_ms']:9.2f}ms  peak {r['peak_mib']:8.2f}MiB  {r['bytes']} B")
+
+def main():
+    asyncio.run(run(parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Sync vs async DB session benchmark: python -m benchmarks.sync_db --db-latency-ms 2 --save-baseline
+
+Tái hiện GET /accounts trước và sau khi chuyển sang AsyncSession: cùng một handler `async def` (SELECT user rồi
+SELECT accounts, trả qua response_model) chạy với Session đồng bộ (get_sync_db - chặn event loop trong lúc chờ DB,
+như code cũ) và với AsyncSession (get_db). --db-latency-ms thêm pg_sleep vào mỗi request để mô phỏng round-trip
+tới database qua mạng. --save-baseline ghi kết quả vào benchmarks/baselines/accounts-sync.json và accounts-async.json.
+"""
+import argparse
+import asyncio
+import platform
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="GET /accounts throughput with a blocking Session vs AsyncSession")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--accounts-per-user", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=1000)
+    # Cao hơn DB_POOL_SIZE + DB_MAX_OVERFLOW thì đường sync treo tới DB_POOL_TIMEOUT: connection chỉ được trả khi
+    # get_sync_db đóng session trong threadpool, mà event loop đang bị chặn chờ connection
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="simulated DB round-trip added per request")
+    parser.add_argument("--save-baseline", action="store_true", help="write accounts-sync.json / accounts-async.json")
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+def build_app(db_latency_ms: float):
+    from typing import List
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.api.v1.schemas import AccountResponse
+    from app.core.database import get_db, get_sync_db
+    from app.models import Account, User
+
+    bench_app = FastAPI()
+    latency = select(func.pg_sleep(db_latency_ms / 1000))
+
+    @bench_app.get("/sync/{user_id}/accounts", response_model=List[AccountResponse])
+    async def sync_accounts(user_id: int, db: Session = Depends(get_sync_db)):
+        if db_latency_ms:
+            db.execute(latency)
+        db.execute(select(User).filter(User.user_id == user_id)).scalars().first()
+        return db.execute(select(Account).filter(Account.user_id == user_id)).scalars().all()
+
+    @bench_app.get("/async/{user_id}/accounts", response_model=List[AccountResponse])
+    async def async_accounts(user_id: int, db: AsyncSession = Depends(get_db)):
+        if db_latency_ms:
+            await db.execute(latency)
+        (await db.execute(select(User).filter(User.user_id == user_id))).scalars().first()
+        return (await db.execute(select(Account).filter(Account.user_id == user_id))).scalars().all()
+
+    return bench_app
+
+async def run(args) -> int:
+    import httpx
+    from benchmarks import baseline
+    from benchmarks.__main__ import BASELINE_DIR, _git_commit
+    from benchmarks.load import run_load
+    from benchmarks.seed import seed, cleanup
+
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users x {args.accounts_per_user} accounts ...")
+    users = await seed(run_id, args.users, args.accounts_per_user, 0)
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=build_app(args.db_latency_ms))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for mode in ("sync", "async"):
+                async def request(i, mode=mode):
+                    response = await client.get(f"/{mode}/{users[i % len(users)]['user_id']}/accounts")
+                    return response.status_code, len(response.content)
+                results[mode] = r = await run_load(request, requests=args.requests, concurrency=args.concurrency, warmup=args.warmup)
+                print(f"{mode:6s} session {r['throughput_rps']:9.1f} rps  p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  "
+                      f"p99 {r['p99_ms']:8.2f}ms  errors {r['errors']}")
+    finally:
+        if not args.keep_data:
+            await cleanup(run_id)
+    print(f"async/sync throughput {results['async']['throughput_rps'] / results['sync']['throughput_rps']:.2f}x")
+
+    if args.save_baseline:
+        for mode, result in results.items():
+            path = BASELINE_DIR / f"accounts-{mode}.json"
+            baseline.save(path, {
+                "meta": {
+                    "commit": _git_commit(), "python": platform.python_version(), "session": mode,
+                    "users": args.users, "accounts_per_user": args.accounts_per_user, "requests": args.requests,
+                    "concurrency": args.concurrency, "db_latency_ms": args.db_latency_ms,
+                },
+                "scenarios": {"accounts_list": result},
+            })
+            print(f"Baseline saved to {path}")
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
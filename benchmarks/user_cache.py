@@ -0,0 +1,77 @@
+"""User cache benchmark: python -m benchmarks.user_cache --users 50 --requests 2000
+
+Gọi các endpoint cần xác thực (GET /auth/user, GET /accounts) với cache user tắt rồi bật, đếm số câu SQL mỗi request
+bằng listener before_cursor_execute trên engine. Khi bật cache, request chỉ còn query của chính endpoint - SELECT users
+chỉ chạy ở lần miss đầu tiên của mỗi user. Exit code 1 nếu bật cache không giảm số query mỗi request.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="DB round-trips per authenticated request with the user cache off/on")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--paths", default="/auth/user,/accounts")
+    parser.add_argument("--keep-data", action="store_true", help="do not delete seeded data afterwards")
+    return parser.parse_args()
+
+async def run(args) -> int:
+    import httpx
+    from sqlalchemy import event
+    from app.core.database import async_engine
+    from app.core.security import create_access_token
+    from app.core.user_cache import user_cache
+    from app.main import app
+    from benchmarks.load import run_load
+    from benchmarks.seed import seed, cleanup
+
+    paths = [path.strip() for path in args.paths.split(",") if path.strip()]
+    run_id = f"bench{int(time.time())}"
+    print(f"Seeding {args.users} users ...")
+    users = await seed(run_id, args.users, 1, 0)
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': str(user['user_id'])})}"} for user in users]
+
+    statements = 0
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    failed = False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            for path in paths:
+                per_request = {}
+                for enabled in (False, True):
+                    user_cache.enabled = enabled
+                    await user_cache.backend.clear()
+                    user_cache.hits = user_cache.misses = 0
+
+                    async def request(i):
+                        response = await client.get(path, headers=headers[i % len(headers)])
+                        return response.status_code
+
+                    statements = 0
+                    r = await run_load(request, requests=args.requests, concurrency=args.concurrency)
+                    per_request[enabled] = statements / args.requests
+                    print(f"{path:12s} cache {'on ' if enabled else 'off'}  {per_request[enabled]:5.2f} queries/req  "
+                          f"{r['throughput_rps']:8.1f} rps  p50 {r['p50_ms']:7.2f}ms  p95 {r['p95_ms']:7.2f}ms  "
+                          f"hits {user_cache.hits} misses {user_cache.misses}  errors {r['errors']}")
+                    failed |= r["errors"] > 0
+                failed |= per_request[True] >= per_request[False]
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+        user_cache.enabled = True
+        if not args.keep_data:
+            await cleanup(run_id)
+    return 1 if failed else 0
+
+def main():
+    sys.exit(asyncio.run(run(parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+from app.core.config import settings
+from app.core.logger import setup_logger
+from app.services.recurring_service import RecurringService
+
+# Setup logger
+logger = setup_logger(__name__)
+
+async def main(args):
+    if args.once:
+        # Mỗi worker dùng session riêng; SKIP LOCKED chia batch giữa các worker
+        results = await asyncio.gather(*(RecurringService.run_once(batch_size=args.batch_size) for _ in range(args.workers)))
+        logger.info("Created %d recurring transactions", sum(results))
+    else:
+        await asyncio.gather(*(RecurringService.run_forever(args.interval, args.batch_size) for _ in range(args.workers)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Materialize due recurring transactions")
+    parser.add_argument("--once", action="store_true", help="process everything due now and exit")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=settings.RECURRING_BATCH_SIZE)
+    parser.add_argument("--interval", type=int, default=settings.RECURRING_INTERVAL_SECONDS)
+    asyncio.run(main(parser.parse_args()))
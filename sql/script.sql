@@ -14,6 +14,7 @@ CREATE TABLE Users (
     password_hash VARCHAR(255) NOT NULL,
     full_name VARCHAR(100),
     default_currency VARCHAR(3) NOT NULL DEFAULT 'VND',
+    is_active BOOLEAN NOT NULL DEFAULT FALSE, -- Kích hoạt qua email
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
@@ -51,6 +52,10 @@ CREATE TABLE Accounts (
 );
 
 CREATE INDEX idx_accounts_user_id ON Accounts(user_id);
+-- Tên account duy nhất trong các account active của user; create dùng INSERT ... ON CONFLICT trên index này
+CREATE UNIQUE INDEX uq_accounts_user_active_name ON Accounts(user_id, account_name) WHERE is_active;
+-- Keyset pagination cho GET /accounts: (user_id, created_at, account_id)
+CREATE INDEX idx_accounts_user_created_id ON Accounts(user_id, created_at, account_id);
 
 CREATE TRIGGER set_timestamp_accounts
 BEFORE UPDATE ON Accounts
@@ -107,6 +112,11 @@ CREATE TABLE Transactions (
     location VARCHAR(255),
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    -- Cột tìm kiếm cho GET /transactions/search (Postgres tự tính, app không ghi)
+    search_text TEXT GENERATED ALWAYS AS (COALESCE(description, '') || ' ' || COALESCE(location, '')) STORED,
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('simple', COALESCE(description, '') || ' ' || COALESCE(location, ''))
+    ) STORED,
     CONSTRAINT fk_user_transaction
         FOREIGN KEY(user_id)
         REFERENCES Users(user_id)
@@ -126,6 +136,15 @@ CREATE INDEX idx_transactions_account_id ON Transactions(account_id);
 CREATE INDEX idx_transactions_category_id ON Transactions(category_id);
 CREATE INDEX idx_transactions_date ON Transactions(transaction_date);
 CREATE INDEX idx_transactions_type ON Transactions(transaction_type);
+-- Keyset pagination cho GET /transactions: seek theo (sort_key, transaction_id) thay vì OFFSET
+CREATE INDEX idx_transactions_user_date_id ON Transactions(user_id, transaction_date, transaction_id);
+CREATE INDEX idx_transactions_account_date_id ON Transactions(account_id, transaction_date, transaction_id);
+-- Full-text (tsvector, prefix match) và fuzzy (pg_trgm, chịu lỗi chính tả) cho GET /transactions/search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_transactions_search_vector ON Transactions USING GIN (search_vector);
+CREATE INDEX idx_transactions_search_trgm ON Transactions USING GIN (search_text gin_trgm_ops);
+CREATE INDEX idx_transactions_user_created_id ON Transactions(user_id, created_at, transaction_id);
+CREATE INDEX idx_transactions_user_amount_id ON Transactions(user_id, amount, transaction_id);
 
 
 CREATE TRIGGER set_timestamp_transactions
@@ -133,6 +152,58 @@ BEFORE UPDATE ON Transactions
 FOR EACH ROW
 EXECUTE PROCEDURE trigger_set_timestamp();
 
+-- Table: Transaction_Daily_Rollups (tổng hợp theo ngày cho /reports, cập nhật cùng transaction ghi giao dịch)
+-- rollup_date là ngày của transaction_date theo REPORT_TIMEZONE trong cấu hình ứng dụng
+CREATE TABLE Transaction_Daily_Rollups (
+    user_id BIGINT NOT NULL,
+    rollup_date DATE NOT NULL,
+    account_id BIGINT NOT NULL,
+    category_id BIGINT NOT NULL,
+    transaction_type category_type NOT NULL,
+    total_amount DECIMAL(18, 2) NOT NULL DEFAULT 0.00,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, rollup_date, account_id, category_id, transaction_type),
+    CONSTRAINT fk_user_rollup
+        FOREIGN KEY(user_id)
+        REFERENCES Users(user_id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_account_rollup
+        FOREIGN KEY(account_id)
+        REFERENCES Accounts(account_id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_category_rollup
+        FOREIGN KEY(category_id)
+        REFERENCES Categories(category_id)
+        ON DELETE CASCADE
+);
+
+CREATE INDEX idx_rollups_user_category_date ON Transaction_Daily_Rollups(user_id, category_id, rollup_date);
+
+-- Table: Email_Outbox (hàng đợi email; request chỉ ghi một dòng, worker gửi qua SMTP)
+CREATE TABLE Email_Outbox (
+    email_id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    purpose VARCHAR(32) NOT NULL, -- activation | reset_password
+    recipient VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending', -- pending | sending | sent | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claim_version BIGINT NOT NULL DEFAULT 0, -- tăng mỗi lần claim/enqueue lại, không bao giờ reset; worker chỉ ghi kết quả nếu còn khớp
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    sent_at TIMESTAMPTZ,
+    CONSTRAINT fk_user_email_outbox
+        FOREIGN KEY(user_id)
+        REFERENCES Users(user_id)
+        ON DELETE CASCADE
+);
+
+-- Gộp trùng: gửi lại cùng loại email cho user chỉ cập nhật dòng đang chờ
+CREATE UNIQUE INDEX uq_email_outbox_pending ON Email_Outbox(user_id, purpose) WHERE status IN ('pending', 'sending');
+CREATE INDEX idx_email_outbox_due ON Email_Outbox(next_attempt_at) WHERE status IN ('pending', 'sending');
+
 -- Table: Budgets
 CREATE TABLE Budgets (
     budget_id BIGSERIAL PRIMARY KEY,
@@ -141,6 +212,7 @@ CREATE TABLE Budgets (
     amount DECIMAL(18, 2) NOT NULL CHECK (amount > 0),
     start_date DATE NOT NULL,
     end_date DATE NOT NULL,
+    spent_amount DECIMAL(18, 2) NOT NULL DEFAULT 0.00, -- chi tiêu lũy kế (gồm danh mục con), cập nhật cùng transaction ghi giao dịch
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     CONSTRAINT fk_user_budget
@@ -158,6 +230,8 @@ CREATE TABLE Budgets (
 CREATE INDEX idx_budgets_user_id ON Budgets(user_id);
 CREATE INDEX idx_budgets_category_id ON Budgets(category_id);
 CREATE INDEX idx_budgets_period ON Budgets(start_date, end_date);
+-- Tìm budget còn hiệu lực của user khi ghi giao dịch
+CREATE INDEX idx_budgets_user_end_date ON Budgets(user_id, end_date);
 
 
 CREATE TRIGGER set_timestamp_budgets
@@ -269,6 +343,8 @@ CREATE INDEX idx_recurring_account_id ON RecurringTransactions(account_id);
 CREATE INDEX idx_recurring_category_id ON RecurringTransactions(category_id);
 CREATE INDEX idx_recurring_next_due ON RecurringTransactions(next_due_date);
 CREATE INDEX idx_recurring_active ON RecurringTransactions(is_active);
+-- Scheduler nhận các định nghĩa đến hạn theo (next_due_date, id) với FOR UPDATE SKIP LOCKED
+CREATE INDEX idx_recurring_due ON RecurringTransactions(next_due_date, recurring_transaction_id) WHERE is_active;
 
 
 CREATE TRIGGER set_timestamp_recurring
@@ -276,4 +352,35 @@ BEFORE UPDATE ON RecurringTransactions
 FOR EACH ROW
 EXECUTE PROCEDURE trigger_set_timestamp();
 
+-- Table: Exchange_Rates (tỷ giá theo ngày; rate = giá trị 1 đơn vị currency quy ra FX_BASE_CURRENCY)
+-- Ngày không có tỷ giá (cuối tuần, ngày lễ) dùng tỷ giá gần nhất trước đó
+CREATE TABLE Exchange_Rates (
+    rate_date DATE NOT NULL,
+    currency CHAR(3) NOT NULL,
+    rate DECIMAL(20, 10) NOT NULL,
+    PRIMARY KEY (rate_date, currency),
+    CONSTRAINT positive_rate CHECK (rate > 0)
+);
+
+-- Table: Idempotency_Keys (response đã lưu theo header Idempotency-Key; request lặp lại được trả từ đây)
+CREATE TABLE Idempotency_Keys (
+    user_id BIGINT NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL, -- sha256 của method, path, query string và body
+    status VARCHAR(16) NOT NULL DEFAULT 'processing', -- processing | completed
+    response_status INTEGER,
+    response_headers JSONB,
+    response_body BYTEA,
+    locked_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, idempotency_key),
+    CONSTRAINT fk_user_idempotency_keys
+        FOREIGN KEY(user_id)
+        REFERENCES Users(user_id)
+        ON DELETE CASCADE
+);
+
+CREATE INDEX idx_idempotency_keys_expires_at ON Idempotency_Keys(expires_at);
+
 -- End of script
\ No newline at end of file
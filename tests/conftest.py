@@ -0,0 +1,97 @@
+"""Integration fixtures: app chạy in-process qua httpx.ASGITransport trên database test (DB_* trong .env.test / .env).
+
+Mỗi test tạo user riêng với prefix ngẫu nhiên và xóa toàn bộ dữ liệu của các user đó khi kết thúc.
+"""
+import itertools
+import os
+import uuid
+import httpx
+import pytest
+
+# Mọi request test đến từ cùng một IP; không chạy worker gửi email; bcrypt cost thấp cho nhanh
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("EMAIL_WORKER_ENABLED", "false")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from sqlalchemy import delete, select  # noqa: E402
+from app.core.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.core.user_cache import user_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import (  # noqa: E402
+    Account, Budget, Category, RecurringTransaction, Transaction, TransactionDailyRollup, User,
+)
+
+PASSWORD = "test-password-1"
+
+async def cleanup_users(prefix: str):
+    # Transactions/RecurringTransactions -> Accounts/Categories là ON DELETE RESTRICT nên xóa trước; phần còn lại CASCADE theo user
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.user_id).where(User.email.like(f"{prefix}\\_%", escape="\\")))
+        user_ids = [row[0] for row in result.all()]
+        if user_ids:
+            for model in (Transaction, RecurringTransaction, Budget, TransactionDailyRollup, Account, Category, User):
+                await db.execute(delete(model).where(model.user_id.in_(user_ids)))
+            await db.commit()
+        for user_id in user_ids:
+            await user_cache.invalidate(user_id)
+
+@pytest.fixture(autouse=True)
+async def _dispose_engine():
+    yield
+    # Mỗi test có event loop riêng; connection asyncpg gắn với loop đã tạo ra nó
+    await async_engine.dispose()
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as c:
+        yield c
+
+@pytest.fixture
+async def user_prefix():
+    prefix = f"test_{uuid.uuid4().hex[:12]}"
+    yield prefix
+    await cleanup_users(prefix)
+
+@pytest.fixture
+def make_user(client, user_prefix):
+    """Factory: signup + login qua API; trả {user_id, email, username, headers}."""
+    counter = itertools.count()
+
+    async def create() -> dict:
+        n = next(counter)
+        email, username = f"{user_prefix}_{n}@example.com", f"{user_prefix}_{n}"
+        response = await client.post("/auth/signup", json={"email": email, "username": username, "password": PASSWORD})
+        assert response.status_code == 201, response.text
+        response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return {
+            "user_id": (await client.get("/auth/user", headers=_bearer(response))).json()["user_id"],
+            "email": email, "username": username, "headers": _bearer(response),
+        }
+
+    return create
+
+@pytest.fixture
+def make_account(client):
+    async def create(user: dict, name: str = "Main", initial_balance: str = "0", currency: str = "VND") -> dict:
+        response = await client.post("/accounts", headers=user["headers"], json={
+            "account_name": name, "account_type": "bank_account", "initial_balance": initial_balance, "currency": currency,
+        })
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return create
+
+@pytest.fixture
+def make_category(client):
+    async def create(user: dict, name: str, category_type: str = "expense", parent_category_id: int | None = None) -> dict:
+        response = await client.post("/categories", headers=user["headers"], json={
+            "category_name": name, "category_type": category_type, "parent_category_id": parent_category_id,
+        })
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return create
+
+def _bearer(login_response) -> dict:
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
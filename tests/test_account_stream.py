@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from app.core.account_feed import account_feed
+from app.main import app
+from benchmarks.account_stream import SSEConnection
+
+pytestmark = pytest.mark.integration
+
+SUBSCRIBERS = 50
+
+async def wait_for(condition, timeout: float = 10):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+async def test_transaction_fans_out_to_every_subscriber_and_disconnect_releases_them(
+    client, make_user, make_account, make_category
+):
+    user, other = await make_user(), await make_user()
+    account = await make_account(user, initial_balance="100.00")
+    food = await make_category(user, "Food")
+    token = user["headers"]["Authorization"].removeprefix("Bearer ")
+    other_token = other["headers"]["Authorization"].removeprefix("Bearer ")
+    baseline = account_feed.stats()["subscribers"]
+    connections = [SSEConnection(app, token) for _ in range(SUBSCRIBERS)] + [SSEConnection(app, other_token)]
+    try:
+        # Kết nối idle: mỗi kết nối nhận snapshot rồi chờ, không giữ connection DB
+        await asyncio.gather(*(connection.open() for connection in connections))
+        assert [connection.status for connection in connections] == [200] * len(connections)
+        assert account_feed.stats()["subscribers"] == baseline + len(connections)
+        # NOTIFY gửi trước khi LISTEN sẵn sàng sẽ bị mất
+        await wait_for(lambda: account_feed.stats()["connected"])
+
+        response = await client.post("/transactions", headers=user["headers"], json={
+            "account_id": account["account_id"], "category_id": food["category_id"], "amount": "10.00",
+        })
+        assert response.status_code == 201, response.text
+
+        await asyncio.wait_for(asyncio.gather(*(connection.changed.wait() for connection in connections[:SUBSCRIBERS])), 10)
+        # Event chỉ gửi tới kết nối của user có account thay đổi
+        assert not connections[-1].changed.is_set()
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections if connection.task is not None))
+        remaining = account_feed.stats()["subscribers"]
+        await account_feed.close()
+    assert remaining == baseline
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import insert, select, update
+from app.core.database import AsyncSessionLocal
+from app.models import Budget, Category, CategoryType
+
+pytestmark = pytest.mark.integration
+
+async def insert_category_elsewhere(user_id: int, name: str, parent_category_id: int | None = None) -> int:
+    """Insert a category straight into the DB, as another worker would: this process's tree cache is not invalidated."""
+    async with AsyncSessionLocal() as db:
+        category_id = await db.scalar(insert(Category).values(
+            user_id=user_id, category_name=name, category_type=CategoryType.expense,
+            parent_category_id=parent_category_id, is_custom=True,
+        ).returning(Category.category_id))
+        await db.commit()
+    return category_id
+
+async def test_category_created_on_another_worker_is_accepted(client, make_user, make_account, make_category):
+    user = await make_user()
+    account = await make_account(user, initial_balance="100.00")
+    food = await make_category(user, "Food")
+    # Cây danh mục của user đã nằm trong cache trước khi danh mục mới xuất hiện
+    assert (await client.get("/categories", headers=user["headers"])).status_code == 200
+    category_id = await insert_category_elsewhere(user["user_id"], "Snacks", food["category_id"])
+
+    response = await client.post("/transactions", headers=user["headers"], json={
+        "account_id": account["account_id"], "category_id": category_id, "amount": "10.00",
+    })
+    assert response.status_code == 201, response.text
+    assert response.json()["transaction_type"] == "expense"
+
+    response = await client.post("/categories", headers=user["headers"], json={
+        "category_name": "Chips", "category_type": "expense", "parent_category_id": category_id,
+    })
+    assert response.status_code == 201, response.text
+
+async def test_unknown_category_is_still_rejected(client, make_user, make_account):
+    user = await make_user()
+    account = await make_account(user)
+    response = await client.post("/transactions", headers=user["headers"], json={
+        "account_id": account["account_id"], "category_id": 2**62, "amount": "10.00",
+    })
+    assert response.status_code == 400
+
+async def test_budget_spend_follows_reparenting_on_another_worker(client, make_user, make_account, make_category):
+    user = await make_user()
+    account = await make_account(user, initial_balance="100.00")
+    food = await make_category(user, "Food")
+    snacks = await make_category(user, "Snacks")
+    today = date.today()
+    async with AsyncSessionLocal() as db:
+        budget_id = await db.scalar(insert(Budget).values(
+            user_id=user["user_id"], category_id=food["category_id"], amount=Decimal("50.00"),
+            start_date=today - timedelta(days=1), end_date=today + timedelta(days=1),
+        ).returning(Budget.budget_id))
+        await db.commit()
+    # Cây cache vẫn thấy Snacks là top-level, rồi worker khác chuyển Snacks vào Food
+    assert (await client.get("/categories", headers=user["headers"])).status_code == 200
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Category).where(Category.category_id == snacks["category_id"]).values(
+            parent_category_id=food["category_id"]
+        ))
+        await db.commit()
+
+    response = await client.post("/transactions", headers=user["headers"], json={
+        "account_id": account["account_id"], "category_id": snacks["category_id"], "amount": "10.00",
+    })
+    assert response.status_code == 201, response.text
+    async with AsyncSessionLocal() as db:
+        assert await db.scalar(select(Budget.spent_amount).where(Budget.budget_id == budget_id)) == Decimal("10.00")
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.crud.email_outbox import claim_due_emails, enqueue_email, mark_email_failed, mark_email_sent
+from app.models import EmailOutbox
+
+pytestmark = pytest.mark.integration
+
+async def claim(db, user_id: int) -> EmailOutbox:
+    emails = [email for email in await claim_due_emails(db, 1000) if email.user_id == user_id]
+    assert len(emails) == 1
+    return emails[0]
+
+async def outbox_row(user_id: int) -> tuple[str, str]:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(EmailOutbox.status, EmailOutbox.body).where(EmailOutbox.user_id == user_id)
+        )).one()
+
+async def test_stale_send_result_does_not_touch_a_reclaimed_email(make_user):
+    # Signup đã xếp email kích hoạt vào outbox
+    user = await make_user()
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        stale = await claim(first, user["user_id"])
+        # Trong lúc lần gửi đầu còn treo: enqueue lại (attempts về 0) rồi worker khác nhận lại (attempts lại là 1)
+        async with AsyncSessionLocal() as db:
+            await enqueue_email(db, user["user_id"], "activation", user["email"], "Activate", "new link")
+        current = await claim(second, user["user_id"])
+        assert current.attempts == stale.attempts
+
+        await mark_email_sent(first, stale)
+        assert await outbox_row(user["user_id"]) == ("sending", "new link")
+        await mark_email_failed(first, stale, "timeout", None)
+        assert await outbox_row(user["user_id"]) == ("sending", "new link")
+
+        await mark_email_sent(second, current)
+        assert await outbox_row(user["user_id"]) == ("sent", "new link")
@@ -0,0 +1,102 @@
+import asyncio
+import csv
+import io
+import orjson
+import pytest
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.main import app
+from app.services import export_service
+
+pytestmark = pytest.mark.integration
+
+ROWS = 20_000
+BATCH_SIZE = 500
+
+async def insert_transactions(user_id: int, account_id: int, category_id: int, n: int):
+    # Insert thẳng bằng generate_series cho nhanh; export chỉ đọc bảng Transactions
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("""
+            INSERT INTO transactions (user_id, account_id, category_id, amount, transaction_type, transaction_date, description)
+            SELECT :user_id, :account_id, :category_id, (i % 1000) + 0.5, 'expense',
+                   now() - make_interval(mins => i), 'row ' || i || ', "quoted"'
+            FROM generate_series(1, :n) AS i
+        """), {"user_id": user_id, "account_id": account_id, "category_id": category_id, "n": n})
+        await db.commit()
+
+async def get_streamed(path: str, query: str, headers: dict, on_chunk) -> int:
+    """Drive the ASGI app directly so each body chunk is seen as it is sent (httpx's ASGITransport buffers the body)."""
+    status = 0
+    request_sent = False
+    finished = asyncio.Event()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query.encode(),
+        "server": ("test", 80), "client": ("127.0.0.1", 0),
+        "headers": [(b"host", b"test")] + [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+    }
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body"):
+                on_chunk(message["body"])
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+@pytest.mark.parametrize("file_format", ["csv", "ndjson"])
+async def test_export_streams_chunks_before_the_cursor_is_exhausted(
+    make_user, make_account, make_category, monkeypatch, file_format
+):
+    user = await make_user()
+    account = await make_account(user)
+    food = await make_category(user, "Food")
+    await insert_transactions(user["user_id"], account["account_id"], food["category_id"], ROWS)
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", BATCH_SIZE)
+
+    cursor = {"batches": 0, "exhausted": False}
+    stream_transaction_rows = export_service.stream_transaction_rows
+
+    async def counted(*args, **kwargs):
+        async for rows in stream_transaction_rows(*args, **kwargs):
+            cursor["batches"] += 1
+            yield rows
+        cursor["exhausted"] = True
+
+    monkeypatch.setattr(export_service, "stream_transaction_rows", counted)
+    chunks, batches_at_chunk = [], []
+
+    def on_chunk(body: bytes):
+        chunks.append(body)
+        batches_at_chunk.append((cursor["batches"], cursor["exhausted"]))
+
+    status = await get_streamed("/transactions/export", f"format={file_format}", user["headers"], on_chunk)
+
+    assert status == 200
+    # Chunk đầu được gửi ngay sau batch đầu tiên, không đợi đọc hết cursor
+    assert batches_at_chunk[0] == (1, False)
+    assert len(chunks) >= ROWS // BATCH_SIZE
+    body = b"".join(chunks)
+    if file_format == "csv":
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        assert rows[0] == export_service.EXPORT_FIELDS
+        assert len(rows) - 1 == ROWS
+        assert {row[rows[0].index("user_id")] for row in rows[1:]} == {str(user["user_id"])}
+    else:
+        items = [orjson.loads(line) for line in body.splitlines()]
+        assert len(items) == ROWS
+        assert len({item["transaction_id"] for item in items}) == ROWS
@@ -0,0 +1,28 @@
+import asyncio
+import threading
+from app.core import fx
+from app.core.config import settings
+
+async def test_concurrent_misses_load_the_rates_file_once_off_the_event_loop(tmp_path, monkeypatch):
+    path = tmp_path / "rates.csv"
+    path.write_text("date,currency,rate\n2024-01-01,VND,0.00004\n2024-01-01,EUR,1.1\n2024-01-02,EUR,1.2\n")
+    monkeypatch.setattr(settings, "FX_RATES_FILE", str(path))
+    loads = []
+
+    def load_rates_file(file_path):
+        loads.append(threading.current_thread() is threading.main_thread())
+        return real_load(file_path)
+
+    real_load = fx.load_rates_file
+    monkeypatch.setattr(fx, "load_rates_file", load_rates_file)
+    cache = fx.FxRateCache(ttl_seconds=60)
+
+    results = await asyncio.gather(*(cache.get(None) for _ in range(20)))
+
+    # Một lần đọc file, ngoài thread của event loop; mọi coroutine nhận cùng snapshot
+    assert loads == [False]
+    assert len({id(rates) for rates in results}) == 1
+    assert sorted(results[0].currencies) == ["EUR", "USD", "VND"]
+    cache.invalidate()
+    await cache.get(None)
+    assert len(loads) == 2
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from app.core import idempotency
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from conftest import PASSWORD
+
+pytestmark = pytest.mark.integration
+
+async def test_duplicate_key_returns_stored_response(client, make_user, make_account, make_category):
+    user = await make_user()
+    account = await make_account(user, initial_balance="100.00")
+    food = await make_category(user, "Food")
+    headers = {**user["headers"], "Idempotency-Key": "create-once"}
+    payload = {"account_id": account["account_id"], "category_id": food["category_id"], "amount": "10.00"}
+
+    responses = await asyncio.gather(*(client.post("/transactions", headers=headers, json=payload) for _ in range(5)))
+
+    assert [response.status_code for response in responses] == [201] * 5
+    assert len({response.json()["transaction_id"] for response in responses}) == 1
+    accounts = await client.get(f"/accounts/{account['account_id']}", headers=user["headers"])
+    assert float(accounts.json()["current_balance"]) == 90.0
+
+async def test_vanished_key_backs_off_until_deadline(client, make_user, monkeypatch):
+    # Key bị request đầu xóa (lỗi) giữa lúc claim và đọc lại: vòng chờ vẫn phải backoff và dừng ở deadline
+    user = await make_user()
+    calls = 0
+
+    async def claim(db, user_id, key, request_hash):
+        nonlocal calls
+        calls += 1
+        return False
+
+    async def get(db, user_id, key):
+        return None
+
+    monkeypatch.setattr(idempotency, "claim_idempotency_key", claim)
+    monkeypatch.setattr(idempotency, "get_idempotency_key", get)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.5)
+
+    response = await client.post("/transactions", headers={**user["headers"], "Idempotency-Key": "vanished"}, json={})
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    # Backoff 10ms -> 250ms: chỉ vài lần thử trong 0.5s thay vì quay vòng liên tục
+    assert calls <= 10
+
+async def test_rate_limited_request_does_no_idempotency_work(client, make_user, monkeypatch):
+    user = await make_user()
+    claims = 0
+
+    async def claim(db, user_id, key, request_hash):
+        nonlocal claims
+        claims += 1
+        return True
+
+    async def check(ip, email):
+        return 30.0
+
+    monkeypatch.setattr(idempotency, "claim_idempotency_key", claim)
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "check", check)
+
+    response = await client.post(
+        "/auth/login", headers={**user["headers"], "Idempotency-Key": "limited"},
+        json={"email": user["email"], "password": PASSWORD},
+    )
+
+    assert response.status_code == 429
+    assert claims == 0
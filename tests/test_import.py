@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.models import Transaction
+
+pytestmark = pytest.mark.integration
+
+CSV = (
+    "date,amount,category,description\r\n"
+    "2023-03-01,10.00,Food,\"Lunch\r\nwith the team, paid by card\"\r\n"
+    "2023-03-02,not-a-number,Food,Bad amount\r\n"
+    "2023-03-03,5.50,Food,\"Memo line 1\nline 2 \"\"quoted\"\"\nline 3\"\r\n"
+)
+
+async def test_csv_quoted_field_with_newline_stays_in_one_row(client, make_user, make_account, make_category):
+    user = await make_user()
+    account = await make_account(user)
+    await make_category(user, "Food")
+    body = CSV.encode()
+
+    async def chunks():
+        # Chunk nhỏ để ranh giới chunk rơi vào giữa field nhiều dòng
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    response = await client.post(
+        "/transactions/import", headers=user["headers"], params={"account_id": account["account_id"]}, content=chunks(),
+    )
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (2, 1)
+    assert [error["row"] for error in result["errors"]] == [2]
+    async with AsyncSessionLocal() as db:
+        descriptions = (await db.scalars(
+            select(Transaction.description).where(Transaction.user_id == user["user_id"]).order_by(Transaction.transaction_date)
+        )).all()
+    assert descriptions == ["Lunch\nwith the team, paid by card", 'Memo line 1\nline 2 "quoted"\nline 3']
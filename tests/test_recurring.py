@@ -0,0 +1,49 @@
+from datetime import timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import func, insert, select
+from app.core.database import AsyncSessionLocal
+from app.models import CategoryType, RecurrenceFrequency, RecurringTransaction, Transaction
+from app.services.recurring_service import RecurringService
+
+pytestmark = pytest.mark.integration
+
+async def add_schedule(user: dict, account_id: int, category_id: int, transaction_type: CategoryType, amount: str, due) -> int:
+    async with AsyncSessionLocal() as db:
+        schedule_id = await db.scalar(insert(RecurringTransaction).values(
+            user_id=user["user_id"], account_id=account_id, category_id=category_id, transaction_type=transaction_type,
+            amount=Decimal(amount), frequency=RecurrenceFrequency.monthly, start_date=due, next_due_date=due,
+        ).returning(RecurringTransaction.recurring_transaction_id))
+        await db.commit()
+    return schedule_id
+
+async def test_failing_schedule_does_not_block_its_batch(make_user, make_account, make_category):
+    user = await make_user()
+    today = RecurringService.today()
+    # Số dư gần mức tối đa của NUMERIC(18,2): cộng thêm thu nhập sẽ tràn số khi cập nhật số dư
+    full = await make_account(user, "Full", initial_balance="9999999999999999.00")
+    wallet = await make_account(user, "Wallet", initial_balance="100.00")
+    salary = await make_category(user, "Salary", "income")
+    food = await make_category(user, "Food")
+    # Định nghĩa lỗi xếp đầu batch (next_due_date sớm nhất)
+    bad = await add_schedule(user, full["account_id"], salary["category_id"], CategoryType.income, "10.00",
+                             today - timedelta(days=10))
+    good = [
+        await add_schedule(user, wallet["account_id"], food["category_id"], CategoryType.expense, "1.00",
+                           today - timedelta(days=3 - i))
+        for i in range(3)
+    ]
+
+    assert await RecurringService.run_once(today, batch_size=10) == 3
+    async with AsyncSessionLocal() as db:
+        schedules = dict((await db.execute(
+            select(RecurringTransaction.recurring_transaction_id, RecurringTransaction)
+            .where(RecurringTransaction.user_id == user["user_id"])
+        )).all())
+        created = await db.scalar(select(func.count()).select_from(Transaction).where(Transaction.user_id == user["user_id"]))
+    assert created == 3
+    assert all(schedules[schedule_id].last_created_date is not None for schedule_id in good)
+    # Định nghĩa lỗi bị tắt, next_due_date giữ nguyên để bù lại khi được sửa
+    assert not schedules[bad].is_active
+    assert schedules[bad].next_due_date == today - timedelta(days=10)
+    assert await RecurringService.run_once(today, batch_size=10) == 0
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import func, select
+from app.core.database import AsyncSessionLocal
+from app.crud.report import report_timezone
+from app.models import CategoryType, Transaction
+
+pytestmark = pytest.mark.integration
+
+# Ngày cố định trong quá khứ để không lẫn với dữ liệu khác của user
+BASE_DAY = date(2023, 3, 10)
+
+def at(day_offset: int, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(BASE_DAY + timedelta(days=day_offset), datetime.min.time(), report_timezone()).replace(
+        hour=hour, minute=minute
+    )
+
+async def raw_totals(user_id: int, start: datetime, end: datetime, group_column, account_id: int | None = None,
+                     transaction_type: CategoryType | None = None) -> dict:
+    """SUM(amount) GROUP BY group_column straight from Transactions over [start, end)."""
+    query = select(group_column, func.sum(Transaction.amount)).where(
+        Transaction.user_id == user_id, Transaction.transaction_date >= start, Transaction.transaction_date < end,
+    )
+    if account_id is not None:
+        query = query.where(Transaction.account_id == account_id)
+    if transaction_type is not None:
+        query = query.where(Transaction.transaction_type == transaction_type)
+    async with AsyncSessionLocal() as db:
+        return {key: Decimal(amount) for key, amount in (await db.execute(query.group_by(group_column))).all()}
+
+async def assert_reports_match_raw(client, user: dict, account_ids: list[int]):
+    # Trọn ngày (chỉ rollup), khoảng có giờ lẻ ở hai đầu (rollup + giao dịch thô) và khoảng nằm trong một ngày
+    periods = [
+        (BASE_DAY.isoformat(), (BASE_DAY + timedelta(days=6)).isoformat(),
+         at(0, 0), at(7, 0)),
+        (at(0, 13, 30).isoformat(), at(4, 9, 15).isoformat(), at(0, 13, 30), at(4, 9, 15) + timedelta(microseconds=1)),
+        (at(2, 8).isoformat(), at(2, 20).isoformat(), at(2, 8), at(2, 20) + timedelta(microseconds=1)),
+    ]
+    for query_start, query_end, start, end in periods:
+        for account_id in (None, *account_ids):
+            params = {"start_date": query_start, "end_date": query_end}
+            if account_id is not None:
+                params["account_id"] = account_id
+
+            response = await client.get("/reports/summary", headers=user["headers"], params=params)
+            assert response.status_code == 200, response.text
+            by_type = await raw_totals(user["user_id"], start, end, Transaction.transaction_type, account_id)
+            income = by_type.get(CategoryType.income, Decimal("0"))
+            expense = by_type.get(CategoryType.expense, Decimal("0"))
+            assert response.json() == {
+                "total_income": float(income), "total_expense": float(expense), "net_flow": float(income - expense),
+            }, params
+
+            response = await client.get("/reports/spending-by-category", headers=user["headers"], params=params)
+            assert response.status_code == 200, response.text
+            by_category = await raw_totals(
+                user["user_id"], start, end, Transaction.category_id, account_id, CategoryType.expense
+            )
+            assert {row["category_id"]: row["total_amount"] for row in response.json()} == {
+                category_id: float(amount) for category_id, amount in by_category.items() if amount
+            }, params
+
+async def test_reports_match_raw_aggregation_after_writes(client, make_user, make_account, make_category):
+    user = await make_user()
+    main = await make_account(user, "Main", initial_balance="1000.00")
+    savings = await make_account(user, "Savings", initial_balance="0")
+    food = await make_category(user, "Food")
+    rent = await make_category(user, "Rent")
+    salary = await make_category(user, "Salary", "income")
+
+    created = []
+    for i in range(30):
+        account = (main, savings)[i % 2]
+        category = (food, rent, salary)[i % 3]
+        response = await client.post("/transactions", headers=user["headers"], json={
+            "account_id": account["account_id"], "category_id": category["category_id"],
+            "amount": f"{(i + 1) * 7}.{i % 100:02d}", "transaction_date": at(i % 7, (i * 5) % 24, (i * 13) % 60).isoformat(),
+        })
+        assert response.status_code == 201, response.text
+        created.append(response.json()["transaction_id"])
+    await assert_reports_match_raw(client, user, [main["account_id"], savings["account_id"]])
+
+    # Sửa số tiền, đổi danh mục (kể cả đổi loại thu/chi), dời sang ngày khác và chuyển sang account khác
+    updates = [
+        {"amount": "99.99"},
+        {"category_id": salary["category_id"]},
+        {"category_id": food["category_id"], "amount": "12.34"},
+        {"transaction_date": at(5, 23, 59).isoformat()},
+        {"account_id": main["account_id"]},
+        {"account_id": savings["account_id"], "category_id": rent["category_id"], "transaction_date": at(1, 0, 1).isoformat()},
+    ]
+    for transaction_id, update in zip(created, updates):
+        response = await client.put(f"/transactions/{transaction_id}", headers=user["headers"], json=update)
+        assert response.status_code == 200, response.text
+    for transaction_id in created[-5:]:
+        response = await client.delete(f"/transactions/{transaction_id}", headers=user["headers"])
+        assert response.status_code == 200, response.text
+    await assert_reports_match_raw(client, user, [main["account_id"], savings["account_id"]])
+
+    lines = ["date,amount,category,account,description"]
+    for i in range(40):
+        lines.append(f"{at(i % 7, (i * 7) % 24).isoformat()},{i + 1}.50,{('Food', 'Rent', 'Salary')[i % 3]},"
+                     f"{('Main', 'Savings')[i % 2]},imported {i}")
+    response = await client.post("/transactions/import", headers=user["headers"], params={"format": "csv"},
+                                 content="\n".join(lines).encode())
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 40
+    await assert_reports_match_raw(client, user, [main["account_id"], savings["account_id"]])
+
+async def test_daily_totals_follow_transactions_moved_across_days(client, make_user, make_account, make_category):
+    user = await make_user()
+    account = await make_account(user)
+    food = await make_category(user, "Food")
+    for i in range(10):
+        response = await client.post("/transactions", headers=user["headers"], json={
+            "account_id": account["account_id"], "category_id": food["category_id"],
+            "amount": "5.00", "transaction_date": at(i % 3, 23, 30).isoformat(),
+        })
+        assert response.status_code == 201, response.text
+        if i % 4 == 0:
+            response = await client.put(f"/transactions/{response.json()['transaction_id']}", headers=user["headers"],
+                                        json={"transaction_date": at(4, 0, 30).isoformat()})
+            assert response.status_code == 200, response.text
+
+    expected = defaultdict(Decimal)
+    async with AsyncSessionLocal() as db:
+        for transaction_date, amount in (await db.execute(
+            select(Transaction.transaction_date, Transaction.amount).where(Transaction.user_id == user["user_id"])
+        )).all():
+            expected[transaction_date.astimezone(report_timezone()).date()] += amount
+    response = await client.get("/reports/summary", headers=user["headers"], params={
+        "start_date": BASE_DAY.isoformat(), "end_date": (BASE_DAY + timedelta(days=4)).isoformat(),
+    })
+    assert response.json()["total_expense"] == float(sum(expected.values()))
+    for day, amount in expected.items():
+        response = await client.get("/reports/summary", headers=user["headers"], params={
+            "start_date": day.isoformat(), "end_date": day.isoformat(),
+        })
+        assert response.json()["total_expense"] == float(amount), day
@@ -0,0 +1,93 @@
+import asyncio
+import re
+from collections import Counter
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app.core.database import async_engine
+from conftest import PASSWORD
+
+pytestmark = pytest.mark.integration
+
+PARALLEL_REQUESTS = 20
+
+_STATEMENT = re.compile(r"^\s*(INSERT INTO|UPDATE|DELETE FROM|SELECT .*? FROM)\s+(\w+)", re.IGNORECASE | re.DOTALL)
+
+@contextmanager
+def count_statements():
+    """Counter of (verb, table) for every statement sent to the database inside the block."""
+    counts = Counter()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        match = _STATEMENT.match(statement)
+        if match:
+            counts[(match.group(1).split()[0].upper(), match.group(2).lower())] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield counts
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+async def test_signup_and_account_create_are_single_inserts(client, make_user, user_prefix):
+    with count_statements() as counts:
+        response = await client.post("/auth/signup", json={
+            "email": f"{user_prefix}_single@example.com", "username": f"{user_prefix}_single", "password": PASSWORD,
+        })
+    assert response.status_code == 201, response.text
+    # Không SELECT kiểm tra email/username trước khi insert; ngoài users chỉ có dòng outbox của email kích hoạt
+    assert counts[("INSERT", "users")] == 1
+    assert counts[("SELECT", "users")] == 0
+
+    user = await make_user()
+    with count_statements() as counts:
+        response = await client.post("/accounts", headers=user["headers"], json={
+            "account_name": "Wallet", "account_type": "cash", "initial_balance": "0", "currency": "VND",
+        })
+    assert response.status_code == 201, response.text
+    assert counts[("INSERT", "accounts")] == 1
+    assert counts[("UPDATE", "accounts")] == 0
+    # Chỉ còn SELECT pg_notify(...) FROM accounts cho stream số dư - không kiểm tra trùng tên, không refresh
+    assert counts[("SELECT", "accounts")] <= 1
+
+async def test_duplicate_signup_and_account_name_are_rejected_with_400(client, make_user):
+    user = await make_user()
+    response = await client.post("/auth/signup", json={
+        "email": user["email"], "username": f"{user['username']}_other", "password": PASSWORD,
+    })
+    assert (response.status_code, response.json()["detail"]) == (400, "Email already registered")
+    response = await client.post("/auth/signup", json={
+        "email": f"other_{user['email']}", "username": user["username"], "password": PASSWORD,
+    })
+    assert (response.status_code, response.json()["detail"]) == (400, "Username already taken")
+
+    account = {"account_name": "Savings", "account_type": "bank_account", "initial_balance": "0", "currency": "VND"}
+    assert (await client.post("/accounts", headers=user["headers"], json=account)).status_code == 201
+    response = await client.post("/accounts", headers=user["headers"], json=account)
+    assert response.status_code == 400, response.text
+
+@pytest.mark.parametrize("shared", ["email", "username"])
+async def test_concurrent_signups_with_same_identity_create_one_user(client, user_prefix, shared):
+    def payload(i):
+        email = f"{user_prefix}_race@example.com" if shared == "email" else f"{user_prefix}_race{i}@example.com"
+        username = f"{user_prefix}_race" if shared == "username" else f"{user_prefix}_race{i}"
+        return {"email": email, "username": username, "password": PASSWORD}
+
+    responses = await asyncio.gather(*(client.post("/auth/signup", json=payload(i)) for i in range(PARALLEL_REQUESTS)))
+
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {201: 1, 400: PARALLEL_REQUESTS - 1}
+    expected = "Email already registered" if shared == "email" else "Username already taken"
+    assert {response.json()["detail"] for response in responses if response.status_code == 400} == {expected}
+
+async def test_concurrent_account_creates_with_same_name_create_one_account(client, make_user):
+    user = await make_user()
+    responses = await asyncio.gather(*(
+        client.post("/accounts", headers=user["headers"], json={
+            "account_name": "Shared", "account_type": "bank_account", "initial_balance": str(i), "currency": "VND",
+        })
+        for i in range(PARALLEL_REQUESTS)
+    ))
+    assert Counter(response.status_code for response in responses) == {201: 1, 400: PARALLEL_REQUESTS - 1}
+    accounts = (await client.get("/accounts", headers=user["headers"])).json()
+    assert [account["account_name"] for account in accounts] == ["Shared"]
@@ -0,0 +1,70 @@
+import asyncio
+from decimal import Decimal
+import pytest
+from sqlalchemy import case, func, select
+from app.core.database import AsyncSessionLocal
+from app.models import Account, CategoryType, Transaction
+
+pytestmark = pytest.mark.integration
+
+PARALLEL_REQUESTS = 40
+
+async def ledger_state(account_id: int) -> tuple[Decimal, Decimal, Decimal]:
+    """(initial_balance, current_balance, signed SUM over the account's transactions) read straight from the DB."""
+    signed = case((Transaction.transaction_type == CategoryType.income, Transaction.amount), else_=-Transaction.amount)
+    async with AsyncSessionLocal() as db:
+        initial, current = (await db.execute(
+            select(Account.initial_balance, Account.current_balance).where(Account.account_id == account_id)
+        )).one()
+        ledger = await db.scalar(select(func.coalesce(func.sum(signed), 0)).where(Transaction.account_id == account_id))
+    return initial, current, Decimal(ledger)
+
+async def test_parallel_inserts_on_one_account_match_ledger_sum(client, make_user, make_account, make_category):
+    user = await make_user()
+    account = await make_account(user, initial_balance="1000.00")
+    expense = await make_category(user, "Food")
+    income = await make_category(user, "Salary", "income")
+    amounts = [Decimal(f"{i + 1}.{i % 100:02d}") for i in range(PARALLEL_REQUESTS)]
+
+    responses = await asyncio.gather(*(
+        client.post("/transactions", headers=user["headers"], json={
+            "account_id": account["account_id"],
+            "category_id": (income if i % 3 == 0 else expense)["category_id"],
+            "amount": str(amount),
+        })
+        for i, amount in enumerate(amounts)
+    ))
+
+    assert [response.status_code for response in responses] == [201] * PARALLEL_REQUESTS
+    initial, current, ledger = await ledger_state(account["account_id"])
+    expected = sum(amount if i % 3 == 0 else -amount for i, amount in enumerate(amounts))
+    assert ledger == expected
+    assert current == initial + ledger
+
+async def test_parallel_moves_and_deletes_keep_both_accounts_consistent(client, make_user, make_account, make_category):
+    user = await make_user()
+    source = await make_account(user, "Source", initial_balance="500.00")
+    target = await make_account(user, "Target", initial_balance="0")
+    expense = await make_category(user, "Food")
+    created = []
+    for i in range(PARALLEL_REQUESTS):
+        response = await client.post("/transactions", headers=user["headers"], json={
+            "account_id": source["account_id"], "category_id": expense["category_id"], "amount": f"{i + 1}.25",
+        })
+        assert response.status_code == 201, response.text
+        created.append(response.json()["transaction_id"])
+
+    # Nửa đầu chuyển sang account khác (kèm đổi số tiền), nửa sau xóa - tất cả song song
+    half = PARALLEL_REQUESTS // 2
+    responses = await asyncio.gather(
+        *(client.put(f"/transactions/{transaction_id}", headers=user["headers"],
+                     json={"account_id": target["account_id"], "amount": "10.00"})
+          for transaction_id in created[:half]),
+        *(client.delete(f"/transactions/{transaction_id}", headers=user["headers"]) for transaction_id in created[half:]),
+    )
+
+    assert [response.status_code for response in responses] == [200] * PARALLEL_REQUESTS
+    for account, expected_ledger in ((source, Decimal("0")), (target, Decimal("-10.00") * half)):
+        initial, current, ledger = await ledger_state(account["account_id"])
+        assert ledger == expected_ledger
+        assert current == initial + ledger